@@ -0,0 +1,331 @@
+# ============================================================
+# Product Service — Response Cache
+# ============================================================
+#
+# Read-through cache of already-serialized JSON response bodies.
+# Lookups go to a small in-process LRU first, then Redis, then the
+# loader (Postgres). Single resources are invalidated by key; listing
+# entries embed a per-namespace generation number in their Redis key,
+# so bumping the generation drops every listing at once. Item entries
+# carry a second, item generation, bumped when something every item
+# embeds changes (a category, for products). Misses go
+# through a single-flight layer (app.coalesce), so identical concurrent
+# reads share one load. ``fresh`` reads (clients reading their own
+# writes) skip what this pod kept from before the write: local entries,
+# memoized generations and in-flight loads.
+
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Optional, Tuple
+
+import redis.asyncio as aioredis
+from prometheus_client import Counter
+from redis.exceptions import RedisError
+
+from app.coalesce import SingleFlight
+from app.config import settings
+from app.utils.logger import logger
+
+CACHE_REQUESTS = Counter(
+    "product_cache_requests_total",
+    "Response cache lookups by namespace, layer and result",
+    ["namespace", "layer", "result"],
+)
+CACHE_EVICTIONS = Counter(
+    "product_cache_evictions_total",
+    "Response cache entries dropped, by layer and reason",
+    ["layer", "reason"],
+)
+
+Loader = Callable[[], Awaitable[bytes]]
+
+
+def params_digest(params: dict) -> str:
+    """Stable digest of normalized query parameters."""
+    payload = json.dumps(params, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+
+class LocalLRU:
+    """Bounded in-process LRU of serialized bodies with a short TTL.
+
+    Also memoizes namespace versions (see ``ResponseCache.version``).
+    """
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[bytes]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            CACHE_EVICTIONS.labels(layer="local", reason="expired").inc()
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: bytes) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            CACHE_EVICTIONS.labels(layer="local", reason="capacity").inc()
+
+    def delete(self, key: str) -> None:
+        if self._entries.pop(key, None) is not None:
+            CACHE_EVICTIONS.labels(layer="local", reason="invalidated").inc()
+
+    def delete_prefix(self, prefix: str) -> None:
+        stale = [key for key in self._entries if key.startswith(prefix)]
+        for key in stale:
+            del self._entries[key]
+        if stale:
+            CACHE_EVICTIONS.labels(layer="local", reason="invalidated").inc(len(stale))
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+class ResponseCache:
+    """Two-level (LRU + Redis) cache of serialized response bodies.
+
+    Redis failures are logged and treated as misses, so the service keeps
+    serving from Postgres when Redis is unavailable.
+    """
+
+    def __init__(
+        self,
+        redis: Optional[Any] = None,
+        ttl: int = settings.PRODUCT_CACHE_TTL,
+        local_max_entries: int = settings.CACHE_LOCAL_MAX_ENTRIES,
+        local_ttl: float = settings.CACHE_LOCAL_TTL,
+        enabled: bool = settings.CACHE_ENABLED,
+    ):
+        self.redis = redis
+        self.ttl = ttl
+        self.enabled = enabled
+        self.local = LocalLRU(local_max_entries, local_ttl)
+        self.flights = SingleFlight()
+
+    # ── Lifecycle ──────────────────────────────────────────
+    async def connect(self, url: str = settings.REDIS_URL) -> None:
+        if not self.enabled:
+            return
+        client = aioredis.from_url(url)
+        try:
+            await client.ping()
+        except (RedisError, OSError) as e:
+            logger.warning("cache_redis_unavailable", error=str(e))
+            await client.aclose()
+            return
+        self.redis = client
+        logger.info("✅ Response cache connected to Redis")
+
+    async def close(self) -> None:
+        if self.redis is not None:
+            await self.redis.aclose()
+            self.redis = None
+        self.local.clear()
+        self.flights.clear()
+
+    # ── Keys ───────────────────────────────────────────────
+    @staticmethod
+    def item_key(namespace: str, item_id: str) -> str:
+        return f"cache:{namespace}:item:{item_id}"
+
+    @staticmethod
+    def list_key(namespace: str, digest: str) -> str:
+        return f"cache:{namespace}:list:{digest}"
+
+    @staticmethod
+    def generation_key(namespace: str) -> str:
+        return f"cache:{namespace}:gen"
+
+    @staticmethod
+    def modified_key(namespace: str) -> str:
+        return f"cache:{namespace}:modified"
+
+    @staticmethod
+    def items_generation_key(namespace: str) -> str:
+        return f"cache:{namespace}:items:gen"
+
+    # ── Reads ──────────────────────────────────────────────
+    async def get_item(self, namespace: str, item_id: str, loader: Loader, fresh: bool = False) -> bytes:
+        """Return the cached body for one resource, loading it on a miss.
+
+        ``fresh`` skips the local layer and in-flight loads.
+        """
+        key = self.item_key(namespace, item_id)
+        if not self.enabled:
+            return await self.flights.do(namespace, key, loader, fresh)
+        body = None if fresh else self._get_local(namespace, key)
+        if body is not None:
+            return body
+        redis_key = key
+        if self.redis is not None:
+            redis_key = f"{key}:{await self._items_generation(namespace, fresh)}"
+        return await self.flights.do(
+            namespace, key, lambda: self._read_through(namespace, key, redis_key, loader), fresh
+        )
+
+    async def get_listing(
+        self, namespace: str, params: dict, loader: Loader, ttl: Optional[int] = None,
+        fresh: bool = False,
+    ) -> bytes:
+        """Return the cached body for a listing query, loading it on a miss.
+
+        ``ttl`` overrides the Redis TTL for entries that should age out
+        sooner than PRODUCT_CACHE_TTL. ``fresh`` skips the local layer
+        and in-flight loads.
+        """
+        local_key = self.list_key(namespace, params_digest(params))
+        if not self.enabled:
+            return await self.flights.do(namespace, local_key, loader, fresh)
+        body = None if fresh else self._get_local(namespace, local_key)
+        if body is not None:
+            return body
+        generation = await self._generation(namespace, fresh)
+        redis_key = f"{local_key}:{generation}"
+        # Keyed by generation too: a load from before another pod's write is not shared after it
+        return await self.flights.do(
+            namespace, redis_key,
+            lambda: self._read_through(namespace, local_key, redis_key, loader, ttl), fresh,
+        )
+
+    def _get_local(self, namespace: str, key: str) -> Optional[bytes]:
+        body = self.local.get(key)
+        result = "miss" if body is None else "hit"
+        CACHE_REQUESTS.labels(namespace=namespace, layer="local", result=result).inc()
+        return body
+
+    async def _read_through(
+        self, namespace: str, local_key: str, redis_key: str, loader: Loader,
+        ttl: Optional[int] = None,
+    ) -> bytes:
+        if self.redis is not None:
+            try:
+                body = await self.redis.get(redis_key)
+            except RedisError as e:
+                logger.warning("cache_redis_error", op="get", error=str(e))
+                CACHE_REQUESTS.labels(namespace=namespace, layer="redis", result="error").inc()
+            else:
+                result = "miss" if body is None else "hit"
+                CACHE_REQUESTS.labels(namespace=namespace, layer="redis", result=result).inc()
+                if body is not None:
+                    self.local.set(local_key, body)
+                    return body
+
+        body = await loader()
+        self.local.set(local_key, body)
+        if self.redis is not None:
+            try:
+                await self.redis.set(redis_key, body, ex=ttl or self.ttl)
+            except RedisError as e:
+                logger.warning("cache_redis_error", op="set", error=str(e))
+        return body
+
+    async def version(
+        self, namespace: str, fresh: bool = False
+    ) -> Optional[Tuple[int, Optional[float]]]:
+        """Generation of ``namespace`` and the epoch time it last changed.
+
+        Memoized in the local layer, so it is as fresh as a local hit
+        unless ``fresh`` is set. None when Redis is unavailable and the
+        version is unknown.
+        """
+        if not self.enabled or self.redis is None:
+            return None
+        key = self.generation_key(namespace)
+        version = None if fresh else self.local.get(key)
+        if version is not None:
+            return version
+        try:
+            generation, modified = await self.redis.mget(key, self.modified_key(namespace))
+        except RedisError as e:
+            logger.warning("cache_redis_error", op="generation", error=str(e))
+            return None
+        version = (int(generation or 0), float(modified) if modified is not None else None)
+        self.local.set(key, version)
+        return version
+
+    async def _generation(self, namespace: str, fresh: bool = False) -> int:
+        version = await self.version(namespace, fresh)
+        return version[0] if version else 0
+
+    async def _items_generation(self, namespace: str, fresh: bool = False) -> int:
+        # Memoized in the local layer like version(); callers check self.redis
+        key = self.items_generation_key(namespace)
+        generation = None if fresh else self.local.get(key)
+        if generation is not None:
+            return generation
+        try:
+            generation = int(await self.redis.get(key) or 0)
+        except RedisError as e:
+            logger.warning("cache_redis_error", op="items_generation", error=str(e))
+            return 0
+        self.local.set(key, generation)
+        return generation
+
+    # ── Invalidation ───────────────────────────────────────
+    async def invalidate(self, namespace: str, *item_ids: str, all_items: bool = False) -> None:
+        """Drop the given resources and every listing of ``namespace``.
+
+        ``all_items`` drops every single-resource entry of ``namespace``
+        too, by bumping its item generation.
+        """
+        keys = [self.item_key(namespace, item_id) for item_id in item_ids]
+        self.flights.forget(*keys, prefix=self.list_key(namespace, ""))
+        if all_items:
+            self.flights.forget(prefix=self.item_key(namespace, ""))
+        if not self.enabled:
+            return
+        for key in keys:
+            self.local.delete(key)
+        self.local.delete_prefix(self.list_key(namespace, ""))
+        self.local.delete(self.generation_key(namespace))
+        if all_items:
+            self.local.delete_prefix(self.item_key(namespace, ""))
+            self.local.delete(self.items_generation_key(namespace))
+
+        if self.redis is None:
+            return
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            if all_items:
+                pipe.incr(self.items_generation_key(namespace))
+            elif keys:
+                # Fresh, so a bump by another pod is not missed
+                generation = await self._items_generation(namespace, fresh=True)
+                pipe.delete(*(f"{key}:{generation}" for key in keys))
+            pipe.incr(self.generation_key(namespace))
+            pipe.set(self.modified_key(namespace), time.time())
+            await pipe.execute()
+        except RedisError as e:
+            logger.warning("cache_redis_error", op="invalidate", error=str(e))
+            return
+        if keys:
+            CACHE_EVICTIONS.labels(layer="redis", reason="invalidated").inc(len(keys))
+
+
+cache = ResponseCache()
+
+
+async def invalidate_product(*product_ids: Any) -> None:
+    await cache.invalidate("products", *(str(product_id) for product_id in product_ids))
+
+
+async def invalidate_category(category_id: Any) -> None:
+    # Product bodies embed their category, so product listings and
+    # single-product entries go too.
+    await cache.invalidate("categories", str(category_id))
+    await cache.invalidate("products", all_items=True)
@@ -0,0 +1,215 @@
+# ============================================================
+# Product Service — Catalog Change Feed
+# ============================================================
+#
+# GET /changes lets a downstream copy of the catalog stay in sync by
+# fetching only what changed since its last call, deletes included.
+#
+# Every product and category row carries its change position
+# (change_txid, change_seq): the id of the transaction that last wrote
+# it and a number from catalog_change_seq. A BEFORE INSERT OR UPDATE
+# trigger stamps both, so every write path is covered (the API, bulk
+# import, reservations, ON DELETE SET NULL from a deleted category and
+# hand-written SQL alike). An AFTER DELETE trigger writes a tombstone
+# to catalog_tombstones, numbered from the same sequence.
+#
+# Rows are stamped in place, so a product changed 50 times since the
+# last sync is returned once, in its current state: a sync costs the
+# number of changed rows, not the catalog size. As with the stock alert
+# feed, rows are served in (txid, seq) order and only once every older
+# transaction has finished, so nothing can commit behind a cursor that
+# has already moved past it. Calling without a cursor returns the
+# whole catalog, page by page; that is the initial sync.
+#
+# Tombstones are kept CHANGE_RETENTION_DAYS (plus a day of slack for
+# long-running transactions) and pruned by ``python -m app.changes
+# prune`` (run it daily). A consumer can only miss deletes made after
+# it was last caught up, or after its sync started if it never was, so
+# the cursor carries that time (``since``): a page with has_more keeps
+# it, a caught-up page renews it. Once ``since`` is older than the
+# retention, deletes the consumer needs may be gone; the cursor is
+# refused with 410 and the consumer syncs again from scratch.
+#
+# ``python -m app.changes`` installs the columns, triggers and indexes
+# on an existing database. Adding the columns rewrites products (run it
+# off-peak) and gives every existing row one position, so the first
+# sync after it returns everything once. Every step is idempotent.
+
+import asyncio
+import base64
+import json
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import BigInteger, and_, delete, literal, select, text, tuple_, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.low_stock import SNAPSHOT_XMIN
+from app.models import CURRENT_TXID_SQL, CatalogTombstone, Category, Product
+from app.outbox import PRODUCT_EVENT_FIELDS
+from app.projection import CATEGORY_FIELDS, product_select, row_to_dict
+from app.utils.logger import logger
+
+# (txid, seq) of the last change a consumer has seen
+Position = Tuple[int, int]
+
+# Tombstones outlive cursor expiry by this much, so a delete whose
+# transaction began before a consumer caught up is never pruned early
+PRUNE_SLACK = timedelta(days=1)
+
+MIGRATION = [
+    "CREATE SEQUENCE IF NOT EXISTS catalog_change_seq",
+    *(
+        f"ALTER TABLE {table} "
+        f"ADD COLUMN IF NOT EXISTS change_txid BIGINT NOT NULL DEFAULT {CURRENT_TXID_SQL}, "
+        "ADD COLUMN IF NOT EXISTS change_seq BIGINT NOT NULL DEFAULT nextval('catalog_change_seq')"
+        for table in ("categories", "products")
+    ),
+    """CREATE OR REPLACE FUNCTION catalog_stamp_change() RETURNS trigger AS $$
+BEGIN
+    NEW.change_txid := pg_current_xact_id()::text::bigint;
+    NEW.change_seq := nextval('catalog_change_seq');
+    RETURN NEW;
+END $$ LANGUAGE plpgsql""",
+    """CREATE OR REPLACE FUNCTION catalog_record_delete() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO catalog_tombstones (entity, entity_id) VALUES (TG_ARGV[0], OLD.id);
+    RETURN OLD;
+END $$ LANGUAGE plpgsql""",
+    *(
+        statement
+        for table, entity in (("categories", "category"), ("products", "product"))
+        for statement in (
+            f"CREATE OR REPLACE TRIGGER {table}_stamp_change BEFORE INSERT OR UPDATE ON {table} "
+            "FOR EACH ROW EXECUTE FUNCTION catalog_stamp_change()",
+            f"CREATE OR REPLACE TRIGGER {table}_record_delete AFTER DELETE ON {table} "
+            f"FOR EACH ROW EXECUTE FUNCTION catalog_record_delete('{entity}')",
+        )
+    ),
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_category_change ON categories (change_txid, change_seq)",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_product_change ON products (change_txid, change_seq)",
+]
+
+
+# ── Cursor ─────────────────────────────────────────────────
+def encode_position(position: Optional[Position], since: float) -> str:
+    """Opaque cursor for ``position``; ``since`` is when the consumer was last caught up."""
+    payload = {"p": list(position) if position else None, "since": int(since)}
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_position(cursor: str) -> Tuple[Optional[Position], float]:
+    """``(position, since)`` from ``cursor``; 400 when malformed, 410 once expired."""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        position = payload["p"]
+        since = int(payload["since"])
+        if position is not None:
+            txid, seq = position
+            position = (int(txid), int(seq))
+    except (ValueError, KeyError, TypeError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid cursor: {e}")
+    if time.time() - since > settings.CHANGE_RETENTION_DAYS * 86400:
+        raise HTTPException(status_code=410, detail="Cursor expired; sync again without a cursor")
+    return position, since
+
+
+# ── Feed ───────────────────────────────────────────────────
+def changes_statement(after: Optional[Position], limit: int):
+    """Settled changes past ``after`` from all three sources, in order.
+
+    One statement, so every branch is cut at the same snapshot xmin;
+    Postgres merges the three (txid, seq) index scans.
+    """
+    bound = tuple_(*(literal(value, BigInteger) for value in after)) if after is not None else None
+
+    def branch(entity, op, entity_id, txid, seq):
+        conditions = [txid < SNAPSHOT_XMIN]
+        if bound is not None:
+            conditions.append(tuple_(txid, seq) > bound)
+        return select(
+            entity.label("entity"), literal(op).label("op"), entity_id.label("entity_id"),
+            txid.label("txid"), seq.label("seq"),
+        ).where(and_(*conditions))
+
+    changes = union_all(
+        branch(literal("category"), "upsert", Category.id, Category.change_txid, Category.change_seq),
+        branch(literal("product"), "upsert", Product.id, Product.change_txid, Product.change_seq),
+        branch(
+            CatalogTombstone.entity, "delete", CatalogTombstone.entity_id,
+            CatalogTombstone.txid, CatalogTombstone.id,
+        ),
+    ).subquery("changes")
+    return select(changes).order_by(changes.c.txid, changes.c.seq).limit(limit)
+
+
+async def read_changes(
+    db: AsyncSession, after: Optional[Position], limit: int, since: Optional[float] = None,
+) -> Dict[str, Any]:
+    """One page of the feed, with the current rows of upserted entities.
+
+    ``since`` comes from the caller's cursor; None starts a new sync.
+    """
+    started = time.time()  # before the read, so a page that catches up is dated conservatively
+    keys = (await db.execute(changes_statement(after, limit))).all()
+
+    upserted: Dict[str, List] = {"category": [], "product": []}
+    for key in keys:
+        if key.op == "upsert":
+            upserted[key.entity].append(key.entity_id)
+    rows: Dict[Any, dict] = {}
+    if upserted["category"]:
+        result = await db.execute(
+            select(*(getattr(Category, name) for name in CATEGORY_FIELDS))
+            .where(Category.id.in_(upserted["category"]))
+        )
+        rows.update((row.id, dict(row._mapping)) for row in result.all())
+    if upserted["product"]:
+        query, _ = product_select(PRODUCT_EVENT_FIELDS)
+        result = await db.execute(query.where(Product.id.in_(upserted["product"])))
+        rows.update((row.id, row_to_dict(row, PRODUCT_EVENT_FIELDS)) for row in result.all())
+
+    changes = []
+    for key in keys:
+        if key.op == "delete":
+            changes.append({"type": key.entity, "op": "delete", "id": key.entity_id})
+        elif key.entity_id in rows:
+            changes.append({"type": key.entity, "op": "upsert", "id": key.entity_id, "data": rows[key.entity_id]})
+        # else deleted since the keys were read; its tombstone comes later
+
+    position = (keys[-1].txid, keys[-1].seq) if keys else after
+    has_more = len(keys) == limit
+    since = started if not has_more or since is None else since
+    return {"changes": changes, "next_cursor": encode_position(position, since), "has_more": has_more}
+
+
+# ── Maintenance ────────────────────────────────────────────
+async def prune(engine) -> int:
+    """Delete tombstones no unexpired cursor can still need."""
+    cutoff = datetime.utcnow() - timedelta(days=settings.CHANGE_RETENTION_DAYS) - PRUNE_SLACK
+    async with engine.begin() as conn:
+        result = await conn.execute(delete(CatalogTombstone).where(CatalogTombstone.deleted_at < cutoff))
+    logger.info("catalog_tombstones_pruned", count=result.rowcount, before=cutoff.isoformat())
+    return result.rowcount
+
+
+async def migrate(engine) -> None:
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await conn.execute(text(MIGRATION[0]))
+        await conn.run_sync(CatalogTombstone.__table__.create, checkfirst=True)
+        for statement in MIGRATION[1:]:
+            await conn.execute(text(statement))
+    logger.info("catalog_changes_migrated")
+
+
+if __name__ == "__main__":
+    from app.database import engine
+
+    asyncio.run(prune(engine) if sys.argv[1:] == ["prune"] else migrate(engine))
@@ -0,0 +1,115 @@
+# ============================================================
+# Product Service — Request Coalescing (single-flight)
+# ============================================================
+#
+# When many identical reads arrive together (a flash sale hammering one
+# product or the first listing page), only the first one runs the load;
+# the rest await its result instead of each checking out a pool
+# connection for the same query. Flights are keyed on the cache key,
+# i.e. the resource or route plus its normalized parameters.
+#
+# A finished load keeps answering identical reads for COALESCE_WINDOW
+# seconds. Invalidation forgets flights and finished results alike, so
+# a read that starts after a write has been invalidated never joins a
+# load that started before it. A ``fresh`` read (one that must see a
+# write made through another pod) never joins; its load replaces the
+# shared one.
+
+import asyncio
+from typing import Awaitable, Callable, Dict
+
+from prometheus_client import Counter, Gauge
+
+from app.config import settings
+
+COALESCED_REQUESTS = Counter(
+    "product_coalesced_requests_total",
+    "Reads by single-flight role: leader (ran the load), follower "
+    "(joined an in-flight load) or window (reused a just-finished one)",
+    ["namespace", "role"],
+)
+INFLIGHT_LOADS = Gauge(
+    "product_coalesce_inflight_loads",
+    "Loads currently running on behalf of coalesced reads",
+)
+
+Loader = Callable[[], Awaitable[bytes]]
+
+
+class SingleFlight:
+    """Shares one in-flight (or just-finished) load per key."""
+
+    def __init__(self, window: float = settings.COALESCE_WINDOW, enabled: bool = settings.COALESCE_ENABLED):
+        self.window = window
+        self.enabled = enabled
+        self._flights: "Dict[str, asyncio.Future]" = {}
+
+    def __len__(self) -> int:
+        return len(self._flights)
+
+    async def do(self, namespace: str, key: str, loader: Loader, fresh: bool = False) -> bytes:
+        """Return ``loader()``'s result, sharing it with identical concurrent calls.
+
+        A failed load raises in every caller that joined it. If the
+        leader is cancelled (client went away), a follower takes over.
+        ``fresh`` runs a new load even when one is in flight.
+        """
+        if not self.enabled:
+            return await loader()
+
+        while not fresh:
+            future = self._flights.get(key)
+            if future is None:
+                break
+            if future.done():
+                COALESCED_REQUESTS.labels(namespace=namespace, role="window").inc()
+                return future.result()
+            COALESCED_REQUESTS.labels(namespace=namespace, role="follower").inc()
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise  # this caller was cancelled, not the leader
+                # Leader went away; the next pass becomes (or joins) a new one
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._flights[key] = future
+        COALESCED_REQUESTS.labels(namespace=namespace, role="leader").inc()
+        INFLIGHT_LOADS.inc()
+        try:
+            body = await loader()
+        except asyncio.CancelledError:
+            self._drop(key, future)
+            future.cancel()
+            raise
+        except Exception as e:
+            self._drop(key, future)
+            future.set_exception(e)
+            future.exception()  # retrieved here, so an unjoined failure is not logged twice
+            raise
+        finally:
+            INFLIGHT_LOADS.dec()
+
+        future.set_result(body)
+        if self.window > 0 and self._flights.get(key) is future:
+            loop.call_later(self.window, self._drop, key, future)
+        else:
+            self._drop(key, future)
+        return body
+
+    def _drop(self, key: str, future: asyncio.Future) -> None:
+        # Never drop a newer flight that replaced a forgotten one
+        if self._flights.get(key) is future:
+            del self._flights[key]
+
+    def forget(self, *keys: str, prefix: str = "") -> None:
+        """Stop sharing the given keys (and every key under ``prefix``)."""
+        for key in keys:
+            self._flights.pop(key, None)
+        if prefix:
+            for key in [key for key in self._flights if key.startswith(prefix)]:
+                del self._flights[key]
+
+    def clear(self) -> None:
+        self._flights.clear()
@@ -0,0 +1,124 @@
+# ============================================================
+# Product Service — Conditional GET
+# ============================================================
+#
+# Strong ETag / Last-Modified validators for read endpoints, and the
+# If-None-Match / If-Modified-Since checks that turn a repeat request
+# into a bodiless 304. Validators never require serializing the body:
+#
+#   * single resources hash their id and updated_at (plus the embedded
+#     category's); the validators are cached next to the body.
+#   * listings hash the namespace generation from the response cache
+#     (bumped on every write) and the normalized query parameters, so
+#     a matching request is answered before the listing is loaded.
+
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, NamedTuple, Optional, Tuple
+
+import orjson
+from fastapi import Request, Response
+
+from app.cache import params_digest
+from app.config import settings
+
+
+class Validators(NamedTuple):
+    etag: str
+    last_modified: Optional[datetime] = None
+
+
+def make_etag(*parts: Any) -> str:
+    payload = "\x1f".join(str(part) for part in parts).encode()
+    return '"%s"' % hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+
+def _utc(value: datetime) -> datetime:
+    # Columns hold naive UTC timestamps
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+
+def resource_validators(resource_id: Any, *timestamps: Optional[datetime]) -> Validators:
+    """Validators for one row, from its id and modification timestamps."""
+    stamps = [_utc(stamp) for stamp in timestamps if stamp is not None]
+    etag = make_etag(resource_id, *(stamp.isoformat() for stamp in stamps))
+    return Validators(etag, max(stamps) if stamps else None)
+
+
+def listing_validators(
+    namespace: str, params: dict, version: Optional[Tuple[int, Optional[float]]]
+) -> Optional[Validators]:
+    """Validators for a listing, or None when the namespace version is unknown."""
+    if version is None:
+        return None
+    generation, modified = version
+    last_modified = datetime.fromtimestamp(modified, timezone.utc) if modified is not None else None
+    return Validators(make_etag(namespace, generation, params_digest(params)), last_modified)
+
+
+# ── Cached bodies ──────────────────────────────────────────
+# Single-resource entries carry their validators on a first line;
+# orjson never emits a raw newline, so the split is unambiguous.
+def pack(validators: Validators, body: bytes) -> bytes:
+    last_modified = validators.last_modified.timestamp() if validators.last_modified else None
+    return orjson.dumps([validators.etag, last_modified]) + b"\n" + body
+
+
+def unpack(value: bytes) -> Tuple[Optional[Validators], bytes]:
+    head, sep, body = value.partition(b"\n")
+    if not sep:  # entry written before validators were cached
+        return None, value
+    etag, last_modified = orjson.loads(head)
+    if last_modified is not None:
+        last_modified = datetime.fromtimestamp(last_modified, timezone.utc)
+    return Validators(etag, last_modified), body
+
+
+# ── Responses ──────────────────────────────────────────────
+def _etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    # If-None-Match uses the weak comparison
+    candidates = (tag.strip() for tag in header.split(","))
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+def is_not_modified(request: Request, validators: Validators) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # If-Modified-Since is ignored whenever If-None-Match is present
+        return _etag_matches(if_none_match, validators.etag)
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and validators.last_modified:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        # HTTP dates have one-second resolution
+        return validators.last_modified.replace(microsecond=0) <= since
+    return False
+
+
+def cache_headers(request: Request, validators: Optional[Validators]) -> dict:
+    route = request.scope.get("route")
+    name = getattr(route, "name", None)
+    headers = {"Cache-Control": settings.CACHE_CONTROL.get(name, settings.CACHE_CONTROL_DEFAULT)}
+    if validators:
+        headers["ETag"] = validators.etag
+        if validators.last_modified:
+            headers["Last-Modified"] = format_datetime(validators.last_modified, usegmt=True)
+    return headers
+
+
+def not_modified(request: Request, validators: Optional[Validators]) -> Optional[Response]:
+    """A 304 for ``request`` if its preconditions match, else None."""
+    if validators is None or not is_not_modified(request, validators):
+        return None
+    return Response(status_code=304, headers=cache_headers(request, validators))
+
+
+def json_response(request: Request, body: bytes, validators: Optional[Validators]) -> Response:
+    return Response(content=body, media_type="application/json", headers=cache_headers(request, validators))
@@ -2,22 +2,40 @@
 # Product Service — Database Configuration
 # ============================================================
 
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+from typing import Awaitable, Callable
+
+from fastapi import Request
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
 
 from app.config import settings
+from app.instrumentation import InstrumentedPool, instrument_engine
+from app.utils.logger import logger
+
+
+def create_engine(url: str, name: str = "primary") -> AsyncEngine:
+    """Async engine with the service's pool settings and instrumentation."""
+    engine = create_async_engine(
+        url,
+        echo=settings.ENVIRONMENT == "development",
+        pool_size=20,
+        max_overflow=10,
+        pool_timeout=30,
+        pool_recycle=1800,  # Recycle connections every 30 minutes
+        pool_pre_ping=True,  # Verify connections before use
+        poolclass=InstrumentedPool,  # Exports checkout wait times
+        pool_logging_name=name,  # Labels the pool metrics
+        query_cache_size=settings.DB_COMPILED_CACHE_SIZE,
+        connect_args={"prepared_statement_cache_size": settings.DB_PREPARED_STATEMENT_CACHE_SIZE},
+    )
+    if settings.DB_METRICS_ENABLED:
+        instrument_engine(engine)
+    return engine
 
 
 # Create async engine with connection pooling
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    echo=settings.ENVIRONMENT == "development",
-    pool_size=20,
-    max_overflow=10,
-    pool_timeout=30,
-    pool_recycle=1800,  # Recycle connections every 30 minutes
-    pool_pre_ping=True,  # Verify connections before use
-)
+engine = create_engine(settings.DATABASE_URL)
 
 # Create session factory
 async_session = async_sessionmaker(
@@ -32,8 +50,42 @@ class Base(DeclarativeBase):
     pass
 
 
+def after_commit(session: AsyncSession, callback: Callable[[], Awaitable[None]]) -> None:
+    """Run ``callback`` once the request transaction has committed."""
+    session.info.setdefault("after_commit", []).append(callback)
+
+
+async def run_after_commit(session: AsyncSession) -> None:
+    """Run the session's after-commit callbacks.
+
+    The write has already committed, so a failing callback is logged and
+    the rest still run; the client must not see an error and retry.
+    """
+    for callback in session.info.pop("after_commit", []):
+        try:
+            await callback()
+        except Exception as e:
+            logger.error("after_commit_failed", callback=repr(callback), error=str(e))
+
+
+# Methods whose sessions never write, so they need no consistency token
+READ_ONLY_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+async def issue_consistency_token(request: Request, session: AsyncSession) -> None:
+    """Lets this client read its own write from a replica (app/replicas.py).
+
+    Runs after the commit, so a failed lookup is logged and the response
+    just goes out without a token.
+    """
+    try:
+        request.state.consistency_token = await session.scalar(text("SELECT pg_current_wal_lsn()::text"))
+    except Exception as e:
+        logger.warning("consistency_token_failed", error=str(e))
+
+
 # Dependency for getting DB session
-async def get_db():
+async def get_db(request: Request):
     async with async_session() as session:
         try:
             yield session
@@ -41,5 +93,9 @@ async def get_db():
         except Exception:
             await session.rollback()
             raise
+        else:
+            await run_after_commit(session)
+            if settings.DATABASE_REPLICA_URLS and request.method not in READ_ONLY_METHODS:
+                await issue_consistency_token(request, session)
         finally:
             await session.close()
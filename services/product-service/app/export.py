@@ -0,0 +1,81 @@
+# ============================================================
+# Product Service — Streaming Catalog Export
+# ============================================================
+#
+# Streams the filtered catalog as NDJSON or CSV over a server-side
+# cursor. Rows are fetched EXPORT_BATCH_SIZE at a time and each batch
+# is encoded and sent before the next one is fetched, so memory stays
+# flat and the first bytes leave immediately. The generator owns its
+# own session because the response body is produced after the request
+# dependencies (and their session) have been torn down.
+
+import csv
+import io
+import zlib
+from datetime import datetime
+from typing import Any, AsyncIterator, List, Optional
+
+from app.config import settings
+from app.database import async_session
+from app.projection import dumps, row_to_dict
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+def _csv_value(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, dict):  # nested category: export its name
+        return value["name"]
+    return value
+
+
+def encode_batch(rows, fields: List[str], fmt: str) -> bytes:
+    if fmt == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\n")
+        for row in rows:
+            item = row_to_dict(row, fields)
+            writer.writerow([_csv_value(item[name]) for name in fields])
+        return buffer.getvalue().encode()
+    return b"".join(dumps(row_to_dict(row, fields)) + b"\n" for row in rows)
+
+
+class _Gzip:
+    """Incremental gzip; each chunk is sync-flushed so clients see progress."""
+
+    def __init__(self):
+        self._encoder = zlib.compressobj(wbits=31)
+
+    def chunk(self, data: bytes) -> bytes:
+        return self._encoder.compress(data) + self._encoder.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._encoder.flush()
+
+
+async def stream_export(
+    query, fields: List[str], fmt: str, compress: bool, session_factory=async_session,
+) -> AsyncIterator[bytes]:
+    """Yield the encoded export of ``query`` batch by batch."""
+    gzip: Optional[_Gzip] = _Gzip() if compress else None
+
+    def emit(data: bytes) -> bytes:
+        return gzip.chunk(data) if gzip else data
+
+    if fmt == "csv":
+        buffer = io.StringIO()
+        csv.writer(buffer, lineterminator="\n").writerow(fields)
+        yield emit(buffer.getvalue().encode())
+
+    async with session_factory() as session:
+        result = await session.stream(query.execution_options(yield_per=settings.EXPORT_BATCH_SIZE))
+        async for rows in result.partitions():
+            yield emit(encode_batch(rows, fields, fmt))
+
+    if gzip:
+        yield gzip.finish()
@@ -0,0 +1,100 @@
+# ============================================================
+# Product Service — Faceted Navigation
+# ============================================================
+#
+# All facets for a filter set come from one aggregate over one scan:
+#
+#   SELECT category_id, categories.name, <price bucket>, count(*),
+#          count(*) FILTER (WHERE is_featured),
+#          count(*) FILTER (WHERE quantity > 0),
+#          grouping(...) ...
+#   FROM products LEFT JOIN categories ...
+#   WHERE <list_products filters>
+#   GROUP BY GROUPING SETS ((category_id, name), (bucket), ())
+#
+# The WHERE clause is the same one list_products builds, so category
+# and price filters are served by idx_product_category_active and
+# idx_product_price_range. Price buckets have a fixed width; anything
+# past the last bucket is folded into it.
+
+from typing import List, Optional
+
+from fastapi import HTTPException
+from sqlalchemy import Float, Integer, func, literal, select, tuple_
+
+from app.models import Category, Product
+from app.schemas import CategoryFacet, PriceBucket, ProductFacetsResponse
+
+FACETS = ("category", "price", "featured", "in_stock")
+
+
+def parse_facets(facets: Optional[str]) -> List[str]:
+    """Validate a comma-separated ``facets`` value; all facets by default."""
+    if not facets:
+        return list(FACETS)
+    requested = {name.strip() for name in facets.split(",") if name.strip()}
+    unknown = requested.difference(FACETS)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown facets: {', '.join(sorted(unknown))}")
+    return [name for name in FACETS if name in requested]
+
+
+def price_bucket(interval: float, max_buckets: int):
+    # Inlined, so the select list and GROUP BY render the same expression
+    width = literal(interval, Float, literal_execute=True)
+    last = literal(max_buckets - 1, Integer, literal_execute=True)
+    return func.least(func.floor(Product.price / width), last)
+
+
+def facet_statement(conditions: list, facets: List[str], interval: float, max_buckets: int):
+    """One aggregate producing every requested facet."""
+    columns = [func.count().label("count")]
+    if "featured" in facets:
+        columns.append(func.count().filter(Product.is_featured).label("featured"))
+    if "in_stock" in facets:
+        columns.append(func.count().filter(Product.quantity > 0).label("in_stock"))
+
+    sets = [tuple_()]
+    if "category" in facets:
+        columns += [
+            Product.category_id, Category.name.label("category_name"),
+            func.grouping(Product.category_id).label("rolled_category"),
+        ]
+        sets.append(tuple_(Product.category_id, Category.name))
+    if "price" in facets:
+        bucket = price_bucket(interval, max_buckets)
+        columns += [bucket.label("price_bucket"), func.grouping(bucket).label("rolled_price")]
+        sets.append(tuple_(bucket))
+
+    query = select(*columns).where(*conditions)
+    if "category" in facets:
+        query = query.outerjoin(Category, Product.category_id == Category.id)
+    if len(sets) > 1:
+        query = query.group_by(func.grouping_sets(*sets))
+    return query
+
+
+def collect_facets(rows, facets: List[str], interval: float, max_buckets: int) -> ProductFacetsResponse:
+    """Fold the grouping-set rows into a facets response."""
+    response = ProductFacetsResponse(total=0)
+    categories, buckets = [], []
+    for row in rows:
+        mapping = row._mapping
+        if "category" in facets and not mapping["rolled_category"]:
+            categories.append(CategoryFacet(
+                category_id=mapping["category_id"], name=mapping["category_name"], count=mapping["count"],
+            ))
+        elif "price" in facets and not mapping["rolled_price"]:
+            index = int(mapping["price_bucket"])
+            upper = None if index == max_buckets - 1 else (index + 1) * interval
+            buckets.append(PriceBucket(min=index * interval, max=upper, count=mapping["count"]))
+        else:  # the () grouping set: totals over the whole filter set
+            response.total = mapping["count"]
+            response.featured = mapping.get("featured")
+            response.in_stock = mapping.get("in_stock")
+
+    if "category" in facets:
+        response.categories = sorted(categories, key=lambda c: (-c.count, c.name or ""))
+    if "price" in facets:
+        response.price = sorted(buckets, key=lambda b: b.min)
+    return response
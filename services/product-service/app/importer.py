@@ -0,0 +1,218 @@
+# ============================================================
+# Product Service — Bulk Catalog Import
+# ============================================================
+#
+# Streams an NDJSON or CSV request body, validates each record against
+# ProductCreate and writes valid rows in chunks with one multi-row
+# INSERT ... ON CONFLICT (sku) DO UPDATE per chunk. Each chunk commits
+# on its own, together with the chunk's product.created/updated outbox
+# events; if a chunk violates a database constraint its rows are
+# retried one by one so only the offending rows are reported.
+#
+# ON CONFLICT cannot touch the same row twice in one statement, so a
+# SKU repeated within a chunk keeps its last row; the earlier ones are
+# counted as ``duplicates``. Every received row ends up in exactly one
+# of inserted, updated, failed or duplicates.
+
+import csv
+import json
+import uuid
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import literal_column
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.cache import cache
+from app.config import settings
+from app.models import Product
+from app.outbox import record_events
+from app.schemas import ImportRowError, ProductCreate, ProductImportResponse
+from app.utils.logger import logger
+from app.utils.text import slugify
+
+# Columns refreshed when an incoming SKU already exists
+UPSERT_COLUMNS = [name for name in ProductCreate.model_fields if name != "sku"] + ["slug", "updated_at"]
+
+# asyncpg accepts at most 32767 bind parameters per statement
+MAX_BIND_PARAMS = 32767
+
+Record = Tuple[int, Optional[Dict[str, Any]], Optional[str]]
+
+
+# ── Parsing ────────────────────────────────────────────────
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Split a byte stream into lines without buffering the whole body."""
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield line
+    if buffer:
+        yield buffer
+
+
+async def iter_ndjson(chunks: AsyncIterator[bytes]) -> AsyncIterator[Record]:
+    """Yield ``(row_number, record, parse_error)`` for each NDJSON line."""
+    row_number = 0
+    async for line in iter_lines(chunks):
+        if not line.strip():
+            continue
+        row_number += 1
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield row_number, None, f"invalid JSON: {e}"
+            continue
+        if not isinstance(record, dict):
+            yield row_number, None, "expected a JSON object"
+            continue
+        yield row_number, record, None
+
+
+async def iter_csv(chunks: AsyncIterator[bytes]) -> AsyncIterator[Record]:
+    """Yield ``(row_number, record, parse_error)`` for each CSV record.
+
+    The first record is the header. Lines are grouped until their quotes
+    balance, so quoted fields may contain newlines.
+    """
+    header: Optional[List[str]] = None
+    pending: List[str] = []
+    quoted = False
+    row_number = 0
+    async for raw in iter_lines(chunks):
+        line = raw.decode("utf-8", errors="replace")
+        pending.append(line + "\n")
+        if line.count('"') % 2:
+            quoted = not quoted
+        if quoted:
+            continue
+        values = next(csv.reader(pending), [])
+        pending = []
+        if not any(value.strip() for value in values):
+            continue
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        row_number += 1
+        if len(values) != len(header):
+            yield row_number, None, f"expected {len(header)} columns, got {len(values)}"
+            continue
+        # Empty cells fall back to the schema defaults
+        yield row_number, {k: v for k, v in zip(header, values) if v != ""}, None
+
+
+# ── Writing ────────────────────────────────────────────────
+def upsert_statement(rows: List[Dict[str, Any]]):
+    """Multi-row upsert keyed on SKU, returning whether each row was new."""
+    stmt = pg_insert(Product).values(rows)
+    return stmt.on_conflict_do_update(
+        index_elements=[Product.sku],
+        set_={name: stmt.excluded[name] for name in UPSERT_COLUMNS},
+    ).returning(Product.id, Product.sku, literal_column("xmax = 0").label("inserted"))
+
+
+def row_values(data: ProductCreate, slug: str, now: datetime) -> Dict[str, Any]:
+    return {
+        **data.model_dump(),
+        "id": uuid.uuid4(),
+        "slug": slug,
+        "created_at": now,
+        "updated_at": now,
+    }
+
+
+class ProductImporter:
+    """Accumulates validated rows and writes them chunk by chunk."""
+
+    def __init__(self, db: AsyncSession, batch_size: int = settings.IMPORT_BATCH_SIZE):
+        columns = len(UPSERT_COLUMNS) + 3  # + sku, id, created_at
+        self.db = db
+        self.batch_size = max(1, min(batch_size, MAX_BIND_PARAMS // columns))
+        self.report = ProductImportResponse()
+        self._batch: Dict[str, Tuple[int, Dict[str, Any]]] = {}
+
+    async def run(self, records: AsyncIterator[Record]) -> ProductImportResponse:
+        async for row_number, record, parse_error in records:
+            self.report.received += 1
+            if parse_error:
+                self._fail(row_number, None, [parse_error])
+                continue
+            try:
+                data = ProductCreate.model_validate(record)
+            except ValidationError as e:
+                messages = [
+                    f"{'.'.join(str(part) for part in err['loc'])}: {err['msg']}"
+                    for err in e.errors()
+                ]
+                self._fail(row_number, record.get("sku"), messages)
+                continue
+            values = row_values(data, slugify(data.name), datetime.utcnow())
+            if self._batch.pop(data.sku, None) is not None:
+                self.report.duplicates += 1  # superseded by this row
+            self._batch[data.sku] = (row_number, values)
+            if len(self._batch) >= self.batch_size:
+                await self._flush()
+        await self._flush()
+        return self.report
+
+    async def _flush(self) -> None:
+        if not self._batch:
+            return
+        batch, self._batch = list(self._batch.values()), {}
+        try:
+            written = await self._write([values for _, values in batch])
+        except DBAPIError:
+            await self.db.rollback()
+            written = []
+            for row_number, values in batch:
+                try:
+                    written += await self._write([values])
+                except DBAPIError as e:
+                    await self.db.rollback()
+                    self._fail(row_number, values["sku"], [str(e.orig)])
+        if written:
+            await cache.invalidate("products", *(str(product_id) for product_id, _, _ in written))
+
+    async def _write(self, rows: List[Dict[str, Any]]) -> List[Tuple[Any, str, bool]]:
+        result = await self.db.execute(upsert_statement(rows))
+        written = result.all()
+        by_sku = {values["sku"]: values for values in rows}
+        events = []
+        for product_id, sku, is_new in written:
+            data = {**by_sku[sku], "id": product_id}
+            if not is_new:
+                del data["created_at"]  # the stored created_at is kept
+            events.append(("product.created" if is_new else "product.updated", data))
+        await record_events(self.db, events)
+        await self.db.commit()
+        inserted = sum(1 for _, _, is_new in written if is_new)
+        self.report.inserted += inserted
+        self.report.updated += len(written) - inserted
+        return written
+
+    def _fail(self, row_number: int, sku: Optional[str], errors: List[str]) -> None:
+        self.report.failed += 1
+        if len(self.report.errors) < settings.IMPORT_MAX_ERRORS:
+            self.report.errors.append(ImportRowError(row=row_number, sku=sku, errors=errors))
+
+
+async def import_products(
+    db: AsyncSession, chunks: AsyncIterator[bytes], fmt: str
+) -> ProductImportResponse:
+    """Upsert every valid record of an NDJSON or CSV byte stream."""
+    records = iter_csv(chunks) if fmt == "csv" else iter_ndjson(chunks)
+    report = await ProductImporter(db).run(records)
+    logger.info(
+        "products_imported",
+        received=report.received,
+        inserted=report.inserted,
+        updated=report.updated,
+        failed=report.failed,
+        duplicates=report.duplicates,
+    )
+    return report
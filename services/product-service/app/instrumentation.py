@@ -0,0 +1,211 @@
+# ============================================================
+# Product Service — Database Instrumentation
+# ============================================================
+#
+# SQLAlchemy engine and pool hooks that are cheap enough to stay on in
+# production:
+#
+#   product_db_statement_seconds{fingerprint,route}   per-statement latency
+#   product_db_rows_returned{fingerprint}             rows per statement
+#   product_db_pool_checkout_seconds{pool}            wait for a connection
+#   product_db_pool_in_use / _overflow / _size{pool}  read at scrape time
+#
+# A fingerprint is the statement with literals and IN-lists collapsed,
+# named "<verb> <table>:<hash>". Each new fingerprint is logged once
+# with its SQL so dashboards can be mapped back to queries. Statements
+# slower than DB_SLOW_QUERY_SECONDS are logged at the configured sample
+# rate, with the shape (types and lengths) of their bound parameters
+# but never the values.
+
+import hashlib
+import random
+import re
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, Optional
+
+from prometheus_client import Counter, Gauge, Histogram
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.config import settings
+from app.utils.logger import logger
+
+DB_STATEMENT_SECONDS = Histogram(
+    "product_db_statement_seconds",
+    "Statement execution time by fingerprint and route",
+    ["fingerprint", "route"],
+    buckets=[0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5],
+)
+DB_ROWS_RETURNED = Histogram(
+    "product_db_rows_returned",
+    "Rows returned (or affected) per statement",
+    ["fingerprint"],
+    buckets=[0, 1, 5, 10, 25, 50, 100, 250, 1000, 5000, 25000],
+)
+DB_SLOW_QUERIES = Counter(
+    "product_db_slow_queries_total",
+    "Statements slower than DB_SLOW_QUERY_SECONDS (logged or not)",
+    ["fingerprint"],
+)
+POOL_CHECKOUT_SECONDS = Histogram(
+    "product_db_pool_checkout_seconds",
+    "Time spent waiting for a pooled connection, including new connects",
+    ["pool"],
+    buckets=[0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30],
+)
+POOL_TIMEOUTS = Counter(
+    "product_db_pool_timeouts_total",
+    "Checkouts that gave up after pool_timeout",
+    ["pool"],
+)
+POOL_IN_USE = Gauge("product_db_pool_in_use", "Connections currently checked out", ["pool"])
+POOL_OVERFLOW = Gauge("product_db_pool_overflow", "Connections open beyond pool_size", ["pool"])
+POOL_SIZE = Gauge("product_db_pool_size", "Configured pool_size", ["pool"])
+
+# ASGI scope of the request being served; the route template labels statements
+request_scope: ContextVar[Optional[dict]] = ContextVar("request_scope", default=None)
+
+OTHER = "other"
+
+_LITERALS = re.compile(r"'(?:[^']|'')*'|(?<![\w$])\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LISTS = re.compile(r"\(\s*(?:\$\d+|\?)(?:\s*,\s*(?:\$\d+|\?))+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+_TARGET = re.compile(r"\b(?:FROM|INTO|UPDATE)\s+([\w.\"]+)", re.IGNORECASE)
+
+
+# ── Fingerprints ───────────────────────────────────────────
+def normalize(statement: str) -> str:
+    """Statement text with literals, IN-lists and whitespace collapsed."""
+    text = _LITERALS.sub("?", statement)
+    text = _PLACEHOLDER_LISTS.sub("(...)", text)
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def fingerprint(statement: str) -> str:
+    normalized = normalize(statement)
+    verb = normalized.split(" ", 1)[0].lower()
+    target = _TARGET.search(normalized)
+    table = target.group(1).strip('"') if target else "-"
+    digest = hashlib.blake2b(normalized.encode(), digest_size=4).hexdigest()
+    return f"{verb} {table}:{digest}"
+
+
+def parameter_shape(parameters: Any, executemany: bool = False) -> Any:
+    """Types and lengths of bound parameters, never their values."""
+    if executemany:
+        rows = list(parameters or ())
+        return {"executemany": len(rows), "row": parameter_shape(rows[0]) if rows else None}
+    if isinstance(parameters, dict):
+        return {key: _value_shape(value) for key, value in parameters.items()}
+    return [_value_shape(value) for value in parameters or ()]
+
+
+def _value_shape(value: Any) -> str:
+    if isinstance(value, (list, tuple, set)):
+        inner = type(next(iter(value))).__name__ if value else "?"
+        return f"{type(value).__name__}[{inner}]x{len(value)}"
+    return type(value).__name__
+
+
+class _Fingerprints:
+    """Statement text -> fingerprint label, with bounded label cardinality."""
+
+    def __init__(self, max_labels: int):
+        self.max_labels = max_labels
+        self._labels: set = set()
+        self._by_statement: Dict[str, str] = {}
+
+    def label(self, statement: str) -> str:
+        label = self._by_statement.get(statement)
+        if label is not None:
+            return label
+        label = fingerprint(statement)
+        if label not in self._labels:
+            if len(self._labels) >= self.max_labels:
+                label = OTHER
+            else:
+                self._labels.add(label)
+                logger.info("db_statement_fingerprint", fingerprint=label, sql=normalize(statement)[:2000])
+        if len(self._by_statement) >= 4 * self.max_labels:
+            self._by_statement.clear()  # many texts can share a label (IN-list lengths)
+        self._by_statement[statement] = label
+        return label
+
+
+def current_route() -> str:
+    scope = request_scope.get()
+    if scope is None:
+        return "background"
+    route = scope.get("route")
+    return route.path if route is not None else OTHER
+
+
+# ── Engine ─────────────────────────────────────────────────
+def instrument_engine(
+    engine,
+    max_fingerprints: int = settings.DB_MAX_FINGERPRINTS,
+    slow_seconds: float = settings.DB_SLOW_QUERY_SECONDS,
+    slow_sample_rate: float = settings.DB_SLOW_QUERY_SAMPLE_RATE,
+) -> None:
+    """Attach statement timing and pool gauges to an (async) engine.
+
+    Pool metrics are labelled with the engine's ``pool_logging_name``
+    ("primary" when unset).
+    """
+    target = getattr(engine, "sync_engine", engine)
+    fingerprints = _Fingerprints(max_fingerprints)
+
+    @event.listens_for(target, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        context._instrumentation_started = time.perf_counter()
+
+    @event.listens_for(target, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context._instrumentation_started
+        label = fingerprints.label(statement)
+        route = current_route()
+        DB_STATEMENT_SECONDS.labels(fingerprint=label, route=route).observe(elapsed)
+        rows = getattr(cursor, "rowcount", -1)
+        if rows is not None and rows >= 0:
+            DB_ROWS_RETURNED.labels(fingerprint=label).observe(rows)
+        if elapsed >= slow_seconds:
+            DB_SLOW_QUERIES.labels(fingerprint=label).inc()
+            if random.random() < slow_sample_rate:
+                logger.warning(
+                    "db_slow_query",
+                    fingerprint=label,
+                    route=route,
+                    duration_ms=round(elapsed * 1000, 2),
+                    rows=rows,
+                    sql=normalize(statement)[:2000],
+                    params=parameter_shape(parameters, executemany),
+                )
+
+    pool = target.pool
+    if hasattr(pool, "checkedout"):
+        name = pool_name(pool)
+        POOL_IN_USE.labels(pool=name).set_function(pool.checkedout)
+        POOL_OVERFLOW.labels(pool=name).set_function(lambda: max(pool.overflow(), 0))
+        POOL_SIZE.labels(pool=name).set_function(pool.size)
+
+
+# ── Pool ───────────────────────────────────────────────────
+def pool_name(pool) -> str:
+    # Survives pool.recreate(), unlike an attribute set on the instance
+    return getattr(pool, "_orig_logging_name", None) or "primary"
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long each checkout waited."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            POOL_TIMEOUTS.labels(pool=pool_name(self)).inc()
+            raise
+        finally:
+            POOL_CHECKOUT_SECONDS.labels(pool=pool_name(self)).observe(time.perf_counter() - started)
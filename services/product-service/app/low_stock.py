@@ -0,0 +1,158 @@
+# ============================================================
+# Product Service — Low-Stock Report & Alert Feed
+# ============================================================
+#
+# A product is low on stock while quantity <= low_stock_threshold.
+#
+# Report: GET /products/low-stock pages through low products by
+# (quantity, id) over the partial index idx_product_low_stock, which
+# holds only the low rows, so its cost follows the size of the report
+# rather than of the catalog.
+#
+# Alerts: every stock-changing write reads the row's previous quantity
+# and threshold in the same statement (the row lock taken by the write
+# makes them exact) and compares low-before with low-after. A crossing
+# is written to ``stock_alerts`` and to the outbox
+# (product.stock.low / product.stock.restocked) in the write's own
+# transaction, so nothing ever has to scan the catalog to find it.
+#
+# GET /products/low-stock/alerts is the polled feed. Alerts are ordered
+# by (writing transaction id, id) and only served once every older
+# transaction has finished, so an alert can never commit behind a
+# cursor a client has already moved past.
+#
+# create_all adds stock_alerts to existing databases but not the
+# partial index on products; ``python -m app.low_stock`` builds it
+# CONCURRENTLY, idempotently.
+
+import asyncio
+from typing import Iterable, Optional, Tuple
+from uuid import UUID
+
+from prometheus_client import Counter
+from sqlalchemy import BigInteger, and_, insert, literal, literal_column, select, text, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Product, StockAlert
+from app.outbox import record_events
+from app.utils.logger import logger
+
+STOCK_ALERTS = Counter(
+    "product_stock_alerts_total",
+    "Low-stock threshold crossings by direction (low, restocked)",
+    ["state"],
+)
+
+# Matches the partial index predicate, so the planner can use it
+LOW_STOCK = Product.quantity <= Product.low_stock_threshold
+
+# Transactions below this id have all committed or aborted
+SNAPSHOT_XMIN = literal_column("pg_snapshot_xmin(pg_current_snapshot())::text::bigint")
+
+MIGRATION = [
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_product_low_stock ON products (quantity, id) "
+    "WHERE quantity <= low_stock_threshold",
+]
+
+# (product_id, quantity, threshold, previous_quantity, previous_threshold)
+StockChange = Tuple[UUID, int, int, int, int]
+
+
+# ── Detection ──────────────────────────────────────────────
+def stock_update(product_id: UUID, values: dict):
+    """UPDATE of one product that also returns its previous stock state.
+
+    The previous values are read under FOR UPDATE, i.e. the version the
+    UPDATE then replaces. Returns ``previous_quantity`` and
+    ``previous_threshold``; add the product's columns with ``returning()``.
+    """
+    previous = (
+        select(
+            Product.id,
+            Product.quantity.label("previous_quantity"),
+            Product.low_stock_threshold.label("previous_threshold"),
+        )
+        .where(Product.id == product_id)
+        .with_for_update()
+        .cte("previous")
+    )
+    return (
+        update(Product)
+        .where(Product.id == previous.c.id)
+        .values(**values)
+        .returning(previous.c.previous_quantity, previous.c.previous_threshold)
+    )
+
+
+def crossing(quantity: int, threshold: int, previous_quantity: int, previous_threshold: int) -> Optional[str]:
+    """``"low"`` or ``"restocked"`` when the change crossed the threshold."""
+    was_low, is_low = previous_quantity <= previous_threshold, quantity <= threshold
+    if is_low and not was_low:
+        return "low"
+    if was_low and not is_low:
+        return "restocked"
+    return None
+
+
+async def record_crossings(db: AsyncSession, changes: Iterable[StockChange]) -> None:
+    """Write an alert and an outbox event for every change that crossed."""
+    rows = []
+    for product_id, quantity, threshold, previous_quantity, previous_threshold in changes:
+        state = crossing(quantity, threshold, previous_quantity, previous_threshold)
+        if state is not None:
+            rows.append({
+                "product_id": product_id, "state": state,
+                "quantity": quantity, "low_stock_threshold": threshold,
+            })
+    if not rows:
+        return
+    await db.execute(insert(StockAlert), rows)
+    await record_events(db, [
+        (f"product.stock.{row['state']}", {
+            "id": row["product_id"], "quantity": row["quantity"], "low_stock_threshold": row["low_stock_threshold"],
+        })
+        for row in rows
+    ])
+    for row in rows:
+        STOCK_ALERTS.labels(state=row["state"]).inc()
+
+
+# ── Feed ───────────────────────────────────────────────────
+def alerts_statement(after: Optional[Tuple[int, int]], limit: int):
+    """Settled alerts past ``after`` (a ``(txid, id)`` key), oldest first."""
+    conditions = [StockAlert.txid < SNAPSHOT_XMIN]
+    if after is not None:
+        bound = tuple_(*(literal(value, BigInteger) for value in after))  # txids outgrow INTEGER
+        conditions.append(tuple_(StockAlert.txid, StockAlert.id) > bound)
+    return (
+        select(StockAlert)
+        .where(and_(*conditions))
+        .order_by(StockAlert.txid, StockAlert.id)
+        .limit(limit)
+    )
+
+
+def alert_dict(alert: StockAlert) -> dict:
+    return {
+        "id": alert.id,
+        "product_id": alert.product_id,
+        "state": alert.state,
+        "quantity": alert.quantity,
+        "low_stock_threshold": alert.low_stock_threshold,
+        "created_at": alert.created_at,
+    }
+
+
+async def migrate(engine) -> None:
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        for statement in MIGRATION:
+            await conn.execute(text(statement))
+    logger.info("low_stock_index_migrated")
+
+
+if __name__ == "__main__":
+    from app.database import engine
+
+    asyncio.run(migrate(engine))
@@ -2,18 +2,25 @@
 # Product Service — FastAPI Main Application
 # ============================================================
 
-import time
-import uuid
+import asyncio
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI, Request, Response
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from prometheus_fastapi_instrumentator import Instrumentator
+from sqlalchemy import text
 
+from app.cache import cache
 from app.config import settings
-from app.database import engine, Base
-from app.routers import products, categories
-from app.utils.logger import logger
+from app.database import engine
+from app.middleware import RequestContextMiddleware
+from app.outbox import AmqpPublisher, relay
+from app.projection import dumps
+from app.replicas import replicas
+from app.routers import products, categories, changes
+from app.snapshot import snapshot
+from app.startup import create_schema, should_create_schema, startup, warm_up
+from app.utils.logger import logger, sink
 
 
 @asynccontextmanager
@@ -21,16 +28,42 @@ async def lifespan(app: FastAPI):
     """Application lifespan manager — startup and shutdown events."""
     logger.info("🚀 Starting Product Service...")
 
-    # Create database tables
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
-    logger.info("✅ Database tables created")
+    # Production schemas are migrated; create_all only costs round trips there
+    if should_create_schema():
+        async with startup.phase("schema"):
+            await create_schema(engine)
+        logger.info("✅ Database tables created")
+
+    async with startup.phase("cache"):
+        await cache.connect()
+    async with startup.phase("replicas"):
+        await replicas.start()
+    if settings.OUTBOX_RELAY_ENABLED:
+        # Connects lazily and retries, so a broker outage never blocks startup
+        await relay.start(AmqpPublisher())
+
+    # Serve /health while warming up; /ready waits for it
+    warmup = asyncio.create_task(warm_up(
+        app,
+        [engine] + [replica.engine for replica in replicas.replicas],
+        snapshot if settings.SNAPSHOT_ENABLED else None,
+    ))
 
     yield
 
     # Shutdown
     logger.info("🛑 Shutting down Product Service...")
+    warmup.cancel()
+    try:
+        await warmup
+    except asyncio.CancelledError:
+        pass
+    await relay.stop()
+    await snapshot.stop()
+    await replicas.stop()
+    await cache.close()
     await engine.dispose()
+    sink.close()
 
 
 # Create FastAPI app
@@ -55,28 +88,8 @@ app.add_middleware(
 # ── Prometheus Metrics ─────────────────────────────────────
 Instrumentator().instrument(app).expose(app)
 
-# ── Request ID Middleware ──────────────────────────────────
-@app.middleware("http")
-async def add_request_id(request: Request, call_next):
-    request_id = request.headers.get("X-Request-ID", str(uuid.uuid4()))
-    start_time = time.time()
-
-    response: Response = await call_next(request)
-
-    process_time = time.time() - start_time
-    response.headers["X-Request-ID"] = request_id
-    response.headers["X-Process-Time"] = str(round(process_time, 4))
-
-    logger.info(
-        "request_completed",
-        method=request.method,
-        path=request.url.path,
-        status_code=response.status_code,
-        process_time=round(process_time, 4),
-        request_id=request_id,
-    )
-
-    return response
+# ── Request ID / Timing Middleware ─────────────────────────
+app.add_middleware(RequestContextMiddleware)
 
 
 # ── Health Check ───────────────────────────────────────────
@@ -92,13 +105,19 @@ async def health_check():
 # ── Readiness Check ───────────────────────────────────────
 @app.get("/ready", tags=["Health"])
 async def readiness_check():
+    if not startup.ready:
+        return Response(
+            content=dumps({"status": "warming up", "phases": startup.phases}),
+            status_code=503,
+            media_type="application/json",
+        )
     try:
         async with engine.connect() as conn:
-            await conn.execute("SELECT 1")
-        return {"status": "ready"}
+            await conn.execute(text("SELECT 1"))
+        return {"status": "ready", "startup": startup.phases}
     except Exception as e:
         return Response(
-            content=f'{{"status": "not ready", "error": "{str(e)}"}}',
+            content=dumps({"status": "not ready", "error": str(e)}),
             status_code=503,
             media_type="application/json",
         )
@@ -107,6 +126,8 @@ async def readiness_check():
 # ── Register Routers ──────────────────────────────────────
 app.include_router(products.router, prefix="/products", tags=["Products"])
 app.include_router(categories.router, prefix="/categories", tags=["Categories"])
+app.include_router(changes.router, prefix="/changes", tags=["Changes"])
 # Also mount at root for API gateway proxy
 app.include_router(products.router, prefix="/api/products", tags=["Products"])
 app.include_router(categories.router, prefix="/api/categories", tags=["Categories"])
+app.include_router(changes.router, prefix="/api/changes", tags=["Changes"])
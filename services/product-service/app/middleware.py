@@ -0,0 +1,79 @@
+# ============================================================
+# Product Service — Request Context Middleware
+# ============================================================
+#
+# Pure ASGI replacement for the old @app.middleware("http") wrapper:
+# no per-request task, body streaming or Request/Response objects. It
+# adds X-Request-ID, X-Process-Time (time to response start) and the
+# replica consistency token to the response headers, binds request_id
+# into the structlog context, and logs request_completed once the body
+# has been sent. Fast, successful requests are logged at
+# LOG_REQUEST_SAMPLE_RATE; errors and slow requests always are.
+
+import random
+import time
+import uuid
+
+import structlog
+
+from app.config import settings
+from app.instrumentation import request_scope
+from app.replicas import CONSISTENCY_HEADER
+from app.utils.logger import logger
+
+REQUEST_ID_HEADER = b"x-request-id"
+
+
+class RequestContextMiddleware:
+    def __init__(
+        self,
+        app,
+        sample_rate: float = settings.LOG_REQUEST_SAMPLE_RATE,
+        slow_seconds: float = settings.LOG_SLOW_REQUEST_SECONDS,
+    ):
+        self.app = app
+        self.sample_rate = sample_rate
+        self.slow_seconds = slow_seconds
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        request_id = None
+        for name, value in scope["headers"]:
+            if name == REQUEST_ID_HEADER:
+                request_id = value.decode("latin-1")
+                break
+        request_id = request_id or str(uuid.uuid4())
+        request_scope.set(scope)  # Routing fills in scope["route"] for DB metrics
+        structlog.contextvars.bind_contextvars(request_id=request_id)
+        status_code = 500
+
+        async def send_with_headers(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"x-request-id", request_id.encode("latin-1")))
+                headers.append((b"x-process-time", b"%.4f" % (time.perf_counter() - started)))
+                token = scope.get("state", {}).get("consistency_token")
+                if token:
+                    headers.append((CONSISTENCY_HEADER.lower().encode(), token.encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_headers)
+        finally:
+            elapsed = time.perf_counter() - started
+            if status_code >= 500 or elapsed >= self.slow_seconds or random.random() < self.sample_rate:
+                logger.info(
+                    "request_completed",
+                    method=scope["method"],
+                    path=scope["path"],
+                    status_code=status_code,
+                    process_time=round(elapsed, 4),
+                )
+            structlog.contextvars.unbind_contextvars("request_id")
@@ -6,14 +6,33 @@ import uuid
 from datetime import datetime
 
 from sqlalchemy import (
-    Column, String, Text, Float, Integer, Boolean,
-    DateTime, ForeignKey, Index, CheckConstraint,
+    Column, String, Text, Float, Integer, BigInteger, Boolean,
+    DateTime, ForeignKey, Index, CheckConstraint, Computed, Sequence, text,
 )
-from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship
+from sqlalchemy.dialects.postgresql import ARRAY, TSVECTOR, UUID
+from sqlalchemy.orm import deferred, relationship
 
 from app.database import Base
 
+# Text search configuration shared by the stored tsvector and queries
+SEARCH_CONFIG = "english"
+
+# Generated expression behind products.search_vector
+SEARCH_VECTOR_SQL = (
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(name, '')), 'A') || "
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(tags, '')), 'B') || "
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(description, '')), 'C')"
+)
+
+# Generated expression behind products.tag_list
+TAG_LIST_SQL = r"array_remove(regexp_split_to_array(lower(btrim(coalesce(tags, ''))), '\s*,\s*'), '')"
+
+# Id of the writing transaction, as a comparable bigint
+CURRENT_TXID_SQL = "pg_current_xact_id()::text::bigint"
+
+# Orders catalog changes within a transaction; see app/changes.py
+CATALOG_CHANGE_SEQ = Sequence("catalog_change_seq", metadata=Base.metadata)
+
 
 class Category(Base):
     __tablename__ = "categories"
@@ -26,8 +45,20 @@ class Category(Base):
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
-    # Relationships
-    products = relationship("Product", back_populates="category", lazy="selectin")
+    # Change feed position, stamped by a trigger on every insert and update
+    change_txid = deferred(Column(BigInteger, nullable=False, server_default=text(CURRENT_TXID_SQL)))
+    change_seq = deferred(Column(BigInteger, nullable=False, server_default=CATALOG_CHANGE_SEQ.next_value()))
+
+    __table_args__ = (
+        Index("idx_category_change", "change_txid", "change_seq"),
+    )
+
+    # Relationships. Never loaded implicitly: a category can own tens of
+    # thousands of products, and the DB's ON DELETE SET NULL handles
+    # deletes. Use an explicit query (or selectinload) when needed.
+    products = relationship(
+        "Product", back_populates="category", lazy="raise", passive_deletes=True
+    )
 
     def __repr__(self):
         return f"<Category(name='{self.name}')>"
@@ -52,6 +83,19 @@ class Product(Base):
     image_url = Column(String(500), nullable=True)
     tags = Column(String(500), nullable=True)  # Comma-separated tags
 
+    # Full-text search document, maintained by Postgres on every write.
+    # Deferred so listings never ship it over the wire.
+    search_vector = deferred(Column(TSVECTOR, Computed(SEARCH_VECTOR_SQL, persisted=True)))
+
+    # Normalized tags (trimmed, lower-case, no empties) derived from the
+    # comma-separated string, which stays the API contract. GIN indexed
+    # for the tags= filter and the tag cloud.
+    tag_list = deferred(Column(
+        ARRAY(Text),
+        Computed(TAG_LIST_SQL, persisted=True),
+        nullable=False,
+    ))
+
     # Foreign Keys
     category_id = Column(
         UUID(as_uuid=True),
@@ -64,6 +108,11 @@ class Product(Base):
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    # Change feed position, stamped by a trigger on every insert and
+    # update, including ON DELETE SET NULL from a deleted category
+    change_txid = deferred(Column(BigInteger, nullable=False, server_default=text(CURRENT_TXID_SQL)))
+    change_seq = deferred(Column(BigInteger, nullable=False, server_default=CATALOG_CHANGE_SEQ.next_value()))
+
     # Relationships
     category = relationship("Category", back_populates="products")
 
@@ -73,7 +122,81 @@ class Product(Base):
         CheckConstraint("quantity >= 0", name="check_quantity_positive"),
         Index("idx_product_category_active", "category_id", "is_active"),
         Index("idx_product_price_range", "price", "is_active"),
+        # Keyset pagination: one (sort key, id) index per sortable column
+        Index("idx_product_created_at_id", "created_at", "id"),
+        Index("idx_product_price_id", "price", "id"),
+        Index("idx_product_name_id", "name", "id"),
+        Index("idx_product_quantity_id", "quantity", "id"),
+        # Change feed: (transaction, sequence) order
+        Index("idx_product_change", "change_txid", "change_seq"),
+        # Low-stock report and its keyset paging; only low rows are indexed
+        Index(
+            "idx_product_low_stock", "quantity", "id",
+            postgresql_where=text("quantity <= low_stock_threshold"),
+        ),
+        # Search: GIN over the tsvector, trigram GIN for typo-tolerant names
+        Index("idx_product_search_vector", "search_vector", postgresql_using="gin"),
+        Index("idx_product_tag_list", "tag_list", postgresql_using="gin"),
+        Index(
+            "idx_product_name_trgm", "name",
+            postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"},
+        ),
     )
 
     def __repr__(self):
         return f"<Product(name='{self.name}', sku='{self.sku}')>"
+
+
+class OutboxEvent(Base):
+    """Domain event written with the change it describes; see app/outbox.py."""
+
+    __tablename__ = "outbox_events"
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    routing_key = Column(String(100), nullable=False)
+    payload = Column(Text, nullable=False)  # Serialized message body
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f"<OutboxEvent(id={self.id}, routing_key='{self.routing_key}')>"
+
+
+class StockAlert(Base):
+    """A product crossing its low_stock_threshold; see app/low_stock.py."""
+
+    __tablename__ = "stock_alerts"
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    product_id = Column(UUID(as_uuid=True), nullable=False, index=True)
+    state = Column(String(20), nullable=False)  # "low" or "restocked"
+    quantity = Column(Integer, nullable=False)
+    low_stock_threshold = Column(Integer, nullable=False)
+    # Writing transaction; the feed only serves rows no older transaction can precede
+    txid = Column(BigInteger, nullable=False, server_default=text(CURRENT_TXID_SQL))
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        Index("idx_stock_alert_txid_id", "txid", "id"),
+    )
+
+    def __repr__(self):
+        return f"<StockAlert(id={self.id}, product_id='{self.product_id}', state='{self.state}')>"
+
+
+class CatalogTombstone(Base):
+    """A deleted product or category, written by trigger; see app/changes.py."""
+
+    __tablename__ = "catalog_tombstones"
+
+    id = Column(BigInteger, primary_key=True, server_default=CATALOG_CHANGE_SEQ.next_value())
+    entity = Column(String(20), nullable=False)  # "product" or "category"
+    entity_id = Column(UUID(as_uuid=True), nullable=False)
+    txid = Column(BigInteger, nullable=False, server_default=text(CURRENT_TXID_SQL))
+    deleted_at = Column(DateTime, nullable=False, server_default=text("(now() at time zone 'utc')"))
+
+    __table_args__ = (
+        Index("idx_catalog_tombstone_txid_id", "txid", "id"),
+    )
+
+    def __repr__(self):
+        return f"<CatalogTombstone(entity='{self.entity}', entity_id='{self.entity_id}')>"
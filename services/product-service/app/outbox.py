@@ -0,0 +1,228 @@
+# ============================================================
+# Product Service — Transactional Event Outbox
+# ============================================================
+#
+# Write paths never talk to RabbitMQ. They insert their domain events
+# into ``outbox_events`` inside the request transaction, so an event
+# exists if and only if its change committed. A background relay then
+# drains the table in id order:
+#
+#   BEGIN; pg_try_advisory_xact_lock(...)     -- one relay at a time
+#   SELECT ... ORDER BY id LIMIT OUTBOX_BATCH_SIZE
+#   publish the batch, await every publisher confirm
+#   DELETE the published ids; COMMIT
+#
+# A failed or unconfirmed publish rolls the batch back and it is
+# retried with backoff. Delivery is therefore at-least-once; each
+# message carries its outbox id as message_id for de-duplication.
+
+import asyncio
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import aio_pika
+from prometheus_client import Counter, Gauge, Histogram
+from sqlalchemy import BigInteger, any_, bindparam, delete, func, insert, select
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import after_commit, async_session
+from app.models import OutboxEvent
+from app.projection import PRODUCT_FIELDS, dumps
+from app.utils.logger import logger
+
+OUTBOX_PUBLISHED = Counter(
+    "product_outbox_published_total",
+    "Domain events published and confirmed by the broker",
+    ["routing_key"],
+)
+OUTBOX_FAILURES = Counter(
+    "product_outbox_publish_failures_total",
+    "Relay rounds that failed and will be retried",
+)
+OUTBOX_BACKLOG = Gauge("product_outbox_backlog", "Events waiting in the outbox")
+OUTBOX_LAG = Gauge(
+    "product_outbox_lag_seconds",
+    "Age of the oldest unpublished event at the last relay round",
+)
+OUTBOX_DELIVERY_SECONDS = Histogram(
+    "product_outbox_delivery_seconds",
+    "Time from an event being recorded to its publish being confirmed",
+    buckets=[0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300],
+)
+
+# Key for pg_try_advisory_xact_lock ("outbox" in ASCII)
+RELAY_LOCK_ID = 0x6F7574626F78
+
+# Event payloads carry the product columns, not the nested category
+PRODUCT_EVENT_FIELDS = [name for name in PRODUCT_FIELDS if name != "category"]
+
+Event = Tuple[str, Dict[str, Any]]
+
+
+# ── Recording ──────────────────────────────────────────────
+def product_data(product: Dict[str, Any]) -> Dict[str, Any]:
+    return {name: product[name] for name in PRODUCT_EVENT_FIELDS}
+
+
+def envelope(routing_key: str, data: Dict[str, Any]) -> str:
+    """Message body, in the same shape the other services publish."""
+    return dumps({
+        "event": routing_key,
+        "data": data,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "service": "product-service",
+    }).decode()
+
+
+async def record_events(db: AsyncSession, events: Iterable[Event]) -> None:
+    """Queue events in ``db``'s transaction; they are published after commit."""
+    rows = [{"routing_key": key, "payload": envelope(key, data)} for key, data in events]
+    if not rows:
+        return
+    await db.execute(insert(OutboxEvent), rows)
+    after_commit(db, relay.notify)
+
+
+# ── Publishing ─────────────────────────────────────────────
+class AmqpPublisher:
+    """Publishes to a durable topic exchange on a confirming channel."""
+
+    def __init__(self, url: str = settings.RABBITMQ_URL, exchange: str = settings.OUTBOX_EXCHANGE):
+        self.url = url
+        self.exchange_name = exchange
+        self._connection = None
+        self._exchange = None
+
+    async def connect(self) -> None:
+        self._connection = await aio_pika.connect_robust(self.url)
+        channel = await self._connection.channel(publisher_confirms=True)
+        self._exchange = await channel.declare_exchange(
+            self.exchange_name, aio_pika.ExchangeType.TOPIC, durable=True
+        )
+        logger.info("✅ Outbox relay connected to RabbitMQ")
+
+    async def publish(self, messages: List[Tuple[str, str, str]]) -> None:
+        """Publish ``(routing_key, body, message_id)`` triples; returns once all are confirmed."""
+        if self._exchange is None:
+            await self.connect()
+        # Publishes are pipelined; each awaitable resolves on its confirm
+        await asyncio.gather(*(
+            self._exchange.publish(
+                aio_pika.Message(
+                    body.encode(),
+                    content_type="application/json",
+                    delivery_mode=aio_pika.DeliveryMode.PERSISTENT,
+                    message_id=message_id,
+                ),
+                routing_key=routing_key,
+                mandatory=False,  # Unbound routing keys are not an error
+            )
+            for routing_key, body, message_id in messages
+        ))
+
+    async def close(self) -> None:
+        if self._connection is not None:
+            await self._connection.close()
+            self._connection = self._exchange = None
+
+
+# ── Relay ──────────────────────────────────────────────────
+class OutboxRelay:
+    """Background task moving committed events from Postgres to the broker."""
+
+    def __init__(
+        self,
+        session_factory=async_session,
+        batch_size: int = settings.OUTBOX_BATCH_SIZE,
+        interval: float = settings.OUTBOX_POLL_INTERVAL,
+        max_backoff: float = settings.OUTBOX_MAX_BACKOFF,
+    ):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.interval = interval
+        self.max_backoff = max_backoff
+        self.publisher = None
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    async def notify(self) -> None:
+        """Wake the relay now instead of at the next poll."""
+        self._wake.set()
+
+    async def start(self, publisher) -> None:
+        self.publisher = publisher
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self.publisher is not None:
+            await self.publisher.close()
+
+    async def _run(self) -> None:
+        backoff = self.interval
+        while True:
+            try:
+                published = await self.relay_batch()
+            except Exception as e:
+                OUTBOX_FAILURES.inc()
+                logger.warning("outbox_relay_failed", error=str(e), retry_in=backoff)
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, self.max_backoff)
+                continue
+            backoff = self.interval
+            if published < self.batch_size:
+                # asyncio.timeout, unlike wait_for, never swallows a cancel
+                try:
+                    async with asyncio.timeout(self.interval):
+                        await self._wake.wait()
+                except TimeoutError:
+                    pass
+                self._wake.clear()
+
+    async def relay_batch(self) -> int:
+        """Publish and delete up to one batch; returns the number published."""
+        async with self.session_factory() as session:
+            async with session.begin():
+                locked = await session.execute(select(func.pg_try_advisory_xact_lock(RELAY_LOCK_ID)))
+                if not locked.scalar():
+                    return 0  # another pod is relaying
+                result = await session.execute(
+                    select(OutboxEvent.id, OutboxEvent.routing_key, OutboxEvent.payload, OutboxEvent.created_at)
+                    .order_by(OutboxEvent.id)
+                    .limit(self.batch_size)
+                )
+                rows = result.all()
+                if not rows:
+                    OUTBOX_BACKLOG.set(0)
+                    OUTBOX_LAG.set(0)
+                    return 0
+
+                OUTBOX_LAG.set((datetime.utcnow() - rows[0].created_at).total_seconds())
+                await self.publisher.publish([(row.routing_key, row.payload, str(row.id)) for row in rows])
+                confirmed = datetime.utcnow()
+
+                # Delete exactly what was sent; a lower id may still commit later
+                ids = [row.id for row in rows]
+                await session.execute(
+                    delete(OutboxEvent).where(
+                        OutboxEvent.id == any_(bindparam("ids", ids, type_=ARRAY(BigInteger)))
+                    )
+                )
+                backlog = await session.execute(select(func.count()).select_from(OutboxEvent))
+                OUTBOX_BACKLOG.set(backlog.scalar() or 0)
+
+        for row in rows:
+            OUTBOX_PUBLISHED.labels(routing_key=row.routing_key).inc()
+            OUTBOX_DELIVERY_SECONDS.observe((confirmed - row.created_at).total_seconds())
+        return len(rows)
+
+
+relay = OutboxRelay()
@@ -0,0 +1,125 @@
+# ============================================================
+# Product Service — Keyset Pagination
+# ============================================================
+#
+# Cursors are opaque, URL-safe tokens holding the sort key of the last
+# row on a page plus its id as a tiebreaker. The next page is fetched
+# with a row-value comparison, (sort_col, id) > (value, id), which an
+# index on (sort_col, id) serves at the same cost at any depth.
+#
+# Totals come from one of three count modes: "exact" runs COUNT(*),
+# "estimated" reads the planner's row estimate from EXPLAIN, and
+# "cached" memoizes exact counts per filter signature in the response
+# cache, where product/category writes retire them.
+
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+from app.cache import cache
+from app.config import settings
+
+COUNT_MODE_PATTERN = "^(exact|estimated|cached)$"
+
+
+def encode_cursor(sort_by: str, sort_order: str, value: Any, row_id: Any) -> str:
+    """Build the opaque cursor pointing just past the given row."""
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    payload = {"s": sort_by, "o": sort_order, "v": value, "id": str(row_id)}
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str, sort_column, id_column, sort_by: str, sort_order: str) -> Tuple[Any, Any]:
+    """Decode a cursor into typed ``(sort_value, id)`` for the current sort."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        if payload["s"] != sort_by or payload["o"] != sort_order:
+            raise ValueError("cursor was issued for a different sort")
+        return _coerce(sort_column, payload["v"]), _coerce(id_column, payload["id"])
+    except (ValueError, KeyError, TypeError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid cursor: {e}")
+
+
+def keyset_condition(sort_column, id_column, key: Tuple[Any, Any], sort_order: str):
+    """Row-value predicate selecting rows strictly after ``key``."""
+    row, bound = tuple_(sort_column, id_column), tuple_(*key)
+    return row < bound if sort_order == "desc" else row > bound
+
+
+def keyset_order(sort_column, id_column, sort_order: str) -> list:
+    """ORDER BY clauses matching :func:`keyset_condition`."""
+    if sort_order == "desc":
+        return [sort_column.desc(), id_column.desc()]
+    return [sort_column.asc(), id_column.asc()]
+
+
+def _coerce(column, value: Any) -> Any:
+    python_type = column.type.python_type
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    return python_type(value)
+
+
+class Explain(Executable, ClauseElement):
+    """``EXPLAIN (FORMAT JSON)`` wrapper that keeps bound parameters intact."""
+
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+
+@compiles(Explain, "postgresql")
+def _compile_explain(element, compiler, **kw):
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+async def count_total(
+    db: AsyncSession,
+    id_column,
+    conditions: List[Any],
+    count_mode: str,
+    namespace: str,
+    filters: dict,
+    params: Optional[dict] = None,
+) -> int:
+    """Count rows matching ``conditions`` using the requested count mode.
+
+    ``params`` supplies values for any bindparam()s in ``conditions``.
+    """
+    if count_mode == "estimated":
+        return await estimate_rows(db, select(id_column).where(*conditions), params)
+
+    async def exact() -> int:
+        result = await db.execute(select(func.count(id_column)).where(*conditions), params)
+        return result.scalar() or 0
+
+    if count_mode == "cached":
+        async def load() -> bytes:
+            return str(await exact()).encode()
+
+        body = await cache.get_listing(
+            namespace, {"count": filters}, load, ttl=settings.COUNT_CACHE_TTL
+        )
+        return int(body)
+
+    return await exact()
+
+
+async def estimate_rows(db: AsyncSession, query, params: Optional[dict] = None) -> int:
+    """Planner row estimate for ``query``; no rows are read."""
+    result = await db.execute(Explain(query), params)
+    plan = result.scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
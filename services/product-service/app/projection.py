@@ -0,0 +1,85 @@
+# ============================================================
+# Product Service — Product Projection & Fast Serialization
+# ============================================================
+#
+# Read endpoints select plain columns (never ORM entities) and turn
+# rows straight into JSON bytes with orjson. The output matches
+# ProductResponse field for field, but skips ORM instantiation,
+# per-row Pydantic validation and FastAPI's response-model pass.
+# ``fields=`` narrows both the SELECT list and the output; the nested
+# ``category`` object is fetched with a LEFT JOIN only when requested.
+# Writes answer the same way: ``returning_product`` joins the written
+# row to its category in the writing statement itself.
+
+from typing import Any, Dict, List, Optional, Tuple
+
+import orjson
+from fastapi import HTTPException
+from sqlalchemy import select
+
+from app.models import Category, Product
+from app.schemas import CategoryResponse, ProductResponse
+
+PRODUCT_FIELDS: List[str] = list(ProductResponse.model_fields)
+CATEGORY_FIELDS: List[str] = list(CategoryResponse.model_fields)
+CATEGORY_PREFIX = "category__"
+
+
+def parse_fields(fields: Optional[str]) -> List[str]:
+    """Validate a comma-separated ``fields`` value, keeping response order."""
+    if not fields:
+        return PRODUCT_FIELDS
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = requested.difference(PRODUCT_FIELDS)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+    return [name for name in PRODUCT_FIELDS if name in requested]
+
+
+def product_select(fields: List[str], *extra) -> Tuple[Any, bool]:
+    """SELECT for the given output fields plus ``extra`` columns.
+
+    ``id`` is always selected (lookups and cursors need it). Returns the
+    statement and whether the category join is part of it.
+    """
+    columns = [getattr(Product, name) for name in fields if name not in ("id", "category")]
+    columns.insert(0, Product.id)
+    with_category = "category" in fields
+    if with_category:
+        columns += [getattr(Category, name).label(CATEGORY_PREFIX + name) for name in CATEGORY_FIELDS]
+    query = select(*columns, *extra)
+    if with_category:
+        query = query.outerjoin(Category, Product.category_id == Category.id)
+    return query, with_category
+
+
+def returning_product(write) -> Any:
+    """SELECT every output field of the product ``write`` inserts or updates.
+
+    ``write`` runs as a CTE whose RETURNING row is LEFT JOINed to its
+    category, so the response needs no second query and no lazy load.
+    Columns ``write`` already returns are selected too.
+    """
+    columns = [getattr(Product, name) for name in PRODUCT_FIELDS if name != "category"]
+    written = write.returning(*columns).cte("written")
+    category = [getattr(Category, name).label(CATEGORY_PREFIX + name) for name in CATEGORY_FIELDS]
+    return select(written, *category).outerjoin(Category, written.c.category_id == Category.id)
+
+
+def row_to_dict(row, fields: List[str]) -> Dict[str, Any]:
+    mapping = row._mapping
+    item = {}
+    for name in fields:
+        if name == "category":
+            if mapping[CATEGORY_PREFIX + "id"] is None:
+                item["category"] = None
+            else:
+                item["category"] = {f: mapping[CATEGORY_PREFIX + f] for f in CATEGORY_FIELDS}
+        else:
+            item[name] = mapping[name]
+    return item
+
+
+def dumps(payload: Any) -> bytes:
+    """Serialize to JSON bytes; UUIDs and datetimes are handled natively."""
+    return orjson.dumps(payload)
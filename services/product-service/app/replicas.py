@@ -0,0 +1,287 @@
+# ============================================================
+# Product Service — Read Replica Routing
+# ============================================================
+#
+# GET routes take their session from ``get_read_db``. The session binds
+# lazily: on its first query it picks a replica, round-robin over the
+# ones that are
+#
+#   * healthy, with replication lag under REPLICA_MAX_LAG;
+#   * past the client's consistency token, if it sent one. Writes
+#     answer with X-Consistency-Token (the primary WAL position after
+#     commit); a client that echoes it reads its own writes. Its reads
+#     also bypass this pod's cached copies (``reads_own_writes``), which
+#     may predate a write made through another pod;
+#   * past the last write to the route's cache namespace, when the
+#     route declares one with ``not_before``. Otherwise a lagging
+#     replica could refill the shared response cache with a body the
+#     write just invalidated.
+#
+# Anything else, including having no replicas configured, reads from
+# the primary. A background task re-checks every replica each
+# REPLICA_CHECK_INTERVAL; a connection error during a request marks
+# the replica down until its next successful check.
+#
+# ``get_read_db`` sessions are lean: they run in autocommit, so a
+# request costs no BEGIN and ROLLBACK round trips and there is no
+# transaction to commit or roll back. Under READ COMMITTED each
+# statement saw its own snapshot anyway. Streaming reads
+# (``read_session_factory``) keep a transaction, which server-side
+# cursors need.
+
+import asyncio
+import itertools
+import re
+from functools import cached_property
+from typing import List, Optional, Tuple
+
+from fastapi import Request
+from prometheus_client import Counter, Gauge
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError, InterfaceError, OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import create_engine, engine
+from app.utils.logger import logger
+
+CONSISTENCY_HEADER = "X-Consistency-Token"
+
+READ_ROUTING = Counter(
+    "product_db_read_routing_total",
+    "Read sessions by target (replica name or primary) and reason",
+    ["target", "reason"],
+)
+REPLICA_HEALTHY = Gauge(
+    "product_db_replica_healthy",
+    "1 when the replica passed its last health check",
+    ["replica"],
+)
+REPLICA_LAG = Gauge(
+    "product_db_replica_lag_seconds",
+    "Replication lag measured at the last health check",
+    ["replica"],
+)
+
+# Lag is zero while everything received has been replayed; otherwise it
+# is the age of the last replayed commit. A promoted replica reports its
+# own WAL position and no lag.
+HEALTH_QUERY = text("""
+    SELECT
+        CASE WHEN pg_is_in_recovery() THEN pg_last_wal_replay_lsn()
+             ELSE pg_current_wal_lsn() END::text AS lsn,
+        extract(epoch FROM CASE
+            WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn()
+                THEN now()
+            ELSE pg_last_xact_replay_timestamp() END) AS replayed_through,
+        extract(epoch FROM now()) AS checked_at
+""")
+
+_LSN = re.compile(r"([0-9A-Fa-f]{1,8})/([0-9A-Fa-f]{1,8})")
+
+
+def parse_lsn(value: Optional[str]) -> Optional[int]:
+    """``"16/B374D848"`` as a comparable integer; None if absent or malformed."""
+    match = _LSN.fullmatch(value.strip()) if value else None
+    if match is None:
+        return None
+    return (int(match.group(1), 16) << 32) | int(match.group(2), 16)
+
+
+class Replica:
+    """One read replica: its engine and the result of its last health check."""
+
+    def __init__(self, name: str, engine):
+        self.name = name
+        self.engine = engine
+        self.healthy = False
+        self.lsn: Optional[int] = None
+        self.replayed_through: Optional[float] = None  # Epoch seconds
+        self.lag: Optional[float] = None
+
+    @cached_property
+    def autocommit_engine(self):
+        return autocommit(self.engine)
+
+    async def check(self, max_lag: float, timeout: float) -> None:
+        try:
+            async with asyncio.timeout(timeout):
+                async with self.engine.connect() as conn:
+                    row = (await conn.execute(HEALTH_QUERY)).one()
+        except (DBAPIError, OSError, TimeoutError) as e:
+            self.mark_down(str(e) or type(e).__name__)
+            return
+        if row.replayed_through is None:  # nothing replayed yet
+            self.mark_down("no replayed transactions")
+            return
+        self.lsn = parse_lsn(row.lsn)
+        self.replayed_through = float(row.replayed_through)
+        self.lag = max(float(row.checked_at) - self.replayed_through, 0.0)
+        REPLICA_LAG.labels(replica=self.name).set(self.lag)
+        healthy = self.lag <= max_lag
+        if healthy != self.healthy:
+            logger.info("replica_health_changed", replica=self.name, healthy=healthy, lag=round(self.lag, 3))
+        self._set_healthy(healthy)
+
+    def mark_down(self, reason: str) -> None:
+        if self.healthy:
+            logger.warning("replica_down", replica=self.name, reason=reason)
+        self._set_healthy(False)
+
+    def _set_healthy(self, healthy: bool) -> None:
+        self.healthy = healthy
+        REPLICA_HEALTHY.labels(replica=self.name).set(1 if healthy else 0)
+
+
+class ReplicaSet:
+    """Picks a replica per read session and keeps replica health current."""
+
+    def __init__(
+        self,
+        urls: List[str] = settings.DATABASE_REPLICA_URLS,
+        max_lag: float = settings.REPLICA_MAX_LAG,
+        interval: float = settings.REPLICA_CHECK_INTERVAL,
+        timeout: float = settings.REPLICA_CHECK_TIMEOUT,
+    ):
+        self.replicas = [Replica(f"replica-{i}", create_engine(url, f"replica-{i}")) for i, url in enumerate(urls)]
+        self.max_lag = max_lag
+        self.interval = interval
+        self.timeout = timeout
+        self._turn = itertools.count()
+        self._task: Optional[asyncio.Task] = None
+
+    # ── Routing ────────────────────────────────────────────
+    def choose(self, min_lsn: Optional[int] = None, not_before: Optional[float] = None) -> Optional[Replica]:
+        """Next eligible replica, or None to read from the primary."""
+        candidates, reason = self._eligible(min_lsn, not_before)
+        if not candidates:
+            READ_ROUTING.labels(target="primary", reason=reason).inc()
+            return None
+        replica = candidates[next(self._turn) % len(candidates)]
+        READ_ROUTING.labels(target=replica.name, reason="balanced").inc()
+        return replica
+
+    def _eligible(self, min_lsn: Optional[int], not_before: Optional[float]) -> Tuple[List[Replica], str]:
+        if not self.replicas:
+            return [], "no_replicas"
+        candidates = [r for r in self.replicas if r.healthy]
+        if not candidates:
+            return [], "unhealthy"
+        if min_lsn is not None:
+            candidates = [r for r in candidates if r.lsn is not None and r.lsn >= min_lsn]
+            if not candidates:
+                return [], "token"
+        if not_before is not None:
+            candidates = [r for r in candidates if r.replayed_through >= not_before]
+            if not candidates:
+                return [], "recent_write"
+        return candidates, "balanced"
+
+    # ── Health ─────────────────────────────────────────────
+    async def check(self) -> None:
+        await asyncio.gather(*(replica.check(self.max_lag, self.timeout) for replica in self.replicas))
+
+    async def start(self) -> None:
+        if not self.replicas:
+            return
+        await self.check()  # route to healthy replicas from the first request
+        self._task = asyncio.create_task(self._run())
+        logger.info("✅ Read replicas configured", replicas=len(self.replicas),
+                    healthy=sum(r.healthy for r in self.replicas))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for replica in self.replicas:
+            await replica.engine.dispose()
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.check()
+            except Exception as e:
+                logger.warning("replica_check_failed", error=str(e))
+
+
+def autocommit(engine):
+    """Sync engine sharing ``engine``'s pool whose connections never BEGIN."""
+    return engine.sync_engine.execution_options(isolation_level="AUTOCOMMIT")
+
+
+replicas = ReplicaSet()
+primary_autocommit = autocommit(engine)
+
+
+# ── Sessions ───────────────────────────────────────────────
+class ReadSession(Session):
+    """Sync session behind read sessions; binds on first use, then sticks."""
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        bind = self.info.get("bind")
+        if bind is None:
+            replica = replicas.choose(self.info.get("min_lsn"), self.info.get("not_before"))
+            self.info["replica"] = replica
+            if self.info.get("autocommit"):
+                bind = replica.autocommit_engine if replica else primary_autocommit
+            else:
+                bind = (replica.engine if replica else engine).sync_engine
+            self.info["bind"] = bind
+        return bind
+
+
+read_session = async_sessionmaker(
+    class_=AsyncSession,
+    sync_session_class=ReadSession,
+    expire_on_commit=False,
+    autoflush=False,  # Read sessions never hold pending changes
+)
+
+
+def read_session_factory(request: Request, autocommit: bool = False):
+    """Session factory honouring the request's consistency token.
+
+    Transactional by default, for streaming reads; ``get_read_db`` asks
+    for ``autocommit``.
+    """
+    min_lsn = parse_lsn(request.headers.get(CONSISTENCY_HEADER))
+
+    def factory() -> AsyncSession:
+        session = read_session()
+        session.info["min_lsn"] = min_lsn
+        session.info["autocommit"] = autocommit
+        return session
+
+    return factory
+
+
+def reads_own_writes(request: Request) -> bool:
+    """Whether the client sent a consistency token; pass as the cache's ``fresh``."""
+    return parse_lsn(request.headers.get(CONSISTENCY_HEADER)) is not None
+
+
+def not_before(db: AsyncSession, version: Optional[Tuple[int, Optional[float]]]) -> None:
+    """Only read from replicas that have replayed the namespace's last write.
+
+    ``version`` is the cache namespace version; call before the first query.
+    """
+    if version is not None and version[1] is not None:
+        db.info["not_before"] = version[1]
+
+
+# Dependency for read-only routes
+async def get_read_db(request: Request):
+    async with read_session_factory(request, autocommit=True)() as session:
+        try:
+            yield session
+        except (OperationalError, InterfaceError) as e:
+            replica = session.info.get("replica")
+            if replica is not None:
+                replica.mark_down(str(e))
+            raise
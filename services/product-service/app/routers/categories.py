@@ -2,89 +2,197 @@
 # Product Service — Category Router
 # ============================================================
 
-import re
 import math
-from typing import Optional
+from functools import partial
+from typing import Optional, Union
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import select, func
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy import bindparam, delete, func, insert, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
-from app.models import Category
+from app.cache import cache, invalidate_category
+from app.conditional import (
+    json_response, listing_validators, not_modified, pack, resource_validators, unpack,
+)
+from app.database import after_commit, get_db
+from app.models import Category, Product
+from app.outbox import record_events
+from app.pagination import (
+    COUNT_MODE_PATTERN, count_total, decode_cursor, encode_cursor,
+    keyset_condition, keyset_order,
+)
+from app.replicas import get_read_db, not_before, reads_own_writes
 from app.schemas import (
     CategoryCreate, CategoryUpdate, CategoryResponse,
-    CategoryListResponse, PaginationMeta,
+    CategoryListResponse, CategoryProductCount, CategoryWithCountsResponse,
+    PaginationMeta,
 )
 from app.utils.logger import logger
+from app.utils.text import slugify
 
 router = APIRouter()
 
-
-def slugify(text: str) -> str:
-    """Convert text to URL-friendly slug."""
-    text = text.lower().strip()
-    text = re.sub(r"[^\w\s-]", "", text)
-    text = re.sub(r"[\s_-]+", "-", text)
-    return text
+INCLUDE_PATTERN = "^product_count$"
+
+
+async def with_product_counts(db: AsyncSession, categories) -> list:
+    """Attach total/active product counts using one aggregate query."""
+    ids = [c.id for c in categories]
+    counts = {}
+    if ids:
+        result = await db.execute(
+            select(
+                Product.category_id,
+                func.count(),
+                func.count().filter(Product.is_active),
+            )
+            .where(Product.category_id.in_(ids))
+            .group_by(Product.category_id)
+        )
+        counts = {row[0]: CategoryProductCount(total=row[1], active=row[2]) for row in result.all()}
+    return [
+        CategoryWithCountsResponse(
+            **CategoryResponse.model_validate(c).model_dump(),
+            product_count=counts.get(c.id, CategoryProductCount(total=0, active=0)),
+        )
+        for c in categories
+    ]
+
+
+def cache_namespace(include: Optional[str]) -> str:
+    # Responses embedding product counts must also go stale on product
+    # writes; category writes already bump the products generation.
+    return "products" if include else "categories"
 
 
 # ── List Categories ────────────────────────────────────────
 @router.get("/", response_model=CategoryListResponse)
 async def list_categories(
+    request: Request,
     page: int = Query(1, ge=1),
     limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from pagination.next_cursor"),
+    count_mode: str = Query("exact", regex=COUNT_MODE_PATTERN),
     is_active: Optional[bool] = True,
-    db: AsyncSession = Depends(get_db),
+    include: Optional[str] = Query(None, regex=INCLUDE_PATTERN),
+    db: AsyncSession = Depends(get_read_db),
 ):
-    """List all categories with pagination."""
-    conditions = []
-    if is_active is not None:
-        conditions.append(Category.is_active == is_active)
-
-    # Count total
-    count_query = select(func.count(Category.id))
-    for cond in conditions:
-        count_query = count_query.where(cond)
-    result = await db.execute(count_query)
-    total = result.scalar() or 0
-
-    # Fetch categories
-    query = select(Category).order_by(Category.name)
-    for cond in conditions:
-        query = query.where(cond)
-    query = query.offset((page - 1) * limit).limit(limit)
-
-    result = await db.execute(query)
-    categories = result.scalars().all()
-
-    return CategoryListResponse(
-        categories=[CategoryResponse.model_validate(c) for c in categories],
-        pagination=PaginationMeta(
-            page=page, limit=limit, total=total,
-            pages=math.ceil(total / limit) if total > 0 else 0,
-        ),
+    """List all categories with pagination.
+
+    ``include=product_count`` adds per-category product totals.
+    """
+    filters = dict(is_active=is_active)
+    params = dict(
+        filters, page=page, limit=limit, cursor=cursor, count_mode=count_mode,
+        include=include, resource="categories",
     )
+    namespace = cache_namespace(include)
+    fresh = reads_own_writes(request)
+    version = await cache.version(namespace, fresh=fresh)
+    validators = listing_validators(namespace, params, version)
+    early = not_modified(request, validators)
+    if early:
+        return early
+    not_before(db, version)
+
+    async def load() -> bytes:
+        conditions = []
+        if is_active is not None:
+            conditions.append(Category.is_active == is_active)
+
+        # Count total
+        total = await count_total(db, Category.id, conditions, count_mode, "categories", filters)
+
+        # Fetch categories
+        query = select(Category).order_by(*keyset_order(Category.name, Category.id, "asc"))
+        for cond in conditions:
+            query = query.where(cond)
+        if cursor:
+            key = decode_cursor(cursor, Category.name, Category.id, "name", "asc")
+            query = query.where(keyset_condition(Category.name, Category.id, key, "asc"))
+        else:
+            query = query.offset((page - 1) * limit)
+        query = query.limit(limit + 1)
+
+        result = await db.execute(query)
+        categories = result.scalars().all()
+
+        next_cursor = None
+        if len(categories) > limit:
+            categories = categories[:limit]
+            last = categories[-1]
+            next_cursor = encode_cursor("name", "asc", last.name, last.id)
+
+        if include:
+            items = await with_product_counts(db, categories)
+        else:
+            items = [CategoryResponse.model_validate(c) for c in categories]
+
+        return CategoryListResponse(
+            categories=items,
+            pagination=PaginationMeta(
+                page=None if cursor else page, limit=limit, total=total,
+                pages=math.ceil(total / limit) if total > 0 else 0,
+                count_mode=count_mode,
+                next_cursor=next_cursor,
+            ),
+        ).model_dump_json().encode()
+
+    body = await cache.get_listing(namespace, params, load, fresh=fresh)
+    return json_response(request, body, validators)
 
 
 # ── Get Category ──────────────────────────────────────────
-@router.get("/{category_id}", response_model=CategoryResponse)
-async def get_category(category_id: UUID, db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(Category).where(Category.id == category_id))
-    category = result.scalar_one_or_none()
-    if not category:
-        raise HTTPException(status_code=404, detail="Category not found")
-    return CategoryResponse.model_validate(category)
+CATEGORY_BY_ID = select(Category).where(Category.id == bindparam("category_id"))
+
+
+@router.get("/{category_id}", response_model=Union[CategoryWithCountsResponse, CategoryResponse])
+async def get_category(
+    category_id: UUID,
+    request: Request,
+    include: Optional[str] = Query(None, regex=INCLUDE_PATTERN),
+    db: AsyncSession = Depends(get_read_db),
+):
+    namespace = cache_namespace(include)
+    fresh = reads_own_writes(request)
+    version = await cache.version(namespace, fresh=fresh)
+    not_before(db, version)
+
+    async def load() -> bytes:
+        result = await db.execute(CATEGORY_BY_ID, {"category_id": category_id})
+        category = result.scalar_one_or_none()
+        if not category:
+            raise HTTPException(status_code=404, detail="Category not found")
+        if include:
+            (item,) = await with_product_counts(db, [category])
+            return item.model_dump_json().encode()
+        body = CategoryResponse.model_validate(category).model_dump_json().encode()
+        return pack(resource_validators(category.id, category.updated_at), body)
+
+    if include:
+        # Counts move with product writes, so validate on the namespace version
+        params = dict(id=category_id, include=include, resource="category")
+        validators = listing_validators(namespace, params, version)
+        early = not_modified(request, validators)
+        if early:
+            return early
+        body = await cache.get_listing(namespace, params, load, fresh=fresh)
+        return json_response(request, body, validators)
+
+    validators, body = unpack(await cache.get_item("categories", str(category_id), load, fresh=fresh))
+    return not_modified(request, validators) or json_response(request, body, validators)
 
 
 # ── Create Category ───────────────────────────────────────
 @router.post("/", response_model=CategoryResponse, status_code=201)
 async def create_category(data: CategoryCreate, db: AsyncSession = Depends(get_db)):
-    category = Category(**data.model_dump(), slug=slugify(data.name))
-    db.add(category)
-    await db.flush()
-    await db.refresh(category)
+    result = await db.execute(
+        insert(Category).values(**data.model_dump(), slug=slugify(data.name)).returning(Category)
+    )
+    category = result.scalar_one()
+    await record_events(db, [("category.created", CategoryResponse.model_validate(category).model_dump())])
+    after_commit(db, partial(invalidate_category, category.id))
     logger.info("category_created", category_id=str(category.id))
     return CategoryResponse.model_validate(category)
 
@@ -94,20 +202,23 @@ async def create_category(data: CategoryCreate, db: AsyncSession = Depends(get_d
 async def update_category(
     category_id: UUID, data: CategoryUpdate, db: AsyncSession = Depends(get_db)
 ):
-    result = await db.execute(select(Category).where(Category.id == category_id))
-    category = result.scalar_one_or_none()
-    if not category:
-        raise HTTPException(status_code=404, detail="Category not found")
-
     update_data = data.model_dump(exclude_unset=True)
     if "name" in update_data:
         update_data["slug"] = slugify(update_data["name"])
 
-    for key, value in update_data.items():
-        setattr(category, key, value)
+    result = await db.execute(
+        update(Category)
+        .where(Category.id == category_id)
+        .values(**update_data)
+        .returning(Category)
+        .execution_options(populate_existing=True)
+    )
+    category = result.scalar_one_or_none()
+    if not category:
+        raise HTTPException(status_code=404, detail="Category not found")
 
-    await db.flush()
-    await db.refresh(category)
+    await record_events(db, [("category.updated", CategoryResponse.model_validate(category).model_dump())])
+    after_commit(db, partial(invalidate_category, category_id))
     logger.info("category_updated", category_id=str(category_id))
     return CategoryResponse.model_validate(category)
 
@@ -115,9 +226,12 @@ async def update_category(
 # ── Delete Category ───────────────────────────────────────
 @router.delete("/{category_id}", status_code=204)
 async def delete_category(category_id: UUID, db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(Category).where(Category.id == category_id))
-    category = result.scalar_one_or_none()
-    if not category:
+    # products.category_id is cleared by the FK's ON DELETE SET NULL
+    result = await db.execute(
+        delete(Category).where(Category.id == category_id).returning(Category.id)
+    )
+    if result.scalar_one_or_none() is None:
         raise HTTPException(status_code=404, detail="Category not found")
-    await db.delete(category)
+    await record_events(db, [("category.deleted", {"id": category_id})])
+    after_commit(db, partial(invalidate_category, category_id))
     logger.info("category_deleted", category_id=str(category_id))
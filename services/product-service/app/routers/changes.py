@@ -0,0 +1,32 @@
+# ============================================================
+# Product Service — Change Feed Router
+# ============================================================
+
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.changes import decode_position, read_changes
+from app.config import settings
+from app.projection import dumps
+from app.replicas import get_read_db
+from app.schemas import CatalogChangeFeedResponse
+
+router = APIRouter()
+
+
+@router.get("/", response_model=CatalogChangeFeedResponse)
+async def catalog_changes(
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous call; omit for a full sync"),
+    limit: int = Query(500, ge=1, le=settings.CHANGE_FEED_MAX),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Products and categories changed or deleted since ``cursor``, oldest first.
+
+    Apply the changes in order and keep ``next_cursor``; call again
+    straight away while ``has_more`` is true.
+    """
+    after, since = decode_position(cursor) if cursor else (None, None)
+    page = await read_changes(db, after, limit, since)
+    return Response(content=dumps(page), media_type="application/json")
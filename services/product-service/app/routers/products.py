@@ -2,115 +2,458 @@
 # Product Service — Product Router
 # ============================================================
 
-import re
 import math
-from typing import Optional
+from functools import partial
+from typing import List, Optional, Tuple
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import select, func, and_
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Float, Integer, String, Text, and_, any_, bindparam, delete, or_
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID, insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
-from app.models import Product
+from app.cache import cache, invalidate_product
+from app.conditional import (
+    json_response, listing_validators, not_modified, pack, resource_validators, unpack,
+)
+from app.config import settings
+from app.database import after_commit, get_db
+from app.export import MEDIA_TYPES as EXPORT_MEDIA_TYPES, stream_export
+from app.facets import collect_facets, facet_statement, parse_facets
+from app.importer import import_products
+from app.low_stock import LOW_STOCK, alert_dict, alerts_statement, record_crossings, stock_update
+from app.models import Product, StockAlert
+from app.outbox import product_data, record_events
+from app.pagination import (
+    COUNT_MODE_PATTERN, count_total, decode_cursor, encode_cursor,
+    keyset_condition, keyset_order,
+)
+from app.projection import PRODUCT_FIELDS, dumps, parse_fields, product_select, returning_product, row_to_dict
+from app.replicas import get_read_db, not_before, read_session_factory, reads_own_writes
+from app.search import relevance, search_condition
+from app.snapshot import snapshot
+from app.statements import statements
 from app.schemas import (
     ProductCreate, ProductUpdate, ProductResponse,
-    ProductListResponse, PaginationMeta,
+    ProductListResponse, ProductImportResponse, ProductFacetsResponse, PaginationMeta,
+    TagCloudResponse,
+    ProductBatchRequest, ProductBatchResponse,
+    StockReservationRequest, StockReservationResponse, StockLevel, StockAlertFeedResponse,
 )
+from app.stock import ReservationFailed, reserve_stock
+from app.tags import TAGS_MATCH_PATTERN, parse_tags, tag_cloud_statement, tags_condition
 from app.utils.logger import logger
+from app.utils.text import slugify
 
 router = APIRouter()
 
 
-def slugify(text: str) -> str:
-    """Convert text to URL-friendly slug."""
-    text = text.lower().strip()
-    text = re.sub(r"[^\w\s-]", "", text)
-    text = re.sub(r"[\s_-]+", "-", text)
-    return text
+def product_conditions(
+    category_id: Optional[UUID] = None,
+    is_active: Optional[bool] = None,
+    is_featured: Optional[bool] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    search: Optional[str] = None,
+    tags: Optional[List[str]] = None,
+    tags_match: str = "any",
+) -> list:
+    """WHERE clauses shared by the listing-style endpoints.
+
+    Values may be bindparam()s, for statements built once per shape.
+    """
+    conditions = []
+    if _is_set(is_active):
+        conditions.append(Product.is_active == is_active)
+    if _is_set(is_featured):
+        conditions.append(Product.is_featured == is_featured)
+    if _is_set(category_id):
+        conditions.append(Product.category_id == category_id)
+    if _is_set(min_price):
+        conditions.append(Product.price >= min_price)
+    if _is_set(max_price):
+        conditions.append(Product.price <= max_price)
+    if _is_set(search):
+        conditions.append(search_condition(search))
+    if _is_set(tags):
+        conditions.append(tags_condition(tags, tags_match))
+    return conditions
+
+
+def _is_set(value) -> bool:
+    # An empty ?search= filters nothing
+    return value is not None and not (isinstance(value, str) and not value)
+
+
+# Parameter types of the filters bound into reusable statements. The
+# booleans stay literal (and part of the shape), as they always were,
+# so the planner keeps seeing is_active = true.
+FILTER_TYPES = {
+    "category_id": PG_UUID(as_uuid=True), "min_price": Float(), "max_price": Float(),
+    "search": String(), "tags": ARRAY(Text),
+}
+
+
+def bound_filters(filters: dict) -> Tuple[dict, dict, tuple]:
+    """Split ``filters`` into statement placeholders, their values and a shape key.
+
+    Set filters named in FILTER_TYPES become bindparam()s; everything
+    else is kept as is and identifies the shape.
+    """
+    placeholders, values = {}, {}
+    for name, value in filters.items():
+        if name in FILTER_TYPES and _is_set(value):
+            placeholders[name] = bindparam(name, type_=FILTER_TYPES[name])
+            values[name] = value
+        else:
+            placeholders[name] = None if name in FILTER_TYPES else value
+    shape = tuple(sorted((name, name in values or placeholders[name]) for name in placeholders))
+    return placeholders, values, shape
+
+
+def listing_statement(filters: dict, fields: List[str], sort_by: str, sort_order: str, keyed: bool):
+    """The list_products query for one shape, every value a bindparam.
+
+    Returns the statement and its WHERE conditions (for counting).
+    """
+    conditions = product_conditions(**filters)
+    sort_column = relevance(filters["search"]) if sort_by == "relevance" else getattr(Product, sort_by)
+    query, _ = product_select(fields, sort_column.label("sort_key"))
+    if conditions:
+        query = query.where(and_(*conditions))
+    query = query.order_by(*keyset_order(sort_column, Product.id, sort_order))
+    if keyed:
+        after = (bindparam("after_value", type_=sort_column.type), bindparam("after_id", type_=PG_UUID(as_uuid=True)))
+        query = query.where(keyset_condition(sort_column, Product.id, after, sort_order))
+    query = query.offset(bindparam("offset", type_=Integer)).limit(bindparam("limit", type_=Integer))
+    return query, conditions
 
 
 # ── List Products ──────────────────────────────────────────
 @router.get("/", response_model=ProductListResponse)
 async def list_products(
+    request: Request,
     page: int = Query(1, ge=1),
     limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from pagination.next_cursor"),
+    count_mode: str = Query("exact", regex=COUNT_MODE_PATTERN),
     category_id: Optional[UUID] = None,
     is_active: Optional[bool] = True,
     is_featured: Optional[bool] = None,
     min_price: Optional[float] = None,
     max_price: Optional[float] = None,
     search: Optional[str] = None,
-    sort_by: str = Query("created_at", regex="^(name|price|created_at|quantity)$"),
+    tags: Optional[str] = Query(None, description="Comma-separated tags"),
+    tags_match: str = Query("any", regex=TAGS_MATCH_PATTERN, description="Match any or all of the tags"),
+    sort_by: str = Query("created_at", regex="^(name|price|created_at|quantity|relevance)$"),
     sort_order: str = Query("desc", regex="^(asc|desc)$"),
-    db: AsyncSession = Depends(get_db),
+    fields: Optional[str] = Query(None, description="Comma-separated subset of product fields"),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """List products with filtering, pagination, and sorting."""
-    # Build query
-    conditions = []
-    if is_active is not None:
-        conditions.append(Product.is_active == is_active)
-    if is_featured is not None:
-        conditions.append(Product.is_featured == is_featured)
-    if category_id:
-        conditions.append(Product.category_id == category_id)
-    if min_price is not None:
-        conditions.append(Product.price >= min_price)
-    if max_price is not None:
-        conditions.append(Product.price <= max_price)
-    if search:
-        conditions.append(
-            Product.name.ilike(f"%{search}%") | Product.description.ilike(f"%{search}%")
+    if sort_by == "relevance" and not search:
+        raise HTTPException(status_code=400, detail="sort_by=relevance requires a search term")
+    selected = parse_fields(fields)
+    filters = dict(
+        category_id=category_id, is_active=is_active, is_featured=is_featured,
+        min_price=min_price, max_price=max_price, search=search,
+        tags=parse_tags(tags), tags_match=tags_match,
+    )
+    params = dict(
+        filters, page=page, limit=limit, cursor=cursor, count_mode=count_mode,
+        sort_by=sort_by, sort_order=sort_order, fields=selected,
+    )
+
+    fresh = reads_own_writes(request)
+    # Answer a revalidation before touching the listing at all
+    version = await cache.version("products", fresh=fresh)
+    validators = listing_validators("products", params, version)
+    early = not_modified(request, validators)
+    if early:
+        return early
+    not_before(db, version)
+
+    # Sorting (id breaks ties so that pages never overlap). The sort
+    # key is selected alongside each row so the cursor can carry it.
+    if sort_by == "relevance":
+        sort_column = relevance(search)
+    else:
+        sort_column = getattr(Product, sort_by)
+    key = decode_cursor(cursor, sort_column, Product.id, sort_by, sort_order) if cursor else None
+    offset = 0 if cursor else (page - 1) * limit
+
+    async def query_database():
+        # The statement is built once per shape; this request only binds values
+        placeholders, values, shape = bound_filters(filters)
+        shape = ("list_products", shape, tuple(selected), sort_by, sort_order, bool(key))
+        query, conditions = statements.get(
+            shape, partial(listing_statement, placeholders, selected, sort_by, sort_order, bool(key))
         )
 
-    # Count total
-    count_query = select(func.count(Product.id))
-    if conditions:
-        count_query = count_query.where(and_(*conditions))
-    result = await db.execute(count_query)
-    total = result.scalar() or 0
+        # Count total
+        total = await count_total(db, Product.id, conditions, count_mode, "products", filters, values)
+
+        # Pagination: keyset when a cursor is given, offset otherwise.
+        # One extra row tells us whether there is a next page.
+        params = dict(values, offset=offset, limit=limit + 1)
+        if key:
+            params.update(after_value=key[0], after_id=key[1])
+        result = await db.execute(query, params)
+        rows = result.all()
+
+        next_key = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_key = (rows[-1].sort_key, rows[-1].id)
+        return [row_to_dict(row, selected) for row in rows], total, next_key
+
+    async def load() -> bytes:
+        # The in-memory snapshot answers what it can; SQL does the rest
+        served = snapshot.listing(
+            filters, sort_by, sort_order, key, offset, limit, selected,
+            generation=version[0] if version else None,
+        )
+        items, total, next_key = served or await query_database()
+
+        return dumps({
+            "products": items,
+            "pagination": PaginationMeta(
+                page=None if cursor else page,
+                limit=limit,
+                total=total,
+                pages=math.ceil(total / limit) if total > 0 else 0,
+                count_mode=count_mode,
+                next_cursor=encode_cursor(sort_by, sort_order, *next_key) if next_key else None,
+            ).model_dump(),
+        })
+
+    body = await cache.get_listing("products", params, load, fresh=fresh)
+    return json_response(request, body, validators)
+
+
+# ── Export Products ────────────────────────────────────────
+@router.get("/export", response_class=StreamingResponse)
+async def export_products(
+    request: Request,
+    fmt: str = Query("ndjson", alias="format", regex="^(ndjson|csv)$"),
+    gzip: bool = Query(False, description="Gzip-compress the stream on the fly"),
+    category_id: Optional[UUID] = None,
+    is_active: Optional[bool] = True,
+    is_featured: Optional[bool] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    search: Optional[str] = None,
+    tags: Optional[str] = Query(None, description="Comma-separated tags"),
+    tags_match: str = Query("any", regex=TAGS_MATCH_PATTERN, description="Match any or all of the tags"),
+    fields: Optional[str] = Query(None, description="Comma-separated subset of product fields"),
+):
+    """Stream the whole filtered catalog as NDJSON or CSV."""
+    selected = parse_fields(fields)
+    conditions = product_conditions(
+        category_id=category_id, is_active=is_active, is_featured=is_featured,
+        min_price=min_price, max_price=max_price, search=search,
+        tags=parse_tags(tags), tags_match=tags_match,
+    )
+    query, _ = product_select(selected)
+    query = query.where(*conditions).order_by(Product.id)
+
+    headers = {"Content-Disposition": f'attachment; filename="products.{fmt}"'}
+    if gzip:
+        headers["Content-Encoding"] = "gzip"
+    logger.info("products_export_started", format=fmt, gzip=gzip)
+    return StreamingResponse(
+        stream_export(query, selected, fmt, gzip, session_factory=read_session_factory(request)),
+        media_type=EXPORT_MEDIA_TYPES[fmt],
+        headers=headers,
+    )
 
-    # Fetch products
-    query = select(Product)
-    if conditions:
-        query = query.where(and_(*conditions))
 
-    # Sorting
-    sort_column = getattr(Product, sort_by)
-    query = query.order_by(sort_column.desc() if sort_order == "desc" else sort_column.asc())
-
-    # Pagination
-    offset = (page - 1) * limit
-    query = query.offset(offset).limit(limit)
-
-    result = await db.execute(query)
-    products = result.scalars().all()
-
-    return ProductListResponse(
-        products=[ProductResponse.model_validate(p) for p in products],
-        pagination=PaginationMeta(
-            page=page,
-            limit=limit,
-            total=total,
-            pages=math.ceil(total / limit) if total > 0 else 0,
-        ),
+# ── Facets ─────────────────────────────────────────────────
+@router.get("/facets", response_model=ProductFacetsResponse)
+async def product_facets(
+    request: Request,
+    facets: Optional[str] = Query(None, description="Comma-separated subset of category,price,featured,in_stock"),
+    price_interval: float = Query(settings.FACET_PRICE_INTERVAL, gt=0, description="Price bucket width"),
+    category_id: Optional[UUID] = None,
+    is_active: Optional[bool] = True,
+    is_featured: Optional[bool] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    search: Optional[str] = None,
+    tags: Optional[str] = Query(None, description="Comma-separated tags"),
+    tags_match: str = Query("any", regex=TAGS_MATCH_PATTERN, description="Match any or all of the tags"),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Category counts, price histogram and featured/in-stock counts for a filter set.
+
+    Takes the same filters as the product listing and computes every
+    requested facet in a single aggregate query.
+    """
+    selected = parse_facets(facets)
+    filters = dict(
+        category_id=category_id, is_active=is_active, is_featured=is_featured,
+        min_price=min_price, max_price=max_price, search=search,
+        tags=parse_tags(tags), tags_match=tags_match,
+    )
+    max_buckets = settings.FACET_MAX_PRICE_BUCKETS
+    params = dict(filters, facets=selected, price_interval=price_interval, resource="facets")
+
+    fresh = reads_own_writes(request)
+    version = await cache.version("products", fresh=fresh)
+    validators = listing_validators("products", params, version)
+    early = not_modified(request, validators)
+    if early:
+        return early
+    not_before(db, version)
+
+    async def load() -> bytes:
+        query = facet_statement(product_conditions(**filters), selected, price_interval, max_buckets)
+        result = await db.execute(query)
+        response = collect_facets(result.all(), selected, price_interval, max_buckets)
+        return response.model_dump_json(exclude_none=True).encode()
+
+    body = await cache.get_listing("products", params, load, fresh=fresh)
+    return json_response(request, body, validators)
+
+
+# ── Tag Cloud ──────────────────────────────────────────────
+@router.get("/tags", response_model=TagCloudResponse)
+async def tag_cloud(
+    request: Request,
+    limit: int = Query(50, ge=1, le=settings.TAG_CLOUD_MAX),
+    category_id: Optional[UUID] = None,
+    is_active: Optional[bool] = True,
+    is_featured: Optional[bool] = None,
+    search: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Most used tags, with product counts, for an optional filter set."""
+    filters = dict(category_id=category_id, is_active=is_active, is_featured=is_featured, search=search)
+    params = dict(filters, limit=limit, resource="tags")
+
+    fresh = reads_own_writes(request)
+    version = await cache.version("products", fresh=fresh)
+    validators = listing_validators("products", params, version)
+    early = not_modified(request, validators)
+    if early:
+        return early
+    not_before(db, version)
+
+    async def load() -> bytes:
+        result = await db.execute(tag_cloud_statement(product_conditions(**filters), limit))
+        return dumps({"tags": [{"tag": row.tag, "count": row.count} for row in result.all()]})
+
+    body = await cache.get_listing("products", params, load, fresh=fresh)
+    return json_response(request, body, validators)
+
+
+# ── Low Stock ──────────────────────────────────────────────
+@router.get("/low-stock", response_model=ProductListResponse)
+async def low_stock_products(
+    request: Request,
+    limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from pagination.next_cursor"),
+    count_mode: str = Query("exact", regex=COUNT_MODE_PATTERN),
+    category_id: Optional[UUID] = None,
+    is_active: Optional[bool] = True,
+    fields: Optional[str] = Query(None, description="Comma-separated subset of product fields"),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Products at or below their low_stock_threshold, lowest stock first."""
+    selected = parse_fields(fields)
+    filters = dict(category_id=category_id, is_active=is_active, low_stock=True)
+    params = dict(filters, limit=limit, cursor=cursor, count_mode=count_mode, fields=selected)
+
+    fresh = reads_own_writes(request)
+    version = await cache.version("products", fresh=fresh)
+    validators = listing_validators("products", params, version)
+    early = not_modified(request, validators)
+    if early:
+        return early
+    not_before(db, version)
+
+    key = decode_cursor(cursor, Product.quantity, Product.id, "low_stock", "asc") if cursor else None
+
+    async def load() -> bytes:
+        # LOW_STOCK is the partial index predicate; (quantity, id) its key
+        conditions = [LOW_STOCK, *product_conditions(category_id=category_id, is_active=is_active)]
+        total = await count_total(db, Product.id, conditions, count_mode, "products", filters)
+
+        query, _ = product_select(selected, Product.quantity.label("sort_key"))
+        query = query.where(*conditions).order_by(*keyset_order(Product.quantity, Product.id, "asc"))
+        if key:
+            query = query.where(keyset_condition(Product.quantity, Product.id, key, "asc"))
+        rows = (await db.execute(query.limit(limit + 1))).all()
+
+        next_key = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_key = (rows[-1].sort_key, rows[-1].id)
+        return dumps({
+            "products": [row_to_dict(row, selected) for row in rows],
+            "pagination": PaginationMeta(
+                limit=limit,
+                total=total,
+                pages=math.ceil(total / limit) if total > 0 else 0,
+                count_mode=count_mode,
+                next_cursor=encode_cursor("low_stock", "asc", *next_key) if next_key else None,
+            ).model_dump(),
+        })
+
+    body = await cache.get_listing("products", params, load, fresh=fresh)
+    return json_response(request, body, validators)
+
+
+@router.get("/low-stock/alerts", response_model=StockAlertFeedResponse)
+async def stock_alert_feed(
+    cursor: Optional[str] = Query(
+        None, description="next_cursor from the previous poll; omit to start at the oldest alert"
+    ),
+    limit: int = Query(100, ge=1, le=settings.STOCK_ALERT_FEED_MAX),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Threshold crossings (low, restocked) in commit-safe order, for polling."""
+    after = decode_cursor(cursor, StockAlert.txid, StockAlert.id, "stock_alerts", "asc") if cursor else None
+    result = await db.execute(alerts_statement(after, limit))
+    alerts = result.scalars().all()
+
+    next_cursor = encode_cursor("stock_alerts", "asc", alerts[-1].txid, alerts[-1].id) if alerts else cursor
+    return Response(
+        content=dumps({"alerts": [alert_dict(alert) for alert in alerts], "next_cursor": next_cursor}),
+        media_type="application/json",
     )
 
 
 # ── Get Product ────────────────────────────────────────────
+PRODUCT_BY_ID = product_select(PRODUCT_FIELDS)[0].where(Product.id == bindparam("product_id"))
+
+
 @router.get("/{product_id}", response_model=ProductResponse)
 async def get_product(
     product_id: UUID,
-    db: AsyncSession = Depends(get_db),
+    request: Request,
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Get a single product by ID."""
-    result = await db.execute(select(Product).where(Product.id == product_id))
-    product = result.scalar_one_or_none()
+    fresh = reads_own_writes(request)
+    not_before(db, await cache.version("products", fresh=fresh))
 
-    if not product:
-        raise HTTPException(status_code=404, detail="Product not found")
+    async def load() -> bytes:
+        result = await db.execute(PRODUCT_BY_ID, {"product_id": product_id})
+        row = result.one_or_none()
 
-    return ProductResponse.model_validate(product)
+        if not row:
+            raise HTTPException(status_code=404, detail="Product not found")
+
+        item = row_to_dict(row, PRODUCT_FIELDS)
+        # The embedded category changes the body without touching the product
+        category_updated_at = item["category"]["updated_at"] if item["category"] else None
+        validators = resource_validators(item["id"], item["updated_at"], category_updated_at)
+        return pack(validators, dumps(item))
+
+    validators, body = unpack(await cache.get_item("products", str(product_id), load, fresh=fresh))
+    return not_modified(request, validators) or json_response(request, body, validators)
 
 
 # ── Create Product ─────────────────────────────────────────
@@ -120,24 +463,118 @@ async def create_product(
     db: AsyncSession = Depends(get_db),
 ):
     """Create a new product."""
-    # Check for duplicate SKU
-    existing = await db.execute(select(Product).where(Product.sku == data.sku))
-    if existing.scalar_one_or_none():
+    # A duplicate SKU inserts nothing and returns no row
+    result = await db.execute(
+        returning_product(
+            pg_insert(Product)
+            .values(**data.model_dump(), slug=slugify(data.name))
+            .on_conflict_do_nothing(index_elements=[Product.sku])
+        )
+    )
+    row = result.one_or_none()
+
+    if not row:
         raise HTTPException(status_code=409, detail="Product with this SKU already exists")
+    product = row_to_dict(row, PRODUCT_FIELDS)
 
-    product = Product(
-        **data.model_dump(),
-        slug=slugify(data.name),
-    )
-    db.add(product)
-    await db.flush()
-    await db.refresh(product)
+    await record_events(db, [("product.created", product_data(product))])
+    after_commit(db, partial(invalidate_product, product["id"]))
 
-    logger.info("product_created", product_id=str(product.id), sku=product.sku)
+    logger.info("product_created", product_id=str(product["id"]), sku=product["sku"])
 
     return ProductResponse.model_validate(product)
 
 
+# ── Batch Lookup ───────────────────────────────────────────
+@router.post("/batch", response_model=ProductBatchResponse)
+async def batch_get_products(
+    data: ProductBatchRequest,
+    fields: Optional[str] = Query(None, description="Comma-separated subset of product fields"),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Fetch many products by id and/or SKU in one query.
+
+    Results follow request order (ids first, then skus) and carry
+    ``found=false`` for keys that match no product.
+    """
+    selected = parse_fields(fields)
+    conditions = []
+    if data.ids:
+        conditions.append(Product.id == any_(bindparam("ids", data.ids, type_=ARRAY(PG_UUID(as_uuid=True)))))
+    if data.skus:
+        conditions.append(Product.sku == any_(bindparam("skus", data.skus, type_=ARRAY(String))))
+
+    # sku is always selected so SKU lookups can be matched back
+    query, _ = product_select(selected, Product.sku.label("lookup_sku"))
+    result = await db.execute(query.where(or_(*conditions)))
+    rows = result.all()
+    by_id = {row.id: row for row in rows}
+    by_sku = {row.lookup_sku: row for row in rows}
+
+    def item(row, **key) -> dict:
+        if row is None:
+            return {**key, "found": False, "product": None}
+        return {**key, "found": True, "product": row_to_dict(row, selected)}
+
+    results = [
+        item(by_id.get(product_id), id=product_id, sku=None) for product_id in data.ids
+    ] + [
+        item(by_sku.get(sku), id=None, sku=sku) for sku in data.skus
+    ]
+    return Response(content=dumps({"results": results}), media_type="application/json")
+
+
+# ── Reserve Stock ──────────────────────────────────────────
+@router.post("/stock/reserve", response_model=StockReservationResponse)
+async def reserve_product_stock(
+    data: StockReservationRequest,
+    db: AsyncSession = Depends(get_db),
+):
+    """Atomically decrement stock for every item, or for none of them."""
+    try:
+        reserved = await reserve_stock(db, [(item.product_id, item.quantity) for item in data.items])
+    except ReservationFailed as e:
+        logger.info(
+            "stock_reservation_rejected",
+            insufficient=[str(i) for i in e.insufficient],
+            not_found=[str(i) for i in e.not_found],
+        )
+        raise HTTPException(
+            status_code=404 if e.not_found and not e.insufficient else 409,
+            detail={
+                "message": "Insufficient stock" if e.insufficient else "Product not found",
+                "insufficient": [str(i) for i in e.insufficient],
+                "not_found": [str(i) for i in e.not_found],
+            },
+        )
+
+    await record_events(db, [
+        ("product.stock.changed", {"id": product_id, "quantity": qty, "reason": "reservation"})
+        for product_id, qty in reserved.items()
+    ])
+    after_commit(db, partial(invalidate_product, *reserved))
+    logger.info("stock_reserved", items=len(reserved))
+
+    return StockReservationResponse(
+        items=[StockLevel(product_id=product_id, quantity=qty) for product_id, qty in reserved.items()]
+    )
+
+
+# ── Bulk Import ────────────────────────────────────────────
+@router.post("/import", response_model=ProductImportResponse)
+async def bulk_import_products(
+    request: Request,
+    fmt: str = Query("ndjson", alias="format", regex="^(ndjson|csv)$"),
+    db: AsyncSession = Depends(get_db),
+):
+    """Upsert products keyed on SKU from a streamed NDJSON or CSV body.
+
+    Valid rows are written in chunks; invalid rows are reported
+    individually without aborting the rest of the import.
+    """
+    return await import_products(db, request.stream(), fmt)
+
+
 # ── Update Product ─────────────────────────────────────────
 @router.put("/{product_id}", response_model=ProductResponse)
 async def update_product(
@@ -146,21 +583,27 @@ async def update_product(
     db: AsyncSession = Depends(get_db),
 ):
     """Update an existing product."""
-    result = await db.execute(select(Product).where(Product.id == product_id))
-    product = result.scalar_one_or_none()
-
-    if not product:
-        raise HTTPException(status_code=404, detail="Product not found")
-
     update_data = data.model_dump(exclude_unset=True)
     if "name" in update_data:
         update_data["slug"] = slugify(update_data["name"])
 
-    for key, value in update_data.items():
-        setattr(product, key, value)
+    result = await db.execute(returning_product(stock_update(product_id, update_data)))
+    row = result.one_or_none()
 
-    await db.flush()
-    await db.refresh(product)
+    if not row:
+        raise HTTPException(status_code=404, detail="Product not found")
+    product = row_to_dict(row, PRODUCT_FIELDS)
+
+    events = [("product.updated", product_data(product))]
+    if "quantity" in update_data:
+        stock = {"id": product_id, "quantity": product["quantity"], "reason": "update"}
+        events.append(("product.stock.changed", stock))
+    await record_events(db, events)
+    await record_crossings(db, [(
+        product_id, product["quantity"], product["low_stock_threshold"],
+        row.previous_quantity, row.previous_threshold,
+    )])
+    after_commit(db, partial(invalidate_product, product_id))
 
     logger.info("product_updated", product_id=str(product_id))
 
@@ -174,13 +617,15 @@ async def delete_product(
     db: AsyncSession = Depends(get_db),
 ):
     """Delete a product."""
-    result = await db.execute(select(Product).where(Product.id == product_id))
-    product = result.scalar_one_or_none()
+    result = await db.execute(
+        delete(Product).where(Product.id == product_id).returning(Product.id)
+    )
 
-    if not product:
+    if result.scalar_one_or_none() is None:
         raise HTTPException(status_code=404, detail="Product not found")
 
-    await db.delete(product)
+    await record_events(db, [("product.deleted", {"id": product_id})])
+    after_commit(db, partial(invalidate_product, product_id))
 
     logger.info("product_deleted", product_id=str(product_id))
 
@@ -193,15 +638,20 @@ async def update_stock(
     db: AsyncSession = Depends(get_db),
 ):
     """Update product stock quantity."""
-    result = await db.execute(select(Product).where(Product.id == product_id))
-    product = result.scalar_one_or_none()
+    result = await db.execute(returning_product(stock_update(product_id, {"quantity": quantity})))
+    row = result.one_or_none()
 
-    if not product:
+    if not row:
         raise HTTPException(status_code=404, detail="Product not found")
-
-    product.quantity = quantity
-    await db.flush()
-    await db.refresh(product)
+    product = row_to_dict(row, PRODUCT_FIELDS)
+
+    await record_events(db, [
+        ("product.stock.changed", {"id": product_id, "quantity": quantity, "reason": "adjustment"})
+    ])
+    await record_crossings(db, [
+        (product_id, quantity, product["low_stock_threshold"], row.previous_quantity, row.previous_threshold)
+    ])
+    after_commit(db, partial(invalidate_product, product_id))
 
     logger.info(
         "stock_updated",
@@ -3,10 +3,12 @@
 # ============================================================
 
 from datetime import datetime
-from typing import Optional, List
+from typing import Any, Dict, Optional, List, Union
 from uuid import UUID
 
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, Field, field_validator, model_validator
+
+from app.config import settings
 
 
 # ── Category Schemas ───────────────────────────────────────
@@ -37,6 +39,15 @@ class CategoryResponse(CategoryBase):
         from_attributes = True
 
 
+class CategoryProductCount(BaseModel):
+    total: int
+    active: int
+
+
+class CategoryWithCountsResponse(CategoryResponse):
+    product_count: CategoryProductCount
+
+
 # ── Product Schemas ────────────────────────────────────────
 
 class ProductBase(BaseModel):
@@ -94,13 +105,141 @@ class ProductResponse(ProductBase):
         from_attributes = True
 
 
+# ── Batch Lookup ───────────────────────────────────────────
+
+class ProductBatchRequest(BaseModel):
+    ids: List[UUID] = []
+    skus: List[str] = []
+
+    @model_validator(mode="after")
+    def validate_size(self):
+        total = len(self.ids) + len(self.skus)
+        if total == 0:
+            raise ValueError("Provide at least one id or sku")
+        if total > settings.BATCH_LOOKUP_MAX:
+            raise ValueError(f"At most {settings.BATCH_LOOKUP_MAX} ids and skus per request")
+        return self
+
+
+class ProductBatchItem(BaseModel):
+    id: Optional[UUID] = None
+    sku: Optional[str] = None
+    found: bool
+    product: Optional[ProductResponse] = None
+
+
+class ProductBatchResponse(BaseModel):
+    results: List[ProductBatchItem]
+
+
+# ── Stock Reservation ──────────────────────────────────────
+
+class StockReservationItem(BaseModel):
+    product_id: UUID
+    quantity: int = Field(..., gt=0)
+
+
+class StockReservationRequest(BaseModel):
+    items: List[StockReservationItem] = Field(..., min_length=1, max_length=settings.STOCK_RESERVATION_MAX)
+
+
+class StockLevel(BaseModel):
+    product_id: UUID
+    quantity: int
+
+
+class StockReservationResponse(BaseModel):
+    items: List[StockLevel]
+
+
+class StockAlertResponse(BaseModel):
+    id: int
+    product_id: UUID
+    state: str  # "low" or "restocked"
+    quantity: int
+    low_stock_threshold: int
+    created_at: datetime
+
+
+class StockAlertFeedResponse(BaseModel):
+    alerts: List[StockAlertResponse]
+    next_cursor: Optional[str] = None  # Pass back on the next poll; unchanged when idle
+
+
+# ── Change Feed ────────────────────────────────────────────
+
+class CatalogChange(BaseModel):
+    type: str  # "product" or "category"
+    op: str  # "upsert" or "delete"
+    id: UUID
+    data: Optional[Dict[str, Any]] = None  # Current row for upserts
+
+
+class CatalogChangeFeedResponse(BaseModel):
+    changes: List[CatalogChange]
+    next_cursor: str  # Pass back on the next call
+    has_more: bool  # More changes are already waiting
+
+
+# ── Bulk Import ────────────────────────────────────────────
+
+class ImportRowError(BaseModel):
+    row: int
+    sku: Optional[str] = None
+    errors: List[str]
+
+
+class ProductImportResponse(BaseModel):
+    received: int = 0
+    inserted: int = 0
+    updated: int = 0
+    failed: int = 0
+    duplicates: int = 0  # Rows superseded by a later row with the same SKU in the same chunk
+    errors: List[ImportRowError] = []
+
+
+# ── Facets ─────────────────────────────────────────────────
+
+class CategoryFacet(BaseModel):
+    category_id: Optional[UUID] = None  # None counts uncategorized products
+    name: Optional[str] = None
+    count: int
+
+
+class PriceBucket(BaseModel):
+    min: float
+    max: Optional[float] = None  # None for the open-ended last bucket
+    count: int
+
+
+class ProductFacetsResponse(BaseModel):
+    total: int
+    categories: Optional[List[CategoryFacet]] = None
+    price: Optional[List[PriceBucket]] = None
+    featured: Optional[int] = None
+    in_stock: Optional[int] = None
+
+
+# ── Tags ───────────────────────────────────────────────────
+
+class TagCount(BaseModel):
+    tag: str
+    count: int
+
+
+class TagCloudResponse(BaseModel):
+    tags: List[TagCount]
+
+
 # ── Pagination ─────────────────────────────────────────────
 
 class PaginationMeta(BaseModel):
-    page: int
+    page: Optional[int] = None  # None when paging by cursor
     limit: int
     total: int
     pages: int
+    count_mode: str = "exact"  # How total was produced: exact, estimated or cached
+    next_cursor: Optional[str] = None
 
 
 class ProductListResponse(BaseModel):
@@ -109,5 +248,5 @@ class ProductListResponse(BaseModel):
 
 
 class CategoryListResponse(BaseModel):
-    categories: List[CategoryResponse]
+    categories: List[Union[CategoryWithCountsResponse, CategoryResponse]]
     pagination: PaginationMeta
@@ -0,0 +1,65 @@
+# ============================================================
+# Product Service — Product Search
+# ============================================================
+#
+# Search terms match either the weighted full-text document
+# (products.search_vector, GIN indexed) or, for typos and partial
+# words, the product name by trigram word similarity (GIN
+# gin_trgm_ops index). Both predicates are index-served, so Postgres
+# combines them with a BitmapOr instead of scanning the table.
+#
+# Existing databases get the column and both indexes with
+# ``python -m app.search``: adding the stored generated column
+# backfills it (and rewrites the table under an exclusive lock, so run
+# it off-peak); the indexes are then built CONCURRENTLY. Every step is
+# idempotent.
+
+import asyncio
+
+from sqlalchemy import Float, func, or_, text
+
+from app.models import Product, SEARCH_CONFIG, SEARCH_VECTOR_SQL
+from app.utils.logger import logger
+
+MIGRATION = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "ALTER TABLE products ADD COLUMN IF NOT EXISTS search_vector TSVECTOR "
+    f"GENERATED ALWAYS AS ({SEARCH_VECTOR_SQL}) STORED",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_product_search_vector ON products USING gin (search_vector)",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_product_name_trgm ON products USING gin (name gin_trgm_ops)",
+]
+
+
+def _ts_query(term: str):
+    return func.websearch_to_tsquery(SEARCH_CONFIG, term)
+
+
+def search_condition(term: str):
+    """Predicate matching products by full text or fuzzy name."""
+    return or_(
+        Product.search_vector.op("@@")(_ts_query(term)),
+        Product.name.op("%>")(term),
+    )
+
+
+def relevance(term: str):
+    """Ranking expression for ``sort_by=relevance``: text rank plus name similarity."""
+    return (
+        func.ts_rank_cd(Product.search_vector, _ts_query(term), type_=Float)
+        + func.word_similarity(term, Product.name, type_=Float)
+    )
+
+
+async def migrate(engine) -> None:
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        for statement in MIGRATION:
+            await conn.execute(text(statement))
+    logger.info("search_vector_migrated")
+
+
+if __name__ == "__main__":
+    from app.database import engine
+
+    asyncio.run(migrate(engine))
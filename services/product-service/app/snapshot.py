@@ -0,0 +1,457 @@
+# ============================================================
+# Product Service — Catalog Snapshot
+# ============================================================
+#
+# Optional in-process copy of the active catalog that answers hot
+# listing queries (category / featured / price filters, any sort but
+# relevance) without a round trip to Postgres.
+#
+# Layout: one slot per product; each column is a flat list or typed
+# array indexed by slot. Per-category postings hold the live slots of
+# each category, and every sortable column has a pre-sorted slot order
+# plus the inverse rank array, so a filtered page is a top-k by rank.
+# Ties sort by id, as in SQL; numeric orders come from a stable sort
+# over the id order, while the name order is read from Postgres so it
+# follows the database collation.
+#
+# Freshness: a background task polls rows whose updated_at moved since
+# the last poll (in a REPEATABLE READ transaction, with an overlap for
+# late commits) and applies them in place. Deletes do not touch
+# updated_at, so a live-row count mismatch triggers a full rebuild, as
+# does a vanished category. A snapshot that has not caught up with the
+# response-cache generation, or is older than SNAPSHOT_MAX_STALENESS,
+# is not served; the caller falls back to SQL.
+
+import asyncio
+import heapq
+import sys
+import time
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Set, Tuple
+from uuid import UUID
+
+from prometheus_client import Counter, Gauge, Histogram
+from sqlalchemy import func, select
+
+from app.cache import cache
+from app.config import settings
+from app.database import async_session
+from app.models import Category, Product
+from app.projection import CATEGORY_FIELDS, PRODUCT_FIELDS
+from app.utils.logger import logger
+
+SNAPSHOT_QUERIES = Counter(
+    "product_snapshot_queries_total",
+    "Listing queries offered to the catalog snapshot, by result (hit, stale, unsupported)",
+    ["result"],
+)
+SNAPSHOT_REFRESH_SECONDS = Histogram(
+    "product_snapshot_refresh_seconds",
+    "Duration of snapshot refreshes, by kind (delta, rebuild)",
+    ["kind"],
+    buckets=[0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30],
+)
+SNAPSHOT_ROWS = Gauge("product_snapshot_rows", "Active products held by the catalog snapshot")
+SNAPSHOT_BYTES = Gauge("product_snapshot_memory_bytes", "Approximate memory held by the catalog snapshot")
+SNAPSHOT_AGE = Gauge("product_snapshot_age_seconds", "Seconds since the catalog snapshot last caught up")
+
+SORT_KEYS = ("created_at", "price", "name", "quantity")
+# Columns held per slot; ``id`` and ``is_active`` are kept separately
+COLUMNS = [name for name in PRODUCT_FIELDS if name not in ("id", "category", "is_active")]
+TYPED_COLUMNS = {"price": "d", "quantity": "q", "low_stock_threshold": "q"}
+FLAG_COLUMNS = ("is_featured",)
+
+Key = Tuple[Any, Any]
+
+
+def _new_column(name: str):
+    if name in TYPED_COLUMNS:
+        return array(TYPED_COLUMNS[name])
+    if name in FLAG_COLUMNS:
+        return bytearray()
+    return []
+
+
+class CatalogIndex:
+    """Columnar copy of the active catalog.
+
+    Only ever mutated synchronously, so readers on the event loop never
+    observe a half-applied refresh.
+    """
+
+    def __init__(self, categories: Dict[UUID, dict]):
+        self.categories = categories
+        self.ids: List[UUID] = []
+        self.slots: Dict[UUID, int] = {}
+        self.alive = bytearray()
+        self.columns: Dict[str, Any] = {name: _new_column(name) for name in COLUMNS}
+        self.postings: Dict[Optional[UUID], Set[int]] = defaultdict(set)
+        self.by_id: List[int] = []  # live slots in id order
+        self.orders: Dict[str, Optional[List[int]]] = {}
+        self.ranks: Dict[str, array] = {}
+        self.payload_bytes = 0
+        self.generation: Optional[int] = None
+        self.watermark = datetime.utcnow()
+        self.refreshed_at = time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self.by_id)
+
+    # ── Writes ─────────────────────────────────────────────
+    def changed_keys(self, row) -> Set[str]:
+        """Sort orders that applying ``row`` would invalidate."""
+        slot = self.slots.get(row.id)
+        was_alive = slot is not None and self.alive[slot]
+        if was_alive != row.is_active:
+            return set(SORT_KEYS)
+        if not was_alive:
+            return set()
+        return {key for key in SORT_KEYS if self.columns[key][slot] != getattr(row, key)}
+
+    def apply(self, row, in_id_order: bool = False) -> Set[str]:
+        """Insert, update or retire one product row; see :meth:`changed_keys`.
+
+        ``in_id_order`` promises rows arrive sorted by id (bulk loads).
+        """
+        changed = self.changed_keys(row)
+        slot = self.slots.get(row.id)
+        if slot is None:
+            if not row.is_active:
+                return changed
+            slot = len(self.ids)
+            self.ids.append(row.id)
+            self.slots[row.id] = slot
+            self.alive.append(0)
+            for name, column in self.columns.items():
+                value = getattr(row, name)
+                column.append(value)
+                if isinstance(column, list):
+                    self.payload_bytes += sys.getsizeof(value)
+        else:
+            if self.alive[slot]:
+                self.postings[self.columns["category_id"][slot]].discard(slot)
+            for name, column in self.columns.items():
+                column[slot] = getattr(row, name)
+
+        if row.is_active:
+            self.postings[row.category_id].add(slot)
+        if bool(self.alive[slot]) != row.is_active:
+            if in_id_order:
+                self.by_id.append(slot)
+            elif row.is_active:
+                insort(self.by_id, slot, key=self.ids.__getitem__)
+            else:
+                self.by_id.remove(slot)
+            self.alive[slot] = row.is_active
+        return changed
+
+    def sort(self, keys: Set[str], name_order: Optional[List[UUID]] = None) -> None:
+        """Rebuild the given sort orders and their rank arrays."""
+        for key in keys:
+            if key == "name":
+                order = self._name_slots(name_order)
+            else:
+                # Stable sort over the id order keeps ties in id order
+                order = sorted(self.by_id, key=self.columns[key].__getitem__)
+            self.orders[key] = order
+            if order is not None:
+                rank = array("l", [-1]) * len(self.ids)
+                for position, slot in enumerate(order):
+                    rank[slot] = position
+                self.ranks[key] = rank
+
+    def _name_slots(self, name_order: Optional[List[UUID]]) -> Optional[List[int]]:
+        if name_order is None:
+            return None
+        order = [self.slots[i] for i in name_order if i in self.slots and self.alive[self.slots[i]]]
+        # Rows that moved after the name order was read: skip name sorts
+        return order if len(order) == len(self.by_id) else None
+
+    # ── Reads ──────────────────────────────────────────────
+    def item(self, slot: int, fields: List[str]) -> Dict[str, Any]:
+        item = {}
+        for name in fields:
+            if name == "id":
+                item["id"] = self.ids[slot]
+            elif name == "is_active":
+                item["is_active"] = True
+            elif name == "category":
+                item["category"] = self.categories.get(self.columns["category_id"][slot])
+            elif name in FLAG_COLUMNS:
+                item[name] = bool(self.columns[name][slot])
+            else:
+                item[name] = self.columns[name][slot]
+        return item
+
+    def page(
+        self,
+        sort_by: str,
+        sort_order: str,
+        after: Optional[Key],
+        offset: int,
+        limit: int,
+        category_id: Optional[UUID] = None,
+        is_featured: Optional[bool] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+    ) -> Optional[Tuple[List[int], int, bool]]:
+        """Slots of one page, the total match count and whether more follow.
+
+        None when the cursor row has changed since it was issued.
+        """
+        order, rank = self.orders[sort_by], self.ranks[sort_by]
+        desc = sort_order == "desc"
+        bound = None
+        if after is not None:
+            slot = self.slots.get(after[1])
+            if slot is None or not self.alive[slot] or self.columns[sort_by][slot] != after[0]:
+                return None
+            bound = rank[slot]
+
+        filtered = category_id or is_featured is not None or min_price is not None or max_price is not None
+        if not filtered:
+            total = len(order)
+            if desc:
+                end = bound if bound is not None else total - offset
+                slots = order[max(0, end - limit - 1):max(0, end)][::-1]
+            else:
+                start = bound + 1 if bound is not None else offset
+                slots = order[start:start + limit + 1]
+            return slots[:limit], total, len(slots) > limit
+
+        candidates = self._candidates(category_id, min_price, max_price)
+        price, featured = self.columns["price"], self.columns["is_featured"]
+        matched = [
+            slot for slot in candidates
+            if (category_id is None or self.columns["category_id"][slot] == category_id)
+            and (is_featured is None or bool(featured[slot]) == is_featured)
+            and (min_price is None or price[slot] >= min_price)
+            and (max_price is None or price[slot] <= max_price)
+        ]
+        total = len(matched)
+        if bound is not None:
+            matched = [s for s in matched if (rank[s] < bound if desc else rank[s] > bound)]
+        top = heapq.nlargest if desc else heapq.nsmallest
+        slots = top(offset + limit + 1, matched, key=rank.__getitem__)[offset:]
+        return slots[:limit], total, len(slots) > limit
+
+    def _candidates(self, category_id, min_price, max_price):
+        if category_id:
+            return self.postings.get(category_id, ())
+        order = self.orders["price"]
+        if min_price is None and max_price is None:
+            return order
+        price = self.columns["price"].__getitem__
+        lo = bisect_left(order, min_price, key=price) if min_price is not None else 0
+        hi = bisect_right(order, max_price, key=price) if max_price is not None else len(order)
+        return order[lo:hi]
+
+    def nbytes(self) -> int:
+        containers = [self.ids, self.slots, self.alive, self.by_id, self.postings, *self.columns.values()]
+        containers += [order for order in self.orders.values() if order is not None]
+        containers += list(self.ranks.values()) + list(self.postings.values())
+        return sum(sys.getsizeof(c) for c in containers) + self.payload_bytes
+
+
+class CatalogSnapshot:
+    """Owns the current CatalogIndex and the task that keeps it fresh."""
+
+    def __init__(
+        self,
+        session_factory=async_session,
+        refresh_interval: float = settings.SNAPSHOT_REFRESH_INTERVAL,
+        rebuild_interval: float = settings.SNAPSHOT_REBUILD_INTERVAL,
+        max_staleness: float = settings.SNAPSHOT_MAX_STALENESS,
+        overlap: float = settings.SNAPSHOT_DELTA_OVERLAP,
+    ):
+        self.session_factory = session_factory
+        self.refresh_interval = refresh_interval
+        self.rebuild_interval = rebuild_interval
+        self.max_staleness = max_staleness
+        self.overlap = timedelta(seconds=overlap)
+        self.index: Optional[CatalogIndex] = None
+        self._rebuilt_at = 0.0
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        SNAPSHOT_AGE.set_function(self.age)
+
+    def age(self) -> float:
+        return time.monotonic() - self.index.refreshed_at if self.index else 0.0
+
+    # ── Lifecycle ──────────────────────────────────────────
+    async def start(self) -> None:
+        try:
+            await self.rebuild()
+        except Exception as e:  # keep serving from SQL; the loop retries
+            logger.warning("snapshot_build_failed", error=str(e))
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self.index = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                async with asyncio.timeout(self.refresh_interval):
+                    await self._wake.wait()
+            except TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                if self.index is None or time.monotonic() - self._rebuilt_at >= self.rebuild_interval:
+                    await self.rebuild()
+                else:
+                    await self.refresh()
+            except Exception as e:
+                logger.warning("snapshot_refresh_failed", error=str(e))
+
+    # ── Loading ────────────────────────────────────────────
+    async def _generation(self) -> Optional[int]:
+        version = await cache.version("products", fresh=True)
+        return version[0] if version else None
+
+    @staticmethod
+    async def _begin(session) -> None:
+        # Every query of one load sees the same database snapshot
+        await session.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+
+    @staticmethod
+    async def _categories(session) -> Dict[UUID, dict]:
+        result = await session.execute(select(*(getattr(Category, f) for f in CATEGORY_FIELDS)))
+        return {row.id: dict(row._mapping) for row in result.all()}
+
+    @staticmethod
+    async def _name_order(session) -> List[UUID]:
+        result = await session.execute(
+            select(Product.id).where(Product.is_active).order_by(Product.name, Product.id)
+        )
+        return result.scalars().all()
+
+    @staticmethod
+    def _product_query():
+        return select(Product.id, Product.is_active, *(getattr(Product, name) for name in COLUMNS))
+
+    async def rebuild(self) -> None:
+        """Load the whole active catalog into a new index and swap it in."""
+        started = time.perf_counter()
+        watermark = datetime.utcnow()
+        generation = await self._generation()
+        async with self.session_factory() as session:
+            await self._begin(session)
+            index = CatalogIndex(await self._categories(session))
+            query = self._product_query().where(Product.is_active).order_by(Product.id)
+            result = await session.stream(query.execution_options(yield_per=settings.EXPORT_BATCH_SIZE))
+            async for rows in result.partitions():
+                for row in rows:
+                    index.apply(row, in_id_order=True)
+            index.sort(set(SORT_KEYS), await self._name_order(session))
+
+        index.watermark, index.generation = watermark, generation
+        self.index = index
+        self._rebuilt_at = time.monotonic()
+        self._publish(index)
+        SNAPSHOT_REFRESH_SECONDS.labels(kind="rebuild").observe(time.perf_counter() - started)
+        logger.info("snapshot_rebuilt", rows=len(index), generation=generation)
+
+    async def refresh(self) -> None:
+        """Apply rows changed since the last poll to the current index."""
+        index = self.index
+        started = time.perf_counter()
+        watermark = datetime.utcnow()
+        generation = await self._generation()
+        async with self.session_factory() as session:
+            await self._begin(session)
+            categories = await self._categories(session)
+            result = await session.execute(
+                self._product_query().where(Product.updated_at >= index.watermark - self.overlap)
+            )
+            rows = result.all()
+            live = (await session.execute(select(func.count()).where(Product.is_active))).scalar()
+            changed = set().union(*(index.changed_keys(row) for row in rows))
+            if index.orders.get("name") is None:
+                changed.add("name")
+            name_order = await self._name_order(session) if "name" in changed else None
+
+        # Deleted rows and categories leave no updated_at trail
+        if not index.categories.keys() <= categories.keys():
+            return await self.rebuild()
+
+        # No awaits past this point: the index changes atomically
+        index.categories = categories
+        for row in rows:
+            index.apply(row)
+        if len(index) != live:
+            return await self.rebuild()
+        if changed:
+            index.sort(changed, name_order)
+        index.watermark, index.generation = watermark, generation
+        index.refreshed_at = time.monotonic()
+        self._publish(index)
+        SNAPSHOT_REFRESH_SECONDS.labels(kind="delta").observe(time.perf_counter() - started)
+
+    @staticmethod
+    def _publish(index: CatalogIndex) -> None:
+        SNAPSHOT_ROWS.set(len(index))
+        SNAPSHOT_BYTES.set(index.nbytes())
+
+    # ── Serving ────────────────────────────────────────────
+    def listing(
+        self,
+        filters: dict,
+        sort_by: str,
+        sort_order: str,
+        after: Optional[Key],
+        offset: int,
+        limit: int,
+        fields: List[str],
+        generation: Optional[int] = None,
+    ) -> Optional[Tuple[List[Dict[str, Any]], int, Optional[Key]]]:
+        """Serve a product listing as ``(items, total, next_key)``.
+
+        Returns None when the snapshot cannot answer exactly what SQL
+        would, and the caller must run the query itself.
+        """
+        index = self.index
+        if index is None:
+            return None
+        if (
+            filters.get("search") or filters.get("tags") or filters.get("is_active") is not True
+            or index.orders.get(sort_by) is None
+        ):
+            SNAPSHOT_QUERIES.labels(result="unsupported").inc()
+            return None
+        behind = generation is not None and index.generation is not None and generation != index.generation
+        if behind or self.age() > self.max_staleness:
+            # Catch up now rather than at the next poll
+            self._wake.set()
+            SNAPSHOT_QUERIES.labels(result="stale").inc()
+            return None
+
+        page = index.page(
+            sort_by, sort_order, after, offset, limit,
+            category_id=filters.get("category_id"), is_featured=filters.get("is_featured"),
+            min_price=filters.get("min_price"), max_price=filters.get("max_price"),
+        )
+        if page is None:
+            SNAPSHOT_QUERIES.labels(result="unsupported").inc()
+            return None
+        slots, total, more = page
+        SNAPSHOT_QUERIES.labels(result="hit").inc()
+        next_key = None
+        if more:
+            last = slots[-1]
+            next_key = (index.columns[sort_by][last], index.ids[last])
+        return [index.item(slot, fields) for slot in slots], total, next_key
+
+
+snapshot = CatalogSnapshot()
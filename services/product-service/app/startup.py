@@ -0,0 +1,148 @@
+# ============================================================
+# Product Service — Startup & Warm-up
+# ============================================================
+#
+# Startup is split in two. The lifespan does only what must precede
+# serving: optional schema creation (off in production, where the
+# schema is migrated), the Redis connection and the first replica
+# check. Everything that only makes the first requests faster runs in
+# the background while /health already answers:
+#
+#   pool       open STARTUP_PREWARM_CONNECTIONS connections per engine
+#   snapshot   build the in-memory catalog snapshot (if enabled)
+#   preload    GET each STARTUP_PRELOAD_PATHS through the app itself,
+#              filling the response cache and warming every code path
+#
+# /ready answers 503 until warm-up has finished, or the pool and
+# preload phases have given up after STARTUP_WARMUP_TIMEOUT (the
+# snapshot build is not bounded). Each phase's duration is logged and
+# exported as product_startup_phase_seconds{phase}.
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Awaitable, Dict, List
+
+import httpx
+from prometheus_client import Gauge
+from sqlalchemy import text
+
+from app.changes import migrate as migrate_changes
+from app.config import settings
+from app.database import Base
+from app.low_stock import migrate as migrate_low_stock
+from app.search import migrate as migrate_search
+from app.tags import migrate as migrate_tags
+from app.utils.logger import logger
+
+STARTUP_PHASE_SECONDS = Gauge(
+    "product_startup_phase_seconds",
+    "Duration of each startup and warm-up phase",
+    ["phase"],
+)
+STARTUP_READY = Gauge("product_startup_ready", "1 once warm-up has finished")
+
+
+class Startup:
+    """Phase timings and the readiness flag."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases: Dict[str, float] = {}
+        self.ready = False
+
+    @asynccontextmanager
+    async def phase(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            self.phases[name] = round(elapsed, 3)
+            STARTUP_PHASE_SECONDS.labels(phase=name).set(elapsed)
+            logger.info("startup_phase", phase=name, seconds=round(elapsed, 3))
+
+    def mark_ready(self) -> None:
+        self.ready = True
+        STARTUP_READY.set(1)
+        total = time.perf_counter() - self.started
+        STARTUP_PHASE_SECONDS.labels(phase="total").set(total)
+        logger.info("✅ Product Service ready", seconds=round(total, 3), phases=self.phases)
+
+
+startup = Startup()
+
+
+def should_create_schema() -> bool:
+    if settings.STARTUP_CREATE_SCHEMA is not None:
+        return settings.STARTUP_CREATE_SCHEMA
+    return settings.ENVIRONMENT != "production"
+
+
+async def create_schema(engine) -> None:
+    # Trigram indexes need pg_trgm
+    async with engine.begin() as conn:
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        await conn.run_sync(Base.metadata.create_all)
+    # create_all skips existing tables; bring older ones up to date
+    await migrate_search(engine)
+    await migrate_tags(engine)
+    await migrate_low_stock(engine)
+    await migrate_changes(engine)
+
+
+# ── Warm-up ────────────────────────────────────────────────
+async def prewarm_pool(engine, connections: int) -> None:
+    """Open ``connections`` at once and return them to the pool."""
+    async def open_one():
+        conn = await engine.connect()
+        await conn.execute(text("SELECT 1"))
+        return conn
+
+    opened = await asyncio.gather(*(open_one() for _ in range(connections)), return_exceptions=True)
+    for conn in opened:
+        if isinstance(conn, BaseException):
+            logger.warning("pool_prewarm_failed", error=str(conn))
+        else:
+            await conn.close()
+
+
+async def preload(app, paths: List[str]) -> None:
+    """Serve each path once in-process; errors are logged, not raised."""
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://warmup") as client:
+        for path in paths:
+            try:
+                response = await client.get(path)
+            except Exception as e:  # the app's exception, re-raised by the transport
+                logger.warning("preload_failed", path=path, error=str(e))
+                continue
+            if response.status_code >= 400:
+                logger.warning("preload_failed", path=path, status_code=response.status_code)
+
+
+async def warm_up(app, engines, snapshot=None) -> None:
+    """Run the warm-up phases, then flip readiness whatever their outcome."""
+    deadline = asyncio.get_running_loop().time() + settings.STARTUP_WARMUP_TIMEOUT
+    if settings.STARTUP_PREWARM_CONNECTIONS > 0:
+        await _bounded("pool", deadline, asyncio.gather(*(
+            prewarm_pool(engine, settings.STARTUP_PREWARM_CONNECTIONS) for engine in engines
+        )))
+    if snapshot is not None:
+        # Not bounded: a cancelled build would leave no refresher behind
+        async with startup.phase("snapshot"):
+            await snapshot.start()
+    if settings.STARTUP_PRELOAD_PATHS:
+        await _bounded("preload", deadline, preload(app, settings.STARTUP_PRELOAD_PATHS))
+    startup.mark_ready()
+
+
+async def _bounded(name: str, deadline: float, work: Awaitable) -> None:
+    try:
+        async with startup.phase(name):
+            async with asyncio.timeout_at(deadline):
+                await work
+    except TimeoutError:
+        logger.warning("warmup_timed_out", phase=name, timeout=settings.STARTUP_WARMUP_TIMEOUT)
+    except Exception as e:
+        logger.warning("warmup_failed", phase=name, error=str(e))
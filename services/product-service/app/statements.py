@@ -0,0 +1,56 @@
+# ============================================================
+# Product Service — Reusable Statements
+# ============================================================
+#
+# Building a select() is pure Python work: constructing the clause
+# tree, then traversing it for the cache key SQLAlchemy uses to find
+# the compiled SQL. For a full product select that is a few hundred
+# microseconds of CPU per request, repeated for identical SQL.
+#
+# Hot statements are therefore built once, with bindparam()s where the
+# request's values go, and executed with a parameter dict. A reused
+# statement object keeps its memoized cache key, so execution goes
+# straight to the engine's compiled cache (DB_COMPILED_CACHE_SIZE),
+# and from there to asyncpg's per-connection prepared statement
+# (DB_PREPARED_STATEMENT_CACHE_SIZE). Statements whose structure
+# varies, like listings, are kept per shape (which filters are set,
+# fields, sort) in a bounded StatementCache.
+
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+from prometheus_client import Counter
+
+from app.config import settings
+
+STATEMENT_CACHE = Counter(
+    "product_statement_cache_total",
+    "Statement shape lookups by result (hit, miss)",
+    ["result"],
+)
+
+
+class StatementCache:
+    """Built statements by shape key, least recently used evicted first."""
+
+    def __init__(self, max_entries: int = settings.DB_STATEMENT_SHAPES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable, build: Callable[[], Any]) -> Any:
+        statement = self._entries.get(key)
+        if statement is not None:
+            self._entries.move_to_end(key)
+            STATEMENT_CACHE.labels(result="hit").inc()
+            return statement
+        STATEMENT_CACHE.labels(result="miss").inc()
+        statement = self._entries[key] = build()
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return statement
+
+
+statements = StatementCache()
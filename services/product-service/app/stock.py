@@ -0,0 +1,114 @@
+# ============================================================
+# Product Service — Stock Reservation
+# ============================================================
+#
+# Checkout decrements every line item in one statement:
+#
+#   WITH req AS (SELECT unnest(:ids) AS id, unnest(:qtys) AS qty),
+#        locked AS (SELECT id FROM products JOIN req ... ORDER BY id FOR UPDATE OF products)
+#   UPDATE products SET quantity = quantity - req.qty
+#   FROM req WHERE products.id = req.id AND products.quantity >= req.qty
+#   RETURNING id, quantity, low_stock_threshold
+#
+# Rows are locked in id order so concurrent multi-item checkouts cannot
+# deadlock, and the quantity guard is re-checked after any lock wait,
+# so stock never goes negative. If fewer rows come back than were
+# requested, the caller rolls the whole transaction back. Otherwise
+# items that dropped to their low_stock_threshold are recorded as
+# alerts (the previous quantity is the new one plus what was reserved).
+
+import time
+from collections import defaultdict
+from typing import Dict, List
+from uuid import UUID
+
+from prometheus_client import Counter, Histogram
+from sqlalchemy import Integer, bindparam, func, select, update
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.low_stock import record_crossings
+from app.models import Product
+
+RESERVATION_SECONDS = Histogram(
+    "product_stock_reservation_seconds",
+    "Latency of the stock reservation statement, including row lock waits",
+    buckets=[0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5],
+)
+RESERVATIONS = Counter(
+    "product_stock_reservations_total",
+    "Stock reservations by outcome (reserved, insufficient, not_found)",
+    ["result"],
+)
+RESERVED_UNITS = Counter(
+    "product_stock_reserved_units_total",
+    "Units of stock successfully reserved",
+)
+
+
+def reservation_statement(quantities: Dict[UUID, int]):
+    """Conditional multi-row decrement returning the new quantities."""
+    ids = list(quantities)
+    req = select(
+        func.unnest(bindparam("ids", ids, type_=ARRAY(PG_UUID(as_uuid=True)))).label("id"),
+        func.unnest(bindparam("qtys", [quantities[i] for i in ids], type_=ARRAY(Integer))).label("qty"),
+    ).cte("req")
+    locked = (
+        select(Product.id)
+        .join(req, Product.id == req.c.id)
+        .order_by(Product.id)
+        .with_for_update(of=Product)
+        .cte("locked")
+    )
+    return (
+        update(Product)
+        .where(Product.id == req.c.id)
+        .where(Product.id.in_(select(locked.c.id)))
+        .where(Product.quantity >= req.c.qty)
+        .values(quantity=Product.quantity - req.c.qty)
+        .returning(Product.id, Product.quantity, Product.low_stock_threshold)
+        .execution_options(synchronize_session=False)
+    )
+
+
+class ReservationFailed(Exception):
+    """Some items could not be reserved; nothing should be committed."""
+
+    def __init__(self, insufficient: List[UUID], not_found: List[UUID]):
+        super().__init__("Insufficient stock")
+        self.insufficient = insufficient
+        self.not_found = not_found
+
+
+async def reserve_stock(db: AsyncSession, items: List[tuple]) -> Dict[UUID, int]:
+    """Decrement stock for ``(product_id, qty)`` pairs, all or nothing.
+
+    Returns the new quantity per product. Raises ReservationFailed when
+    any product is missing or short; the caller must roll back.
+    """
+    quantities: Dict[UUID, int] = defaultdict(int)
+    for product_id, qty in items:
+        quantities[product_id] += qty
+
+    started = time.perf_counter()
+    result = await db.execute(reservation_statement(quantities))
+    rows = result.all()
+    reserved = {product_id: quantity for product_id, quantity, _ in rows}
+    RESERVATION_SECONDS.observe(time.perf_counter() - started)
+
+    if len(reserved) == len(quantities):
+        RESERVATIONS.labels(result="reserved").inc()
+        RESERVED_UNITS.inc(sum(quantities.values()))
+        await record_crossings(db, [
+            (product_id, quantity, threshold, quantity + quantities[product_id], threshold)
+            for product_id, quantity, threshold in rows
+        ])
+        return reserved
+
+    missing = [product_id for product_id in quantities if product_id not in reserved]
+    result = await db.execute(select(Product.id).where(Product.id.in_(missing)))
+    existing = set(result.scalars().all())
+    insufficient = [product_id for product_id in missing if product_id in existing]
+    not_found = [product_id for product_id in missing if product_id not in existing]
+    RESERVATIONS.labels(result="not_found" if not_found else "insufficient").inc()
+    raise ReservationFailed(insufficient, not_found)
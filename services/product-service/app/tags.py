@@ -0,0 +1,83 @@
+# ============================================================
+# Product Service — Tag Filtering & Tag Cloud
+# ============================================================
+#
+# Clients still read and write ``tags`` as a comma-separated string.
+# Postgres derives products.tag_list (text[], trimmed and lower-cased)
+# from it on every write and indexes it with GIN, so
+#
+#   tags=a,b&tags_match=any   tag_list && '{a,b}'   (overlap)
+#   tags=a,b&tags_match=all   tag_list @> '{a,b}'   (contains)
+#
+# are index-served, and the tag cloud unnests tag_list instead of
+# splitting strings row by row.
+#
+# Existing databases get the column with ``python -m app.tags``: adding
+# a stored generated column backfills it from the current strings (and
+# rewrites the table under an exclusive lock, so run it off-peak); the
+# index is then built CONCURRENTLY. Both steps are idempotent.
+
+import asyncio
+from typing import List, Optional
+
+from fastapi import HTTPException
+from sqlalchemy import func, select, text
+
+from app.config import settings
+from app.models import Product, TAG_LIST_SQL
+from app.utils.logger import logger
+
+TAGS_MATCH_PATTERN = "^(any|all)$"
+
+MIGRATION = [
+    "ALTER TABLE products ADD COLUMN IF NOT EXISTS tag_list TEXT[] "
+    f"GENERATED ALWAYS AS ({TAG_LIST_SQL}) STORED NOT NULL",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_product_tag_list ON products USING gin (tag_list)",
+]
+
+
+def parse_tags(tags: Optional[str]) -> Optional[List[str]]:
+    """Normalize a comma-separated ``tags`` filter the way tag_list is derived."""
+    if not tags:
+        return None
+    parsed = sorted({tag.strip().lower() for tag in tags.split(",") if tag.strip()})
+    if len(parsed) > settings.TAG_FILTER_MAX:
+        raise HTTPException(status_code=400, detail=f"At most {settings.TAG_FILTER_MAX} tags per filter")
+    return parsed or None
+
+
+def tags_condition(tags: List[str], match: str = "any"):
+    """Products carrying any (overlap) or all (containment) of ``tags``."""
+    if match == "all":
+        return Product.tag_list.contains(tags)
+    return Product.tag_list.overlap(tags)
+
+
+def tag_cloud_statement(conditions: list, limit: int):
+    """Most used tags among products matching ``conditions``, with counts.
+
+    A count is of products, so a tag listed twice on one product counts once.
+    """
+    tagged = select(Product.id, func.unnest(Product.tag_list).label("tag")).where(*conditions).subquery()
+    count = func.count(tagged.c.id.distinct()).label("count")
+    return (
+        select(tagged.c.tag, count)
+        .group_by(tagged.c.tag)
+        .order_by(count.desc(), tagged.c.tag)
+        .limit(limit)
+    )
+
+
+async def migrate(engine) -> None:
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        for statement in MIGRATION:
+            await conn.execute(text(statement))
+    logger.info("tag_list_migrated")
+
+
+if __name__ == "__main__":
+    from app.database import engine
+
+    asyncio.run(migrate(engine))
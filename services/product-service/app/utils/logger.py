@@ -1,22 +1,156 @@
 # ============================================================
 # Product Service — Structured Logger
 # ============================================================
+#
+# With LOG_ASYNC (the default) the event loop only builds the event
+# dict; rendering to JSON and writing to stdout happen on a writer
+# thread fed by a bounded queue. When the queue is full, events are
+# dropped and counted rather than blocking a request. LOG_ASYNC=false
+# restores synchronous print()-based output.
 
+import atexit
+import logging
+import queue
+import sys
+import threading
+import time
+from typing import Any, Optional
+
+import orjson
 import structlog
+from prometheus_client import Counter, Gauge
+
+from app.config import settings
+
+LOG_EVENTS_DROPPED = Counter(
+    "product_log_events_dropped_total",
+    "Log events discarded because the log queue was full",
+)
+LOG_QUEUE_DEPTH = Gauge("product_log_queue_depth", "Log events waiting to be written")
+
+
+def _capture_exc_info(logger, method_name: str, event_dict: dict) -> dict:
+    # The writer thread has no exception context; resolve it now
+    if event_dict.get("exc_info") is True:
+        event_dict["exc_info"] = sys.exc_info()
+    return event_dict
+
+
+def _enqueue(logger, method_name: str, event_dict: dict):
+    event_dict["timestamp"] = time.time()
+    return (event_dict,), {}
+
+
+class QueueSink:
+    """Renders and writes queued event dicts on a daemon thread."""
+
+    def __init__(self, max_size: int = settings.LOG_QUEUE_SIZE, batch_size: int = 256):
+        self.queue: "queue.Queue[Optional[dict]]" = queue.Queue(maxsize=max_size)
+        self.batch_size = batch_size
+        self._thread: Optional[threading.Thread] = None
+        LOG_QUEUE_DEPTH.set_function(self.queue.qsize)
+
+    def put(self, event_dict: dict) -> None:
+        if self._thread is None:
+            self.start()
+        try:
+            self.queue.put_nowait(event_dict)
+        except queue.Full:
+            LOG_EVENTS_DROPPED.inc()
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+
+    def close(self, timeout: float = 2.0) -> None:
+        """Write out what is queued and stop the writer."""
+        if self._thread is None:
+            return
+        try:
+            self.queue.put(None, timeout=timeout)
+        except queue.Full:
+            return
+        self._thread.join(timeout)
+        self._thread = None
 
-structlog.configure(
-    processors=[
+    @staticmethod
+    def render(event_dict: dict) -> bytes:
+        event_dict = structlog.processors.format_exc_info(None, "", event_dict)
+        stamp = event_dict.get("timestamp")
+        if isinstance(stamp, float):
+            event_dict["timestamp"] = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(stamp)) + (
+                ".%06dZ" % int((stamp % 1) * 1_000_000)
+            )
+        return orjson.dumps(event_dict, default=repr) + b"\n"
+
+    def _run(self) -> None:
+        stop = False
+        while not stop:
+            batch = [self.queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = None in batch
+            lines = []
+            for event_dict in batch:
+                if event_dict is None:
+                    continue
+                try:
+                    lines.append(self.render(event_dict))
+                except Exception as e:  # never let one bad event kill the writer
+                    lines.append(orjson.dumps({"event": "log_render_failed", "error": str(e)}) + b"\n")
+            try:
+                # Resolved per batch, like print(), so redirected stdout is honoured
+                out = sys.stdout
+                out.write(b"".join(lines).decode())
+                out.flush()
+            except Exception:
+                pass
+
+
+class QueueLogger:
+    """structlog logger whose every method hands the event to the sink."""
+
+    def __init__(self, sink: QueueSink):
+        self._sink = sink
+
+    def msg(self, event_dict: Any) -> None:
+        self._sink.put(event_dict)
+
+    debug = info = warning = warn = error = critical = exception = fatal = log = msg
+
+
+sink = QueueSink()
+atexit.register(sink.close)
+
+
+def configure(async_sink: bool = settings.LOG_ASYNC, level: str = settings.LOG_LEVEL) -> None:
+    shared = [
         structlog.contextvars.merge_contextvars,
         structlog.processors.add_log_level,
         structlog.processors.StackInfoRenderer(),
         structlog.dev.set_exc_info,
-        structlog.processors.TimeStamper(fmt="iso"),
-        structlog.processors.JSONRenderer(),
-    ],
-    wrapper_class=structlog.make_filtering_bound_logger(0),
-    context_class=dict,
-    logger_factory=structlog.PrintLoggerFactory(),
-    cache_logger_on_first_use=True,
-)
+    ]
+    if async_sink:
+        processors = shared + [_capture_exc_info, _enqueue]
+        factory = lambda *args: QueueLogger(sink)  # noqa: E731
+    else:
+        processors = shared + [
+            structlog.processors.TimeStamper(fmt="iso"),
+            structlog.processors.JSONRenderer(),
+        ]
+        factory = structlog.PrintLoggerFactory()
+    structlog.configure(
+        processors=processors,
+        wrapper_class=structlog.make_filtering_bound_logger(logging.getLevelName(level.upper())),
+        context_class=dict,
+        logger_factory=factory,
+        cache_logger_on_first_use=True,
+    )
+
+
+configure()
 
 logger = structlog.get_logger("product-service")
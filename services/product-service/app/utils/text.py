@@ -0,0 +1,13 @@
+# ============================================================
+# Product Service — Text Helpers
+# ============================================================
+
+import re
+
+
+def slugify(text: str) -> str:
+    """Convert text to URL-friendly slug."""
+    text = text.lower().strip()
+    text = re.sub(r"[^\w\s-]", "", text)
+    text = re.sub(r"[\s_-]+", "-", text)
+    return text
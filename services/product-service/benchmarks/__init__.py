@@ -0,0 +1 @@
+# Product Service Benchmarks
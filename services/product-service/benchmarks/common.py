@@ -0,0 +1,75 @@
+# ============================================================
+# Product Service — Benchmark Reporting Helpers
+# ============================================================
+#
+# Latency summaries and baseline comparison shared by the benchmark
+# drivers. Reports are plain JSON so they can be stored next to a
+# change and diffed or compared in CI.
+
+import json
+import statistics
+from typing import Dict, List, Optional
+
+# Metrics where a higher number is better; everything else is a latency
+HIGHER_IS_BETTER = {"throughput_rps"}
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def latency_summary(latencies: List[float]) -> Dict[str, float]:
+    """p50/p95/p99/max in milliseconds for latencies in seconds."""
+    if not latencies:
+        return {"p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+    return {
+        "p50": round(statistics.median(latencies) * 1000, 2),
+        "p95": round(percentile(latencies, 95) * 1000, 2),
+        "p99": round(percentile(latencies, 99) * 1000, 2),
+        "max": round(max(latencies) * 1000, 2),
+    }
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> List[dict]:
+    """Metrics of ``current`` that regressed by more than ``tolerance``.
+
+    Both arguments are reports with a ``scenarios`` mapping. Scenarios
+    missing from either side are skipped; latencies are compared at
+    p50/p95/p99 and throughput as is.
+    """
+    regressions = []
+    for name, result in current["scenarios"].items():
+        reference = baseline.get("scenarios", {}).get(name)
+        if reference is None:
+            continue
+        pairs = [("throughput_rps", result["throughput_rps"], reference["throughput_rps"])]
+        pairs += [
+            (f"latency_ms.{pct}", result["latency_ms"][pct], reference["latency_ms"][pct])
+            for pct in ("p50", "p95", "p99")
+        ]
+        for metric, value, expected in pairs:
+            if not expected:
+                continue
+            change = (value - expected) / expected
+            worse = -change if metric in HIGHER_IS_BETTER else change
+            if worse > tolerance:
+                regressions.append({
+                    "scenario": name, "metric": metric,
+                    "baseline": expected, "current": value,
+                    "change_pct": round(change * 100, 1),
+                })
+    return regressions
+
+
+def load_report(path: str) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def write_report(report: dict, path: Optional[str]) -> None:
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if path:
+        with open(path, "w") as f:
+            f.write(text + "\n")
+    print(text)
@@ -0,0 +1,170 @@
+# ============================================================
+# Product Service — Request Logging Pipeline Benchmark
+# ============================================================
+#
+# Requests per second through a trivial endpoint with:
+#
+#   sync     the previous setup: @app.middleware("http") wrapper and
+#            structlog printing JSON on the event loop
+#   async    RequestContextMiddleware (pure ASGI) and the queue-backed
+#            log sink
+#   sampled  async, with request_completed sampled at 10%
+#
+# Each variant runs in its own process, because structlog caches its
+# configuration on first use, and calls the ASGI app directly so the
+# numbers show middleware and logging cost rather than HTTP parsing.
+# Log lines go to a real file (as stdout would in a container).
+#
+#   python -m benchmarks.logging_pipeline --requests 20000 --concurrency 100
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.common import latency_summary
+
+VARIANTS = {
+    "sync": {"LOG_ASYNC": "false"},
+    "async": {"LOG_ASYNC": "true"},
+    "sampled": {"LOG_ASYNC": "true", "LOG_REQUEST_SAMPLE_RATE": "0.1"},
+}
+
+
+def build_app(variant: str):
+    import uuid
+
+    from fastapi import FastAPI, Request
+
+    from app.middleware import RequestContextMiddleware
+    from app.utils.logger import logger
+
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    if variant == "sync":
+        @app.middleware("http")
+        async def add_request_id(request: Request, call_next):
+            request_id = request.headers.get("X-Request-ID", str(uuid.uuid4()))
+            start_time = time.time()
+            response = await call_next(request)
+            process_time = time.time() - start_time
+            response.headers["X-Request-ID"] = request_id
+            response.headers["X-Process-Time"] = str(round(process_time, 4))
+            logger.info(
+                "request_completed", method=request.method, path=request.url.path,
+                status_code=response.status_code, process_time=round(process_time, 4),
+                request_id=request_id,
+            )
+            return response
+    else:
+        app.add_middleware(RequestContextMiddleware)
+    return app
+
+
+async def call(app, path: str) -> None:
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "GET", "scheme": "http", "path": path, "raw_path": path.encode(),
+        "query_string": b"", "root_path": "", "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 50000), "server": ("bench", 80), "state": {},
+    }
+
+    # Like a server: the body once, then a disconnect after the response
+    sent = asyncio.Event()
+    messages = [{"type": "http.request", "body": b"", "more_body": False}]
+
+    async def receive():
+        if messages:
+            return messages.pop()
+        await sent.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.body" and not message.get("more_body", False):
+            sent.set()
+
+    await app(scope, receive, send)
+
+
+async def drive(app, requests: int, concurrency: int) -> dict:
+    latencies = []
+    remaining = requests
+
+    async def worker():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            started = time.perf_counter()
+            await call(app, "/ping")
+            latencies.append(time.perf_counter() - started)
+
+    await asyncio.gather(*(worker() for _ in range(min(concurrency, 50))))  # warm up
+    latencies.clear()
+    remaining = requests
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {
+        "throughput_rps": round(requests / elapsed, 1),
+        "latency_ms": latency_summary(latencies),
+    }
+
+
+def child(variant: str, requests: int, concurrency: int, result_path: str) -> None:
+    from app.utils.logger import LOG_EVENTS_DROPPED, sink
+
+    result = asyncio.run(drive(build_app(variant), requests, concurrency))
+    sink.close(timeout=30)
+    result["dropped"] = LOG_EVENTS_DROPPED._value.get()
+    with open(result_path, "w") as f:
+        json.dump(result, f)
+
+
+def parent(requests: int, concurrency: int) -> dict:
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for variant, env in VARIANTS.items():
+            result_path = os.path.join(tmp, f"{variant}.json")
+            with open(os.path.join(tmp, f"{variant}.log"), "w") as log:
+                subprocess.run(
+                    [sys.executable, "-m", "benchmarks.logging_pipeline", "--child", variant,
+                     "--requests", str(requests), "--concurrency", str(concurrency),
+                     "--result", result_path],
+                    env={**os.environ, **env, "LOG_LEVEL": "INFO"},
+                    stdout=log, check=True,
+                )
+            with open(result_path) as f:
+                results[variant] = json.load(f)
+    return {
+        "scenario": "logging_pipeline",
+        "requests": requests,
+        "concurrency": concurrency,
+        "scenarios": results,
+        "speedup_async": round(results["async"]["throughput_rps"] / results["sync"]["throughput_rps"], 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Request middleware and logging overhead")
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--child", choices=list(VARIANTS), help=argparse.SUPPRESS)
+    parser.add_argument("--result", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child, args.requests, args.concurrency, args.result)
+        return
+    print(json.dumps(parent(args.requests, args.concurrency), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+# ============================================================
+# Product Service — Read Path Benchmark
+# ============================================================
+#
+# Per-request cost of the get_product and list_products queries on the
+# previous read path and on the lean one:
+#
+#   baseline  transactional session (BEGIN ... COMMIT), statement
+#             rebuilt from scratch for every request
+#   lean      autocommit read session, statement built once per shape
+#             and executed with fresh parameters
+#
+# Without --database-url only the CPU side is measured: building the
+# statement and looking up its compiled form, which is all the Python
+# work that differs before the driver is involved. With a database
+# loaded by benchmarks.catalog, each variant also runs the queries for
+# real and reports latency percentiles and process CPU per request:
+#
+#   python -m benchmarks.read_path --iterations 20000
+#   python -m benchmarks.read_path --database-url postgresql+asyncpg://... \
+#       --iterations 5000 --output read_path.json
+#
+# DB_PREPARED_STATEMENT_CACHE_SIZE=0 in the environment shows the cost
+# of preparing every statement again.
+
+import argparse
+import asyncio
+import random
+import time
+import uuid
+from typing import Callable, Dict, List
+
+from sqlalchemy import and_, text
+from sqlalchemy.dialects.postgresql import asyncpg
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.database import create_engine
+from app.models import Product
+from app.pagination import keyset_order
+from app.projection import PRODUCT_FIELDS, product_select
+from app.replicas import autocommit
+from app.routers.products import PRODUCT_BY_ID, bound_filters, listing_statement, product_conditions
+from app.statements import StatementCache
+from benchmarks.common import latency_summary, write_report
+
+LIST_FILTERS = dict(
+    category_id=None, is_active=True, is_featured=None, min_price=10.0, max_price=500.0,
+    search=None, tags=None, tags_match="any",
+)
+LIST_LIMIT = 20
+
+
+# ── Statements, old and new ────────────────────────────────
+def baseline_get(product_id):
+    query, _ = product_select(PRODUCT_FIELDS)
+    return query.where(Product.id == product_id), None
+
+
+def baseline_list(filters: dict):
+    query, _ = product_select(PRODUCT_FIELDS, Product.created_at.label("sort_key"))
+    query = query.where(and_(*product_conditions(**filters)))
+    query = query.order_by(*keyset_order(Product.created_at, Product.id, "desc"))
+    return query.offset(0).limit(LIST_LIMIT + 1), None
+
+
+shapes = StatementCache()
+
+
+def lean_get(product_id):
+    return PRODUCT_BY_ID, {"product_id": product_id}
+
+
+def lean_list(filters: dict):
+    placeholders, values, shape = bound_filters(filters)
+    query, _ = shapes.get(
+        ("list_products", shape),
+        lambda: listing_statement(placeholders, PRODUCT_FIELDS, "created_at", "desc", False),
+    )
+    return query, dict(values, offset=0, limit=LIST_LIMIT + 1)
+
+
+VARIANTS = {
+    "baseline": {"get_product": baseline_get, "list_products": baseline_list},
+    "lean": {"get_product": lean_get, "list_products": lean_list},
+}
+
+
+def arguments(scenario: str, product_ids: List) -> Callable:
+    if scenario == "get_product":
+        return lambda: random.choice(product_ids)
+    return lambda: dict(LIST_FILTERS, min_price=random.choice([5.0, 10.0, 25.0]))
+
+
+# ── CPU only ───────────────────────────────────────────────
+def statement_cpu(iterations: int) -> Dict[str, dict]:
+    """Microseconds of CPU per request to build and find the compiled SQL."""
+    dialect = asyncpg.dialect()
+    results = {}
+    for variant, builders in VARIANTS.items():
+        for scenario, build in builders.items():
+            compiled_cache = {}
+            next_args = arguments(scenario, [uuid.uuid4() for _ in range(100)])
+            started = time.process_time()
+            for _ in range(iterations):
+                statement, _ = build(next_args())
+                key = statement._generate_cache_key().key  # what the engine's cache is keyed on
+                if key not in compiled_cache:
+                    compiled_cache[key] = statement.compile(dialect=dialect)
+            elapsed = time.process_time() - started
+            results.setdefault(scenario, {})[variant] = round(elapsed / iterations * 1e6, 1)
+    return results
+
+
+# ── Against a database ─────────────────────────────────────
+async def run_queries(url: str, iterations: int) -> Dict[str, dict]:
+    engine = create_engine(url, "bench")
+    sessions = {
+        "baseline": async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False),
+        "lean": async_sessionmaker(autocommit(engine), class_=AsyncSession, expire_on_commit=False, autoflush=False),
+    }
+    async with engine.connect() as conn:
+        product_ids = (await conn.execute(text("SELECT id FROM products LIMIT 1000"))).scalars().all()
+    if not product_ids:
+        raise SystemExit("no products; load a catalog with benchmarks.catalog first")
+
+    results = {}
+    try:
+        for scenario in ("get_product", "list_products"):
+            next_args = arguments(scenario, product_ids)
+            for variant, builders in VARIANTS.items():
+                build, session_factory = builders[scenario], sessions[variant]
+                latencies = []
+                for warm_up in (True, False):
+                    cpu_started = time.process_time()
+                    for _ in range(50 if warm_up else iterations):
+                        started = time.perf_counter()
+                        async with session_factory() as session:
+                            statement, params = build(next_args())
+                            (await session.execute(statement, params)).all()
+                            if variant == "baseline":
+                                await session.commit()  # as get_db did
+                        latencies.append(time.perf_counter() - started)
+                    if warm_up:
+                        latencies.clear()
+                cpu = time.process_time() - cpu_started
+                results.setdefault(scenario, {})[variant] = {
+                    "latency_ms": latency_summary(latencies),
+                    "cpu_us_per_request": round(cpu / iterations * 1e6, 1),
+                }
+    finally:
+        await engine.dispose()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Lean read path benchmark")
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--database-url", help="Also run the queries against this database")
+    parser.add_argument("--output", help="Write the report to this file")
+    args = parser.parse_args()
+
+    report = {
+        "scenario": "read_path",
+        "iterations": args.iterations,
+        "statement_cpu_us": statement_cpu(args.iterations),
+    }
+    if args.database_url:
+        report["database"] = asyncio.run(run_queries(args.database_url, args.iterations))
+    write_report(report, args.output)
+
+
+if __name__ == "__main__":
+    main()
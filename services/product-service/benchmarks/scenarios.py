@@ -0,0 +1,247 @@
+# ============================================================
+# Product Service — Scenario Load Driver
+# ============================================================
+#
+# Drives a running service with closed-loop clients and reports
+# p50/p95/p99 latency and throughput per scenario as JSON:
+#
+#   get_by_id        GET /products/{id}, uniform over the catalog
+#   get_hot          GET /products/{id}, 90% of reads on 100 hot products
+#   list_filtered    category + price range, random sort, first page
+#   deep_offset      pages 200-1000 with offset pagination
+#   deep_cursor      cursor walks, each client following next_cursor
+#   search           full-text search, half sorted by relevance
+#   write_mix        80% reads, 10% price updates, 10% single-item reservations
+#
+# Load the catalog first with benchmarks.catalog (same --products,
+# --categories and --seed), point a local service at that database and
+# run, e.g.:
+#
+#   python -m benchmarks.scenarios --url http://localhost:4002 \
+#       --products 1000000 --duration 30 --concurrency 50 --output run.json
+#   python -m benchmarks.scenarios ... --baseline baseline.json --tolerance 0.15
+#
+# With --baseline the exit status is 1 when any p50/p95/p99 or
+# throughput regressed by more than --tolerance.
+
+import argparse
+import asyncio
+import platform
+import random
+import time
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import httpx
+
+from benchmarks.catalog import ADJECTIVES, MATERIALS, NOUNS, TAGS, CatalogSpec
+from benchmarks.common import compare, latency_summary, load_report, write_report
+
+# Responses that count as a successful outcome rather than an error
+EXPECTED_STATUSES = {200, 304, 409}
+
+Scenario = Callable[["Client"], Awaitable[httpx.Response]]
+
+
+class Client:
+    """One closed-loop client: a shared HTTP pool plus its own RNG and state."""
+
+    def __init__(self, http: httpx.AsyncClient, spec: CatalogSpec, rng: random.Random):
+        self.http = http
+        self.spec = spec
+        self.rng = rng
+        self.cursor: Optional[str] = None
+        self.cursor_pages = 0
+
+    def product_id(self) -> str:
+        return str(self.spec.product_id(self.rng.randrange(self.spec.products)))
+
+    def hot_product_id(self) -> str:
+        if self.rng.random() < 0.9:
+            return str(self.spec.product_id(self.rng.randrange(min(100, self.spec.products))))
+        return self.product_id()
+
+    def category_id(self) -> str:
+        weights = self.spec.category_weights()
+        index = self.rng.choices(range(self.spec.categories), weights=weights)[0]
+        return str(self.spec.category_id(index))
+
+
+# ── Scenarios ──────────────────────────────────────────────
+async def get_by_id(client: Client) -> httpx.Response:
+    return await client.http.get(f"/products/{client.product_id()}")
+
+
+async def get_hot(client: Client) -> httpx.Response:
+    return await client.http.get(f"/products/{client.hot_product_id()}")
+
+
+async def list_filtered(client: Client) -> httpx.Response:
+    rng = client.rng
+    low = round(rng.uniform(0, 200), 2)
+    params = {
+        "category_id": client.category_id(),
+        "min_price": low,
+        "max_price": round(low * rng.uniform(1.5, 5) + 10, 2),
+        "sort_by": rng.choice(("created_at", "price", "name")),
+        "sort_order": rng.choice(("asc", "desc")),
+        "limit": 20,
+    }
+    return await client.http.get("/products/", params=params)
+
+
+async def deep_offset(client: Client) -> httpx.Response:
+    page = client.rng.randint(200, 1000)
+    return await client.http.get("/products/", params={"page": page, "limit": 20, "count_mode": "none"})
+
+
+async def deep_cursor(client: Client) -> httpx.Response:
+    params = {"limit": 20, "count_mode": "none", "sort_by": "price", "sort_order": "asc"}
+    if client.cursor and client.cursor_pages < 1000:
+        params["cursor"] = client.cursor
+    else:
+        client.cursor_pages = 0
+    response = await client.http.get("/products/", params=params)
+    if response.status_code == 200:
+        client.cursor = response.json()["pagination"]["next_cursor"]
+        client.cursor_pages += 1
+    return response
+
+
+async def search(client: Client) -> httpx.Response:
+    rng = client.rng
+    terms = rng.choice((ADJECTIVES, MATERIALS, NOUNS, TAGS))
+    params = {"search": rng.choice(terms), "limit": 20}
+    if rng.random() < 0.5:
+        params["sort_by"] = "relevance"
+    return await client.http.get("/products/", params=params)
+
+
+async def write_mix(client: Client) -> httpx.Response:
+    roll = client.rng.random()
+    product_id = client.hot_product_id()
+    if roll < 0.8:
+        return await client.http.get(f"/products/{product_id}")
+    if roll < 0.9:
+        price = round(client.rng.uniform(1, 500), 2) - 0.01
+        return await client.http.put(f"/products/{product_id}", json={"price": price})
+    return await client.http.post("/products/stock/reserve", json={
+        "items": [{"product_id": product_id, "quantity": 1}],
+    })
+
+
+SCENARIOS: Dict[str, Scenario] = {
+    "get_by_id": get_by_id,
+    "get_hot": get_hot,
+    "list_filtered": list_filtered,
+    "deep_offset": deep_offset,
+    "deep_cursor": deep_cursor,
+    "search": search,
+    "write_mix": write_mix,
+}
+
+
+# ── Runner ─────────────────────────────────────────────────
+async def run_scenario(
+    http: httpx.AsyncClient, spec: CatalogSpec, name: str,
+    concurrency: int, duration: float, warmup: float, seed: int,
+) -> dict:
+    scenario = SCENARIOS[name]
+    latencies: List[float] = []
+    statuses: Dict[int, int] = {}
+    errors = 0
+
+    async def worker(index: int, deadline: float, record: bool):
+        nonlocal errors
+        client = Client(http, spec, random.Random(f"{seed}:{name}:{index}"))
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                response = await scenario(client)
+            except httpx.HTTPError:
+                if record:
+                    errors += 1
+                continue
+            if record:
+                latencies.append(time.perf_counter() - started)
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    if warmup > 0:
+        deadline = time.perf_counter() + warmup
+        await asyncio.gather(*(worker(i, deadline, False) for i in range(concurrency)))
+
+    started = time.perf_counter()
+    deadline = started + duration
+    await asyncio.gather(*(worker(i, deadline, True) for i in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    errors += sum(count for status, count in statuses.items() if status not in EXPECTED_STATUSES)
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / elapsed, 1),
+        "latency_ms": latency_summary(latencies),
+        "statuses": {str(status): count for status, count in sorted(statuses.items())},
+    }
+
+
+async def run(
+    url: str, spec: CatalogSpec, names: List[str],
+    concurrency: int, duration: float, warmup: float,
+) -> dict:
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    results = {}
+    async with httpx.AsyncClient(base_url=url, timeout=30, limits=limits) as http:
+        for name in names:
+            results[name] = await run_scenario(http, spec, name, concurrency, duration, warmup, spec.seed)
+            print(f"  {name}: {results[name]['throughput_rps']} rps, "
+                  f"p99 {results[name]['latency_ms']['p99']} ms", flush=True)
+    return {
+        "meta": {
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "url": url,
+            "products": spec.products,
+            "categories": spec.categories,
+            "seed": spec.seed,
+            "concurrency": concurrency,
+            "duration_seconds": duration,
+            "python": platform.python_version(),
+            "host": platform.node(),
+        },
+        "scenarios": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latency and throughput per read/write scenario")
+    parser.add_argument("--url", default="http://localhost:4002")
+    parser.add_argument("--products", type=int, default=100_000)
+    parser.add_argument("--categories", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS),
+                        help="Comma-separated subset of: " + ", ".join(SCENARIOS))
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=30.0, help="Measured seconds per scenario")
+    parser.add_argument("--warmup", type=float, default=5.0, help="Unmeasured seconds per scenario")
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    parser.add_argument("--baseline", help="Report to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="Allowed relative regression")
+    args = parser.parse_args()
+
+    names = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = set(names).difference(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    spec = CatalogSpec(products=args.products, categories=args.categories, seed=args.seed)
+    report = asyncio.run(run(args.url, spec, names, args.concurrency, args.duration, args.warmup))
+
+    if args.baseline:
+        report["regressions"] = compare(report, load_report(args.baseline), args.tolerance)
+    write_report(report, args.output)
+    if report.get("regressions"):
+        raise SystemExit(f"{len(report['regressions'])} metric(s) regressed beyond {args.tolerance:.0%}")
+
+
+if __name__ == "__main__":
+    main()
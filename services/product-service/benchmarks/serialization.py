@@ -0,0 +1,106 @@
+# ============================================================
+# Product Service — Listing Serialization Micro-benchmark
+# ============================================================
+#
+# Measures CPU time to turn one listing page into JSON bytes:
+#
+#   orm      ORM objects -> ProductResponse.model_validate per row ->
+#            FastAPI-style second validation -> json dump
+#   fast     column rows -> dicts -> orjson (app.projection)
+#   sparse   fast path with fields=id,name,price
+#
+#   python -m benchmarks.serialization --page-size 100 --iterations 2000
+
+import argparse
+import json
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from app.models import Category, Product
+from app.projection import CATEGORY_FIELDS, CATEGORY_PREFIX, PRODUCT_FIELDS, dumps, row_to_dict
+from app.schemas import PaginationMeta, ProductListResponse, ProductResponse
+
+
+class FakeRow:
+    """Stand-in for sqlalchemy Row exposing ``_mapping``."""
+
+    def __init__(self, mapping):
+        self._mapping = mapping
+
+
+def make_page(size: int):
+    now = datetime(2024, 1, 1)
+    category = {
+        "id": uuid.uuid4(), "name": "Outdoor", "description": "Gear", "slug": "outdoor",
+        "is_active": True, "created_at": now, "updated_at": now,
+    }
+    products, rows = [], []
+    for i in range(size):
+        values = {
+            "id": uuid.uuid4(), "name": f"Product {i}", "description": "A fine product " * 5,
+            "slug": f"product-{i}", "sku": f"SKU-{i:06d}", "price": 10 + i * 0.25,
+            "compare_at_price": None, "cost_price": 5.0, "quantity": i, "low_stock_threshold": 10,
+            "is_active": True, "is_featured": i % 7 == 0, "weight": 1.5, "image_url": None,
+            "tags": "outdoor,summer", "category_id": category["id"],
+            "created_at": now - timedelta(minutes=i), "updated_at": now,
+        }
+        product = Product(**values)
+        product.category = Category(**category)
+        products.append(product)
+        mapping = dict(values)
+        mapping.update({CATEGORY_PREFIX + f: category[f] for f in CATEGORY_FIELDS})
+        rows.append(FakeRow(mapping))
+    return products, rows
+
+
+def orm_path(products):
+    response = ProductListResponse(
+        products=[ProductResponse.model_validate(p) for p in products],
+        pagination=PaginationMeta(page=1, limit=len(products), total=1000, pages=10),
+    )
+    # FastAPI validates the returned model against response_model again,
+    # dumps it in JSON mode and renders it with json.dumps
+    validated = ProductListResponse.model_validate(response.model_dump())
+    return json.dumps(validated.model_dump(mode="json")).encode()
+
+
+def fast_path(rows, fields):
+    return dumps({
+        "products": [row_to_dict(row, fields) for row in rows],
+        "pagination": PaginationMeta(page=1, limit=len(rows), total=1000, pages=10).model_dump(),
+    })
+
+
+def measure(fn, iterations):
+    fn()  # warm up
+    started = time.process_time()
+    for _ in range(iterations):
+        fn()
+    return (time.process_time() - started) / iterations
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-page serialization CPU time")
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--iterations", type=int, default=1000)
+    args = parser.parse_args()
+
+    products, rows = make_page(args.page_size)
+    sparse = ["id", "name", "price"]
+    results = {
+        "orm": measure(lambda: orm_path(products), args.iterations),
+        "fast": measure(lambda: fast_path(rows, PRODUCT_FIELDS), args.iterations),
+        "sparse": measure(lambda: fast_path(rows, sparse), args.iterations),
+    }
+    print(json.dumps({
+        "scenario": "listing_serialization",
+        "page_size": args.page_size,
+        "cpu_ms_per_page": {name: round(seconds * 1000, 3) for name, seconds in results.items()},
+        "speedup_fast": round(results["orm"] / results["fast"], 1),
+        "speedup_sparse": round(results["orm"] / results["sparse"], 1),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
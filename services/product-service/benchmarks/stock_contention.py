@@ -0,0 +1,85 @@
+# ============================================================
+# Product Service — Stock Contention Benchmark
+# ============================================================
+#
+# Hammers POST /products/stock/reserve for a single SKU from many
+# concurrent clients and checks that exactly the available stock was
+# sold. Run against a local service backed by a disposable database:
+#
+#   python -m benchmarks.stock_contention --url http://localhost:4002 \
+#       --stock 500 --clients 200 --requests 2000
+
+import argparse
+import asyncio
+import json
+import time
+import uuid
+
+import httpx
+
+from benchmarks.common import latency_summary
+
+
+async def run(url: str, stock: int, clients: int, requests: int, qty: int) -> dict:
+    async with httpx.AsyncClient(base_url=url, timeout=30) as client:
+        sku = f"BENCH-{uuid.uuid4().hex[:12]}"
+        response = await client.post("/products/", json={
+            "name": f"Contention {sku}", "sku": sku, "price": 1.0, "quantity": stock,
+        })
+        response.raise_for_status()
+        product_id = response.json()["id"]
+
+        latencies, outcomes = [], {}
+        queue = asyncio.Queue()
+        for _ in range(requests):
+            queue.put_nowait(None)
+
+        async def worker():
+            while not queue.empty():
+                queue.get_nowait()
+                started = time.perf_counter()
+                r = await client.post("/products/stock/reserve", json={
+                    "items": [{"product_id": product_id, "quantity": qty}],
+                })
+                latencies.append(time.perf_counter() - started)
+                outcomes[r.status_code] = outcomes.get(r.status_code, 0) + 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(clients)))
+        elapsed = time.perf_counter() - started
+
+        final = (await client.get(f"/products/{product_id}")).json()["quantity"]
+        await client.delete(f"/products/{product_id}")
+
+    sold = outcomes.get(200, 0) * qty
+    return {
+        "scenario": "stock_contention",
+        "requests": requests,
+        "clients": clients,
+        "throughput_rps": round(requests / elapsed, 1),
+        "latency_ms": latency_summary(latencies),
+        "outcomes": outcomes,
+        "initial_stock": stock,
+        "units_sold": sold,
+        "final_stock": final,
+        "oversold": sold > stock or final != stock - sold,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent checkouts against one SKU")
+    parser.add_argument("--url", default="http://localhost:4002")
+    parser.add_argument("--stock", type=int, default=500)
+    parser.add_argument("--clients", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--qty", type=int, default=1)
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args.url, args.stock, args.clients, args.requests, args.qty))
+    print(json.dumps(result, indent=2))
+    if result["oversold"]:
+        raise SystemExit("stock accounting mismatch")
+
+
+if __name__ == "__main__":
+    main()
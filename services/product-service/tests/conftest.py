@@ -0,0 +1,190 @@
+# ============================================================
+# Product Service — Test Fixtures
+# ============================================================
+
+import pytest
+from sqlalchemy.dialects.postgresql import asyncpg
+
+from app.cache import ResponseCache
+
+
+class FakeRedis:
+    """In-memory stand-in for the subset of redis.asyncio the service uses."""
+
+    def __init__(self):
+        self.store = {}
+        self.ttls = {}
+        self.fail = False
+
+    def _check(self):
+        if self.fail:
+            from redis.exceptions import ConnectionError
+            raise ConnectionError("fake redis is down")
+
+    async def ping(self):
+        self._check()
+        return True
+
+    async def get(self, key):
+        self._check()
+        return self.store.get(key)
+
+    async def mget(self, *keys):
+        self._check()
+        return [self.store.get(key) for key in keys]
+
+    async def set(self, key, value, ex=None):
+        self._check()
+        self.store[key] = value if isinstance(value, bytes) else str(value).encode()
+        if ex is not None:
+            self.ttls[key] = ex
+        return True
+
+    async def delete(self, *keys):
+        self._check()
+        return sum(self.store.pop(key, None) is not None for key in keys)
+
+    async def incr(self, key):
+        self._check()
+        value = int(self.store.get(key, b"0")) + 1
+        self.store[key] = str(value).encode()
+        return value
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    async def aclose(self):
+        pass
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.calls = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.calls.append((name, args, kwargs))
+            return self
+        return queue
+
+    async def execute(self):
+        return [await getattr(self.redis, name)(*args, **kwargs) for name, args, kwargs in self.calls]
+
+
+class FakeRow:
+    """Result row stub: columns by attribute and through ``_mapping``."""
+
+    def __init__(self, **values):
+        self._mapping = values
+
+    def __getattr__(self, name):
+        try:
+            return self._mapping[name]
+        except KeyError:
+            raise AttributeError(name)
+
+
+class FakeResult:
+    """Result stub: ``rows`` for all()/scalars()/iteration, or one ``scalar``."""
+
+    def __init__(self, rows=(), scalar=None):
+        self.rows = list(rows)
+        self._scalar = scalar
+
+    def all(self):
+        return self.rows
+
+    def scalars(self):
+        return self
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def scalar(self):
+        return self._scalar
+
+    def one_or_none(self):
+        return self.rows[0] if self.rows else None
+
+    def scalar_one_or_none(self):
+        return self.one_or_none()
+
+    async def partitions(self):
+        for batch in self.rows:
+            yield batch
+
+
+class FakeSession:
+    """AsyncSession stand-in answering each statement with a canned result.
+
+    Canned results are used in order: a FakeResult as is, a list as its
+    rows, anything else as a scalar. Executions with a list of parameter
+    dicts (executemany inserts) are kept in ``inserts`` as
+    ``(table name, rows)`` and use no canned result.
+    """
+
+    def __init__(self, *results):
+        self.results = list(results)
+        self.statements = []
+        self.inserts = []
+        self.info = {}
+        self.commits = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def begin(self):
+        return self
+
+    def _next_result(self):
+        result = self.results.pop(0)
+        if isinstance(result, FakeResult):
+            return result
+        if isinstance(result, list):
+            return FakeResult(result)
+        return FakeResult(scalar=result)
+
+    async def execute(self, statement, params=None):
+        if isinstance(params, list):
+            self.inserts.append((statement.table.name, params))
+            return FakeResult()
+        self.statements.append(statement)
+        return self._next_result()
+
+    async def scalar(self, statement, params=None):
+        return (await self.execute(statement, params)).scalar()
+
+    async def stream(self, statement):
+        self.statements.append(statement)
+        return self._next_result()
+
+    async def commit(self):
+        self.commits += 1
+
+    async def rollback(self):
+        pass
+
+
+def compile_pg(element, **compile_kwargs):
+    """SQL for ``element`` as the asyncpg dialect renders it."""
+    return str(element.compile(dialect=asyncpg.dialect(), compile_kwargs=compile_kwargs))
+
+
+@pytest.fixture
+def fake_session():
+    """Factory: ``fake_session(*results)`` builds a FakeSession."""
+    return FakeSession
+
+
+@pytest.fixture
+def fake_redis():
+    return FakeRedis()
+
+
+@pytest.fixture
+def response_cache(fake_redis):
+    return ResponseCache(redis=fake_redis, ttl=60, local_max_entries=4, local_ttl=30, enabled=True)
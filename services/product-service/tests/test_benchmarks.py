@@ -0,0 +1,41 @@
+# ============================================================
+# Product Service — Benchmark Tooling Tests
+# ============================================================
+
+from benchmarks.catalog import CatalogSpec, category_rows, product_rows
+from benchmarks.common import compare
+from benchmarks.read_path import statement_cpu
+
+
+def report(rps, p50, p95, p99):
+    return {"scenarios": {"get_by_id": {
+        "throughput_rps": rps, "latency_ms": {"p50": p50, "p95": p95, "p99": p99},
+    }}}
+
+
+def test_catalog_ranges_reproduce_independently():
+    spec = CatalogSpec(products=2000, categories=10, seed=7)
+    whole = list(product_rows(spec, 0, 2000))
+
+    assert list(product_rows(spec, 0, 500)) == whole[:500]
+    assert [row[0] for row in whole] == [spec.product_id(i) for i in range(2000)]
+    assert len({row[3] for row in whole}) == len({row[4] for row in whole}) == 2000  # slug, sku
+    category_ids = {row[0] for row in category_rows(spec)}
+    assert {row[15] for row in whole} - {None} <= category_ids
+
+
+def test_compare_flags_only_regressions_beyond_tolerance():
+    baseline = report(1000, 2.0, 5.0, 10.0)
+
+    assert compare(report(950, 2.1, 5.5, 10.0), baseline, 0.15) == []
+    regressions = compare(report(800, 2.0, 5.0, 13.0), baseline, 0.15)
+    assert [(r["metric"], r["change_pct"]) for r in regressions] == [
+        ("throughput_rps", -20.0), ("latency_ms.p99", 30.0),
+    ]
+
+
+def test_read_path_cpu_report_covers_both_variants():
+    report = statement_cpu(iterations=5)
+
+    assert set(report) == {"get_product", "list_products"}
+    assert all(set(variants) == {"baseline", "lean"} for variants in report.values())
@@ -0,0 +1,147 @@
+# ============================================================
+# Product Service — Response Cache Tests
+# ============================================================
+
+import pytest
+
+import app.cache
+from app.cache import CACHE_EVICTIONS, CACHE_REQUESTS, invalidate_category
+
+
+def counter_value(counter, **labels):
+    return counter.labels(**labels)._value.get()
+
+
+class CountingLoader:
+    def __init__(self, body=b'{"ok":true}'):
+        self.body = body
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        return self.body
+
+
+@pytest.mark.asyncio
+async def test_item_read_through_populates_both_layers(response_cache, fake_redis):
+    loader = CountingLoader()
+
+    assert await response_cache.get_item("products", "p1", loader) == loader.body
+    assert await response_cache.get_item("products", "p1", loader) == loader.body
+
+    assert loader.calls == 1
+    assert fake_redis.store["cache:products:item:p1:0"] == loader.body
+    assert fake_redis.ttls["cache:products:item:p1:0"] == 60
+
+
+@pytest.mark.asyncio
+async def test_redis_hit_refills_local_layer(response_cache, fake_redis):
+    fake_redis.store["cache:products:item:p1:0"] = b"cached"
+    loader = CountingLoader()
+    before = counter_value(CACHE_REQUESTS, namespace="products", layer="redis", result="hit")
+
+    assert await response_cache.get_item("products", "p1", loader) == b"cached"
+
+    assert loader.calls == 0
+    assert response_cache.local.get("cache:products:item:p1") == b"cached"
+    assert counter_value(CACHE_REQUESTS, namespace="products", layer="redis", result="hit") == before + 1
+
+
+@pytest.mark.asyncio
+async def test_invalidate_drops_item_and_bumps_listing_generation(response_cache, fake_redis):
+    item_loader = CountingLoader(b"item")
+    list_loader = CountingLoader(b"list")
+    params = {"page": 1, "limit": 20}
+
+    await response_cache.get_item("products", "p1", item_loader)
+    await response_cache.get_listing("products", params, list_loader)
+    await response_cache.invalidate("products", "p1")
+
+    assert "cache:products:item:p1:0" not in fake_redis.store
+    assert fake_redis.store["cache:products:gen"] == b"1"
+
+    await response_cache.get_item("products", "p1", item_loader)
+    await response_cache.get_listing("products", params, list_loader)
+    assert item_loader.calls == 2
+    assert list_loader.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_category_write_drops_every_product_item(response_cache, fake_redis, monkeypatch):
+    monkeypatch.setattr(app.cache, "cache", response_cache)
+    loader = CountingLoader(b"item")
+    await response_cache.get_item("products", "p1", loader)
+
+    await invalidate_category("c1")
+
+    assert fake_redis.store["cache:products:items:gen"] == b"1"
+    await response_cache.get_item("products", "p1", loader)
+    assert loader.calls == 2
+
+    # Single-item invalidation now targets the bumped generation
+    await response_cache.invalidate("products", "p1")
+    assert "cache:products:item:p1:1" not in fake_redis.store
+
+
+@pytest.mark.asyncio
+async def test_generation_bump_from_another_pod_skips_old_listings(response_cache, fake_redis):
+    loader = CountingLoader()
+    params = {"page": 1}
+
+    await response_cache.get_listing("products", params, loader)
+    await fake_redis.incr("cache:products:gen")
+    response_cache.local.clear()
+    await response_cache.get_listing("products", params, loader)
+
+    assert loader.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_fresh_read_skips_local_copies_from_before_another_pods_write(response_cache, fake_redis):
+    old, new = CountingLoader(b"old"), CountingLoader(b"new")
+    params = {"page": 1}
+    await response_cache.get_item("products", "p1", old)
+    await response_cache.get_listing("products", params, old)
+    # Another pod's write reaches Redis but not this pod's local layer
+    del fake_redis.store["cache:products:item:p1:0"]
+    await fake_redis.incr("cache:products:gen")
+
+    assert await response_cache.get_item("products", "p1", new) == b"old"  # no token: local hit
+    assert await response_cache.get_item("products", "p1", new, fresh=True) == b"new"
+    assert await response_cache.get_listing("products", params, new, fresh=True) == b"new"
+    assert new.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_listing_keys_differ_per_params(response_cache):
+    loader = CountingLoader()
+
+    await response_cache.get_listing("products", {"page": 1}, loader)
+    await response_cache.get_listing("products", {"page": 2}, loader)
+    await response_cache.get_listing("products", {"page": 1}, loader)
+
+    assert loader.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_local_lru_evicts_least_recently_used(response_cache):
+    response_cache.redis = None  # local layer only; no memoized generations taking slots
+    before = counter_value(CACHE_EVICTIONS, layer="local", reason="capacity")
+
+    for i in range(5):
+        await response_cache.get_item("products", f"p{i}", CountingLoader())
+
+    assert len(response_cache.local) == 4
+    assert response_cache.local.get("cache:products:item:p0") is None
+    assert counter_value(CACHE_EVICTIONS, layer="local", reason="capacity") == before + 1
+
+
+@pytest.mark.asyncio
+async def test_redis_outage_falls_back_to_loader(response_cache, fake_redis):
+    fake_redis.fail = True
+    loader = CountingLoader()
+
+    assert await response_cache.get_listing("products", {"page": 1}, loader) == loader.body
+    await response_cache.invalidate("products", "p1")
+
+    assert loader.calls == 1
@@ -0,0 +1,74 @@
+# ============================================================
+# Product Service — Category Router Tests
+# ============================================================
+
+import uuid
+from datetime import datetime
+
+import pytest
+from fastapi import HTTPException
+
+from app.models import Category
+from app.routers.categories import cache_namespace, delete_category, update_category, with_product_counts
+from app.schemas import CategoryUpdate
+
+
+def stored_category(name="Garden Tools", slug="garden-tools"):
+    return Category(id=uuid.uuid4(), name=name, slug=slug, is_active=True, created_at=datetime.utcnow())
+
+
+# ── Product Counts ─────────────────────────────────────────
+@pytest.mark.asyncio
+async def test_counts_come_from_one_grouped_query_and_default_to_zero(fake_session):
+    stocked, empty = stored_category(), stored_category("Empty", "empty")
+    db = fake_session([(stocked.id, 3, 2)])  # no row at all for the empty category
+
+    with_counts = await with_product_counts(db, [stocked, empty])
+
+    (statement,) = db.statements
+    sql = str(statement)
+    assert "GROUP BY products.category_id" in sql and "FILTER (WHERE products.is_active)" in sql
+    assert [(c.product_count.total, c.product_count.active) for c in with_counts] == [(3, 2), (0, 0)]
+
+
+@pytest.mark.asyncio
+async def test_no_categories_means_no_count_query(fake_session):
+    db = fake_session()
+
+    assert await with_product_counts(db, []) == []
+    assert db.statements == []
+
+
+def test_responses_with_counts_are_cached_under_products():
+    # Product writes bump "products", so cached counts cannot outlive them
+    assert cache_namespace("product_count") == "products"
+    assert cache_namespace(None) == "categories"
+
+
+# ── Writes ─────────────────────────────────────────────────
+@pytest.mark.asyncio
+async def test_rename_regenerates_slug_in_the_single_update(fake_session):
+    category = stored_category()
+    db = fake_session([category])
+
+    response = await update_category(category.id, CategoryUpdate(name="Garden Tools"), db=db)
+
+    (statement,) = db.statements
+    assert statement.compile().params["slug"] == "garden-tools"
+    assert "RETURNING" in str(statement)
+    assert response.slug == "garden-tools"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("write", [
+    lambda category_id, db: update_category(category_id, CategoryUpdate(name="X"), db=db),
+    lambda category_id, db: delete_category(category_id, db=db),
+])
+async def test_missing_category_is_not_found(write, fake_session):
+    db = fake_session([])
+
+    with pytest.raises(HTTPException) as exc:
+        await write(uuid.uuid4(), db)
+
+    assert exc.value.status_code == 404
+    assert db.inserts == []
@@ -0,0 +1,110 @@
+# ============================================================
+# Product Service — Change Feed Tests
+# ============================================================
+
+import time
+import uuid
+
+import pytest
+from fastapi import HTTPException
+
+from app.changes import MIGRATION, changes_statement, decode_position, encode_position, read_changes
+from app.config import settings
+from app.outbox import PRODUCT_EVENT_FIELDS
+from app.projection import CATEGORY_FIELDS
+from tests.conftest import FakeRow, compile_pg
+
+
+def key(entity, op, entity_id, txid, seq):
+    return FakeRow(entity=entity, op=op, entity_id=entity_id, txid=txid, seq=seq)
+
+
+def test_every_catalog_table_is_stamped_and_tombstoned_by_trigger():
+    triggers = [statement for statement in MIGRATION if "CREATE OR REPLACE TRIGGER" in statement]
+
+    for table, entity in (("products", "product"), ("categories", "category")):
+        assert any(f"BEFORE INSERT OR UPDATE ON {table}" in t for t in triggers)
+        assert any(f"AFTER DELETE ON {table}" in t and f"('{entity}')" in t for t in triggers)
+
+
+def test_feed_cuts_every_source_at_one_snapshot_and_resumes_after_cursor():
+    sql = compile_pg(changes_statement((2**40, 7), 100))
+
+    assert sql.count("< pg_snapshot_xmin(pg_current_snapshot())") == 3
+    assert "(products.change_txid, products.change_seq) > ($3::BIGINT, $4::BIGINT)" in sql
+    assert "(catalog_tombstones.txid, catalog_tombstones.id) > ($3::BIGINT, $4::BIGINT)" in sql
+    assert sql.rstrip().endswith("ORDER BY changes.txid, changes.seq \n LIMIT $8::INTEGER")
+
+
+def test_cursor_round_trips_and_expires_once_since_passes_retention():
+    now = time.time()
+    assert decode_position(encode_position((2**40, 9), now)) == ((2**40, 9), int(now))
+    assert decode_position(encode_position(None, now))[0] is None
+
+    stale = encode_position((1, 2), now - settings.CHANGE_RETENTION_DAYS * 86400 - 60)
+    with pytest.raises(HTTPException) as expired:
+        decode_position(stale)
+    with pytest.raises(HTTPException) as invalid:
+        decode_position("not-a-cursor")
+
+    assert (expired.value.status_code, invalid.value.status_code) == (410, 400)
+
+
+@pytest.mark.asyncio
+async def test_only_a_caught_up_page_renews_since(fake_session):
+    long_ago = time.time() - 86400
+    rows = [key("product", "delete", uuid.uuid4(), 10, seq) for seq in (1, 2)]
+
+    behind = await read_changes(fake_session(rows), (5, 6), 2, since=long_ago)
+    caught_up = await read_changes(fake_session(rows[:1]), (5, 6), 2, since=long_ago)
+
+    assert behind["has_more"] and decode_position(behind["next_cursor"])[1] == int(long_ago)
+    assert not caught_up["has_more"] and decode_position(caught_up["next_cursor"])[1] > long_ago
+
+
+@pytest.mark.asyncio
+async def test_behind_consumer_expires_even_with_a_fresh_cursor(fake_session):
+    rows = [key("product", "delete", uuid.uuid4(), 10, 1)]
+    started = time.time() - settings.CHANGE_RETENTION_DAYS * 86400 - 60
+    page = await read_changes(fake_session(rows), None, 1, since=started)  # issued just now, still has_more
+
+    with pytest.raises(HTTPException) as expired:
+        decode_position(page["next_cursor"])
+
+    assert expired.value.status_code == 410
+
+
+@pytest.mark.asyncio
+async def test_page_carries_current_rows_tombstones_and_the_last_position(fake_session):
+    category_id, product_id, deleted_id, vanished_id = (uuid.uuid4() for _ in range(4))
+    category = {name: None for name in CATEGORY_FIELDS} | {"id": category_id, "name": "Tools"}
+    product = {name: None for name in PRODUCT_EVENT_FIELDS} | {"id": product_id, "category_id": category_id}
+    db = fake_session(
+        [
+            key("category", "upsert", category_id, 10, 1),
+            key("product", "upsert", product_id, 10, 2),
+            key("product", "delete", deleted_id, 11, 3),
+            key("product", "upsert", vanished_id, 12, 4),  # deleted after the keys were read
+        ],
+        [FakeRow(**category)],
+        [FakeRow(**product)],
+    )
+
+    page = await read_changes(db, None, 4)
+
+    assert [(c["type"], c["op"], c["id"]) for c in page["changes"]] == [
+        ("category", "upsert", category_id),
+        ("product", "upsert", product_id),
+        ("product", "delete", deleted_id),
+    ]
+    assert page["changes"][1]["data"]["category_id"] == category_id
+    assert decode_position(page["next_cursor"])[0] == (12, 4)
+    assert page["has_more"] is True
+
+
+@pytest.mark.asyncio
+async def test_idle_feed_keeps_the_callers_position(fake_session):
+    page = await read_changes(fake_session([]), (5, 6), 100)
+
+    assert page["changes"] == [] and page["has_more"] is False
+    assert decode_position(page["next_cursor"])[0] == (5, 6)
@@ -0,0 +1,127 @@
+# ============================================================
+# Product Service — Request Coalescing Tests
+# ============================================================
+
+import asyncio
+
+import pytest
+
+from app.cache import ResponseCache
+from app.coalesce import COALESCED_REQUESTS, SingleFlight
+
+
+def counter_value(counter, **labels):
+    return counter.labels(**labels)._value.get()
+
+
+class GatedLoader:
+    """Loader that blocks until released, counting how often it runs."""
+
+    def __init__(self, body=b"body"):
+        self.body = body
+        self.calls = 0
+        self.release = asyncio.Event()
+
+    async def __call__(self):
+        self.calls += 1
+        await self.release.wait()
+        return self.body
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_reads_share_one_load():
+    flights = SingleFlight(window=0)
+    loader = GatedLoader()
+    before = counter_value(COALESCED_REQUESTS, namespace="products", role="follower")
+
+    tasks = [asyncio.create_task(flights.do("products", "k", loader)) for _ in range(10)]
+    await asyncio.sleep(0)
+    loader.release.set()
+
+    assert await asyncio.gather(*tasks) == [b"body"] * 10
+    assert loader.calls == 1
+    assert counter_value(COALESCED_REQUESTS, namespace="products", role="follower") == before + 9
+    assert len(flights) == 0
+
+
+@pytest.mark.asyncio
+async def test_window_reuses_result_until_it_expires():
+    flights = SingleFlight(window=0.01)
+    loader = GatedLoader()
+    loader.release.set()
+
+    await flights.do("products", "k", loader)
+    await flights.do("products", "k", loader)
+    assert loader.calls == 1
+
+    await asyncio.sleep(0.02)
+    await flights.do("products", "k", loader)
+    assert loader.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_failure_reaches_every_caller_and_is_not_shared_afterwards():
+    flights = SingleFlight(window=10)
+    calls = 0
+
+    async def failing():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0)
+        raise ValueError("boom")
+
+    results = await asyncio.gather(
+        *(flights.do("products", "k", failing) for _ in range(3)), return_exceptions=True
+    )
+    assert calls == 1
+    assert all(isinstance(r, ValueError) for r in results)
+
+    with pytest.raises(ValueError):
+        await flights.do("products", "k", failing)
+    assert calls == 2
+
+
+@pytest.mark.asyncio
+async def test_follower_takes_over_when_leader_is_cancelled():
+    flights = SingleFlight(window=0)
+    loader = GatedLoader()
+
+    leader = asyncio.create_task(flights.do("products", "k", loader))
+    await asyncio.sleep(0)
+    follower = asyncio.create_task(flights.do("products", "k", loader))
+    await asyncio.sleep(0)
+    leader.cancel()
+    await asyncio.sleep(0)
+    loader.release.set()
+
+    assert await follower == b"body"
+    assert loader.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_fresh_read_does_not_join_an_earlier_load():
+    flights = SingleFlight(window=10)
+    earlier, fresh = GatedLoader(b"old"), GatedLoader(b"new")
+    fresh.release.set()
+    leader = asyncio.create_task(flights.do("products", "k", earlier))
+    await asyncio.sleep(0)
+
+    assert await flights.do("products", "k", fresh, fresh=True) == b"new"
+    assert await flights.do("products", "k", earlier) == b"new"  # later reads share the fresh load
+    earlier.release.set()
+    assert await leader == b"old"
+
+
+@pytest.mark.asyncio
+async def test_invalidate_stops_sharing_earlier_loads(fake_redis):
+    cache = ResponseCache(redis=fake_redis, ttl=60, local_max_entries=4, local_ttl=30, enabled=False)
+    cache.flights.window = 10
+    first, second = GatedLoader(b"old"), GatedLoader(b"new")
+    first.release.set()
+    second.release.set()
+
+    assert await cache.get_item("products", "p1", first) == b"old"
+    assert await cache.get_item("products", "p1", second) == b"old"  # within the window
+
+    await cache.invalidate("products", "p1")
+    assert await cache.get_item("products", "p1", second) == b"new"
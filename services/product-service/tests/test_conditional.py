@@ -0,0 +1,96 @@
+# ============================================================
+# Product Service — Conditional GET Tests
+# ============================================================
+
+from datetime import datetime, timedelta
+
+import pytest
+from starlette.requests import Request
+
+from app.conditional import (
+    cache_headers, listing_validators, not_modified, pack, resource_validators, unpack,
+)
+from app.config import settings
+
+UPDATED_AT = datetime(2024, 3, 1, 12, 30, 15, 250000)
+
+
+class FakeRoute:
+    name = "get_product"
+
+
+def make_request(**headers):
+    return Request({
+        "type": "http",
+        "method": "GET",
+        "path": "/",
+        "headers": [(k.replace("_", "-").encode(), v.encode()) for k, v in headers.items()],
+        "route": FakeRoute(),
+    })
+
+
+def test_resource_etag_follows_updated_at():
+    validators = resource_validators("p1", UPDATED_AT, None)
+
+    assert validators == resource_validators("p1", UPDATED_AT)
+    assert validators.etag != resource_validators("p1", UPDATED_AT + timedelta(microseconds=1)).etag
+    assert validators.etag != resource_validators("p1", UPDATED_AT, UPDATED_AT).etag
+    assert validators.last_modified.tzinfo is not None
+
+
+def test_packed_body_round_trips_validators():
+    validators = resource_validators("p1", UPDATED_AT)
+
+    assert unpack(pack(validators, b'{"id":"p1"}')) == (validators, b'{"id":"p1"}')
+    assert unpack(b'{"id":"p1"}') == (None, b'{"id":"p1"}')
+
+
+def test_if_none_match_short_circuits_to_304():
+    validators = resource_validators("p1", UPDATED_AT)
+
+    response = not_modified(make_request(if_none_match=f'"other", W/{validators.etag}'), validators)
+
+    assert response.status_code == 304
+    assert response.body == b""
+    assert response.headers["etag"] == validators.etag
+    assert response.headers["last-modified"] == "Fri, 01 Mar 2024 12:30:15 GMT"
+    assert not_modified(make_request(if_none_match='"other"'), validators) is None
+    assert not_modified(make_request(if_none_match="*"), validators).status_code == 304
+
+
+def test_if_modified_since_is_second_precise_and_yields_to_etag():
+    validators = resource_validators("p1", UPDATED_AT)
+
+    assert not_modified(make_request(if_modified_since="Fri, 01 Mar 2024 12:30:15 GMT"), validators)
+    assert not not_modified(make_request(if_modified_since="Fri, 01 Mar 2024 12:30:14 GMT"), validators)
+    assert not not_modified(make_request(if_modified_since="garbage"), validators)
+    assert not not_modified(
+        make_request(if_none_match='"other"', if_modified_since="Fri, 01 Mar 2024 12:30:15 GMT"),
+        validators,
+    )
+
+
+@pytest.mark.asyncio
+async def test_listing_etag_changes_when_namespace_is_invalidated(response_cache):
+    params = {"page": 1}
+    before = listing_validators("products", params, await response_cache.version("products"))
+
+    await response_cache.invalidate("products", "p1")
+    after = listing_validators("products", params, await response_cache.version("products"))
+
+    assert before.etag != after.etag
+    assert before.last_modified is None and after.last_modified is not None
+    assert after != listing_validators("products", {"page": 2}, await response_cache.version("products"))
+
+
+@pytest.mark.asyncio
+async def test_listing_has_no_validators_without_redis(response_cache, fake_redis):
+    fake_redis.fail = True
+
+    assert listing_validators("products", {}, await response_cache.version("products")) is None
+
+
+def test_cache_control_is_configurable_per_route(monkeypatch):
+    monkeypatch.setattr(settings, "CACHE_CONTROL", {"get_product": "public, max-age=30"})
+
+    assert cache_headers(make_request(), None) == {"Cache-Control": "public, max-age=30"}
@@ -0,0 +1,71 @@
+# ============================================================
+# Product Service — Database Session Tests
+# ============================================================
+
+from types import SimpleNamespace
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+from app import database
+from app.config import settings
+from app.database import after_commit, get_db, run_after_commit
+from tests.conftest import FakeSession
+
+
+@pytest.mark.asyncio
+async def test_failing_after_commit_callback_is_logged_and_the_rest_still_run():
+    session = SimpleNamespace(info={})
+    ran = []
+
+    async def broken():
+        raise RuntimeError("publisher gone")
+
+    async def invalidate():
+        ran.append("invalidate")
+
+    after_commit(session, broken)
+    after_commit(session, invalidate)
+
+    await run_after_commit(session)  # does not raise
+
+    assert ran == ["invalidate"]
+    assert "after_commit" not in session.info
+
+
+class ReplicatedSession(FakeSession):
+    """Commits fine, then loses the connection before the WAL position is read."""
+
+    rolled_back = False
+
+    async def scalar(self, statement, params=None):
+        raise OSError("connection reset by peer")
+
+    async def rollback(self):
+        self.rolled_back = True
+
+    async def close(self):
+        pass
+
+
+def test_failed_consistency_token_lookup_keeps_the_committed_write(monkeypatch):
+    session = ReplicatedSession()
+    invalidated = []
+    monkeypatch.setattr(database, "async_session", lambda: session)
+    monkeypatch.setattr(settings, "DATABASE_REPLICA_URLS", ["postgresql+asyncpg://replica/db"])
+    app = FastAPI()
+
+    @app.post("/write")
+    async def write(db=Depends(get_db)):
+        async def invalidate():
+            invalidated.append(True)
+
+        after_commit(db, invalidate)
+        return {"ok": True}
+
+    response = TestClient(app).post("/write")
+
+    assert response.status_code == 200
+    assert invalidated == [True]
+    assert session.commits == 1 and not session.rolled_back
@@ -0,0 +1,61 @@
+# ============================================================
+# Product Service — Streaming Export Tests
+# ============================================================
+
+import csv
+import gzip
+import io
+import json
+
+import pytest
+from sqlalchemy import select
+
+from app.export import stream_export
+from app.models import Product
+from app.projection import PRODUCT_FIELDS
+from benchmarks.serialization import make_page
+from tests.conftest import FakeSession
+
+
+async def export(batches, fields, fmt, compress=False):
+    session = FakeSession(batches)  # streamed in these partitions
+    chunks = [
+        chunk async for chunk in stream_export(select(Product.id), fields, fmt, compress, lambda: session)
+    ]
+    return chunks, session
+
+
+@pytest.mark.asyncio
+async def test_ndjson_streams_one_chunk_per_batch():
+    _, rows = make_page(5)
+
+    chunks, session = await export([rows[:3], rows[3:]], ["sku", "price"], "ndjson")
+
+    assert session.statements[0].get_execution_options()["yield_per"] == 1000
+    assert len(chunks) == 2
+    lines = b"".join(chunks).decode().splitlines()
+    assert json.loads(lines[0]) == {"sku": "SKU-000000", "price": 10.0}
+    assert len(lines) == 5
+
+
+@pytest.mark.asyncio
+async def test_csv_has_header_and_flattens_category():
+    _, rows = make_page(2)
+
+    chunks, _ = await export([rows], PRODUCT_FIELDS, "csv")
+
+    records = list(csv.DictReader(io.StringIO(b"".join(chunks).decode())))
+    assert list(records[0]) == PRODUCT_FIELDS
+    assert records[0]["category"] == "Outdoor"
+    assert records[0]["compare_at_price"] == ""
+    assert records[0]["is_active"] == "true"
+
+
+@pytest.mark.asyncio
+async def test_gzip_output_decompresses_to_plain_export():
+    _, rows = make_page(4)
+
+    plain, _ = await export([rows[:2], rows[2:]], ["sku"], "ndjson")
+    compressed, _ = await export([rows[:2], rows[2:]], ["sku"], "ndjson", compress=True)
+
+    assert gzip.decompress(b"".join(compressed)) == b"".join(plain)
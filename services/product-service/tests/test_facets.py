@@ -0,0 +1,54 @@
+# ============================================================
+# Product Service — Facets Tests
+# ============================================================
+
+import uuid
+
+import pytest
+from fastapi import HTTPException
+
+from app.facets import FACETS, collect_facets, facet_statement, parse_facets
+from app.models import Product
+from tests.conftest import FakeRow, compile_pg
+
+
+def test_parse_facets_defaults_to_all_and_rejects_unknown():
+    assert parse_facets(None) == list(FACETS)
+    assert parse_facets("price,category") == ["category", "price"]
+    with pytest.raises(HTTPException):
+        parse_facets("brand")
+
+
+def test_all_facets_come_from_one_grouping_sets_query():
+    sql = compile_pg(facet_statement([Product.is_active.is_(True)], list(FACETS), 25.0, 10), render_postcompile=True)
+
+    assert sql.count("SELECT") == 1
+    assert "GROUP BY GROUPING SETS((), (products.category_id, categories.name), (least(" in sql
+    # Bucket expression is inlined so the select list matches GROUP BY
+    assert sql.count("least(floor(products.price / CAST(25.0 AS FLOAT)), 9)") == 3
+    assert "count(*) FILTER (WHERE products.is_featured) AS featured" in sql
+
+
+def test_totals_only_skip_grouping_and_join():
+    sql = compile_pg(facet_statement([], ["featured"], 25.0, 10), render_postcompile=True)
+
+    assert "GROUP BY" not in sql and "JOIN" not in sql
+
+
+def test_rows_fold_into_facets():
+    category = uuid.uuid4()
+    common = dict(category_id=None, category_name=None, price_bucket=None, featured=None, in_stock=None)
+    rows = [
+        FakeRow(**{**common, "count": 7, "featured": 2, "in_stock": 5, "rolled_category": 1, "rolled_price": 1}),
+        FakeRow(**{**common, "count": 5, "category_id": category, "category_name": "Lamps",
+                   "rolled_category": 0, "rolled_price": 1}),
+        FakeRow(**{**common, "count": 2, "rolled_category": 0, "rolled_price": 1}),
+        FakeRow(**{**common, "count": 4, "price_bucket": 9.0, "rolled_category": 1, "rolled_price": 0}),
+        FakeRow(**{**common, "count": 3, "price_bucket": 0.0, "rolled_category": 1, "rolled_price": 0}),
+    ]
+
+    facets = collect_facets(rows, list(FACETS), 25.0, 10)
+
+    assert (facets.total, facets.featured, facets.in_stock) == (7, 2, 5)
+    assert [(c.category_id, c.count) for c in facets.categories] == [(category, 5), (None, 2)]
+    assert [(b.min, b.max, b.count) for b in facets.price] == [(0.0, 25.0, 3), (225.0, None, 4)]
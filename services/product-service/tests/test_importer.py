@@ -0,0 +1,120 @@
+# ============================================================
+# Product Service — Bulk Import Tests
+# ============================================================
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from app import importer
+from app.importer import ProductImporter, iter_csv, iter_ndjson, upsert_statement
+from tests.conftest import FakeResult, FakeSession, compile_pg
+
+
+async def stream(*chunks):
+    for chunk in chunks:
+        yield chunk
+
+
+async def collect(records):
+    return [record async for record in records]
+
+
+class ImportSession(FakeSession):
+    """Accepts upserts unless a row carries a rejected SKU."""
+
+    def __init__(self, rejected_skus=()):
+        super().__init__()
+        self.rejected_skus = set(rejected_skus)
+        self.batches = []
+
+    @property
+    def events(self):
+        return [row["routing_key"] for table, rows in self.inserts if table == "outbox_events" for row in rows]
+
+    async def execute(self, statement, params=None):
+        if params is not None:  # outbox insert
+            return await super().execute(statement, params)
+        rows = statement.compile().params
+        skus = [value for key, value in rows.items() if key.startswith("sku")]
+        if self.rejected_skus & set(skus):
+            raise IntegrityError("INSERT", {}, Exception("duplicate key value violates unique constraint"))
+        self.batches.append(skus)
+        return FakeResult([(f"id-{sku}", sku, sku != "S0") for sku in skus])
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache(monkeypatch, response_cache):
+    monkeypatch.setattr(importer, "cache", response_cache)
+
+
+@pytest.mark.asyncio
+async def test_ndjson_records_survive_chunk_boundaries():
+    records = await collect(iter_ndjson(stream(b'{"sku": "A"}\n{"sk', b'u": "B"}\n\nnot json\n[1]')))
+
+    assert [r[:2] for r in records[:2]] == [(1, {"sku": "A"}), (2, {"sku": "B"})]
+    assert records[2][0] == 3 and records[2][2].startswith("invalid JSON")
+    assert records[3] == (4, None, "expected a JSON object")
+
+
+@pytest.mark.asyncio
+async def test_csv_handles_quoted_newlines_and_empty_cells():
+    body = b'sku,name,description,price\nA,Lamp,"Warm\nlight, dimmable",9.5\nB,Desk,,120\nC,Chair\n'
+
+    records = await collect(iter_csv(stream(body[:30], body[30:])))
+
+    assert records[0] == (1, {"sku": "A", "name": "Lamp", "description": "Warm\nlight, dimmable", "price": "9.5"}, None)
+    assert records[1] == (2, {"sku": "B", "name": "Desk", "price": "120"}, None)
+    assert records[2] == (3, None, "expected 4 columns, got 2")
+
+
+def test_upsert_is_keyed_on_sku_and_reports_inserts():
+    rows = [{"sku": "A", "name": "Lamp", "slug": "lamp", "price": 1.0}]
+
+    sql = compile_pg(upsert_statement(rows))
+
+    assert "ON CONFLICT (sku) DO UPDATE SET" in sql
+    assert "price = excluded.price" in sql
+    assert "created_at = excluded" not in sql
+    assert "RETURNING products.id, products.sku, xmax = 0 AS inserted" in sql
+
+
+@pytest.mark.asyncio
+async def test_importer_writes_in_chunks_and_reports_bad_rows():
+    lines = [b'{"sku": "S%d", "name": "P %d", "price": 1}\n' % (i, i) for i in range(5)]
+    lines.insert(2, b'{"sku": "BAD", "name": "No price"}\n')
+    db = ImportSession()
+
+    report = await ProductImporter(db, batch_size=2).run(iter_ndjson(stream(*lines)))
+
+    assert db.batches == [["S0", "S1"], ["S2", "S3"], ["S4"]]
+    assert (report.received, report.inserted, report.updated, report.failed) == (6, 4, 1, 1)
+    assert db.events == ["product.updated"] + ["product.created"] * 4
+    assert report.errors[0].row == 3
+    assert report.errors[0].errors == ["price: Field required"]
+
+
+@pytest.mark.asyncio
+async def test_constraint_violation_only_fails_the_offending_row():
+    lines = [b'{"sku": "S%d", "name": "P %d", "price": 1}\n' % (i, i) for i in range(3)]
+    db = ImportSession(rejected_skus={"S1"})
+
+    report = await ProductImporter(db, batch_size=10).run(iter_ndjson(stream(*lines)))
+
+    assert db.batches == [["S0"], ["S2"]]
+    assert (report.inserted, report.updated, report.failed) == (1, 1, 1)
+    assert report.errors[0].sku == "S1"
+
+
+@pytest.mark.asyncio
+async def test_repeated_sku_in_a_chunk_keeps_last_row():
+    lines = [
+        b'{"sku": "S1", "name": "Old", "price": 1}\n',
+        b'{"sku": "S1", "name": "New", "price": 2}\n',
+    ]
+    db = ImportSession()
+
+    report = await ProductImporter(db).run(iter_ndjson(stream(*lines)))
+
+    assert db.batches == [["S1"]]
+    assert (report.received, report.inserted, report.duplicates) == (2, 1, 1)
+    assert report.received == report.inserted + report.updated + report.failed + report.duplicates
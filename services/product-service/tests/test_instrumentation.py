@@ -0,0 +1,53 @@
+# ============================================================
+# Product Service — Database Instrumentation Tests
+# ============================================================
+
+from types import SimpleNamespace
+from uuid import uuid4
+
+from sqlalchemy import create_engine, text
+
+from app.instrumentation import (
+    DB_SLOW_QUERIES, DB_STATEMENT_SECONDS,
+    fingerprint, instrument_engine, normalize, parameter_shape, request_scope,
+)
+
+
+def histogram_count(histogram, **labels):
+    return sum(bucket.get() for bucket in histogram.labels(**labels)._buckets)
+
+
+def test_fingerprint_ignores_literals_and_in_list_lengths():
+    short = "SELECT * FROM products WHERE id IN ($1, $2) AND price > 10.5"
+    long = "SELECT *\n  FROM products WHERE id IN ($1, $2, $3, $4) AND price > 99"
+
+    assert normalize(short) == "SELECT * FROM products WHERE id IN (...) AND price > ?"
+    assert fingerprint(short) == fingerprint(long)
+    assert fingerprint(short).startswith("select products:")
+    assert fingerprint("UPDATE products SET quantity = $1").startswith("update products:")
+
+
+def test_parameter_shape_hides_values():
+    assert parameter_shape(("secret", 3, [uuid4(), uuid4()])) == ["str", "int", "list[UUID]x2"]
+    assert parameter_shape([("a", 1), ("b", 2)], executemany=True) == {
+        "executemany": 2, "row": ["str", "int"],
+    }
+
+
+def test_statements_are_timed_per_route_and_slow_ones_counted():
+    engine = create_engine("sqlite://")
+    instrument_engine(engine, slow_seconds=0, slow_sample_rate=1.0)
+    statement = "SELECT 1 UNION ALL SELECT 2"
+    label = fingerprint(statement)
+    route = SimpleNamespace(path="/products/{product_id}")
+    slow_before = DB_SLOW_QUERIES.labels(fingerprint=label)._value.get()
+
+    token = request_scope.set({"route": route})
+    try:
+        with engine.connect() as conn:
+            assert conn.execute(text(statement)).all() == [(1,), (2,)]
+    finally:
+        request_scope.reset(token)
+
+    assert histogram_count(DB_STATEMENT_SECONDS, fingerprint=label, route=route.path) == 1
+    assert DB_SLOW_QUERIES.labels(fingerprint=label)._value.get() == slow_before + 1
@@ -0,0 +1,91 @@
+# ============================================================
+# Product Service — Logging Pipeline Tests
+# ============================================================
+
+import io
+import sys
+
+import orjson
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from app.middleware import RequestContextMiddleware
+from app.utils.logger import LOG_EVENTS_DROPPED, QueueSink
+
+
+def test_full_queue_drops_and_counts_instead_of_blocking():
+    sink = QueueSink(max_size=2)
+    sink._thread = object()  # pretend the writer runs, so nothing drains
+    before = LOG_EVENTS_DROPPED._value.get()
+
+    for i in range(5):
+        sink.put({"event": "e", "i": i})
+
+    assert sink.queue.qsize() == 2
+    assert LOG_EVENTS_DROPPED._value.get() - before == 3
+
+
+def test_writer_renders_json_lines_with_timestamp_and_traceback(monkeypatch):
+    out = io.StringIO()
+    monkeypatch.setattr(sys, "stdout", out)
+    sink = QueueSink(max_size=10)
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        sink.put({"event": "failed", "level": "error", "exc_info": sys.exc_info(), "timestamp": 0.5})
+    sink.put({"event": "ok", "obj": object()})
+    sink.close()
+
+    # The app's own sink may flush other tests' events to the same stdout
+    lines = [orjson.loads(line) for line in out.getvalue().splitlines()]
+    first, second = [line for line in lines if line.get("event") in ("failed", "ok")]
+    assert first["timestamp"] == "1970-01-01T00:00:00.500000Z"
+    assert "ValueError: boom" in first["exception"]
+    assert second["obj"].startswith("<object")
+
+
+def make_app(sample_rate: float) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(RequestContextMiddleware, sample_rate=sample_rate, slow_seconds=60)
+
+    @app.get("/ok")
+    async def ok():
+        return {"ok": True}
+
+    @app.get("/fail")
+    async def fail():
+        raise HTTPException(status_code=503, detail="down")
+
+    return app
+
+
+@pytest.fixture
+def logged(monkeypatch):
+    events = []
+    monkeypatch.setattr(
+        "app.middleware.logger.info", lambda event, **kw: events.append((event, kw))
+    )
+    return events
+
+
+def test_middleware_sets_headers_and_keeps_client_request_id(logged):
+    client = TestClient(make_app(sample_rate=1.0))
+
+    response = client.get("/ok", headers={"X-Request-ID": "abc"})
+
+    assert response.headers["x-request-id"] == "abc"
+    assert float(response.headers["x-process-time"]) >= 0
+    assert logged == [("request_completed", {
+        "method": "GET", "path": "/ok", "status_code": 200,
+        "process_time": logged[0][1]["process_time"],
+    })]
+
+
+def test_sampling_skips_fast_successes_but_always_logs_errors(logged):
+    client = TestClient(make_app(sample_rate=0.0))
+
+    client.get("/ok")
+    client.get("/fail")
+
+    assert [kw["status_code"] for _, kw in logged] == [503]
@@ -0,0 +1,73 @@
+# ============================================================
+# Product Service — Low-Stock Tests
+# ============================================================
+
+import uuid
+
+import pytest
+from sqlalchemy.schema import CreateIndex
+
+from app.low_stock import MIGRATION, alerts_statement, crossing, record_crossings, stock_update
+from app.models import Product, StockAlert
+from app.stock import reserve_stock
+from tests.conftest import compile_pg
+
+
+def test_low_stock_index_is_partial_on_the_threshold():
+    (index,) = [i for i in Product.__table__.indexes if i.name == "idx_product_low_stock"]
+
+    assert compile_pg(CreateIndex(index)).endswith("(quantity, id) WHERE quantity <= low_stock_threshold")
+    # Existing databases build the same index
+    assert MIGRATION[0].endswith("ON products (quantity, id) WHERE quantity <= low_stock_threshold")
+
+
+@pytest.mark.parametrize("quantity, threshold, previous_quantity, previous_threshold, expected", [
+    (5, 10, 11, 10, "low"),
+    (10, 10, 11, 10, "low"),  # at the threshold counts as low
+    (11, 10, 3, 10, "restocked"),
+    (3, 10, 4, 10, None),  # already low
+    (50, 10, 40, 10, None),
+    (20, 25, 20, 10, "low"),  # threshold raised over current stock
+])
+def test_crossing_compares_low_before_and_after(quantity, threshold, previous_quantity, previous_threshold, expected):
+    assert crossing(quantity, threshold, previous_quantity, previous_threshold) == expected
+
+
+def test_stock_update_returns_previous_values_read_under_lock():
+    sql = compile_pg(stock_update(uuid.uuid4(), {"quantity": 3}))
+
+    assert sql.startswith("WITH previous AS")
+    assert "FOR UPDATE)" in sql
+    assert sql.endswith("previous.previous_quantity, previous.previous_threshold")
+
+
+def test_feed_waits_for_older_transactions_and_resumes_after_cursor():
+    sql = compile_pg(alerts_statement((2**40, 7), 100))
+
+    assert "stock_alerts.txid < pg_snapshot_xmin(pg_current_snapshot())" in sql
+    assert "(stock_alerts.txid, stock_alerts.id) > ($1::BIGINT, $2::BIGINT)" in sql
+    assert "ORDER BY stock_alerts.txid, stock_alerts.id" in sql
+
+
+@pytest.mark.asyncio
+async def test_crossings_are_recorded_as_alerts_and_outbox_events(fake_session):
+    low, steady = uuid.uuid4(), uuid.uuid4()
+    db = fake_session()
+
+    await record_crossings(db, [(low, 2, 5, 8, 5), (steady, 50, 5, 60, 5)])
+
+    (table, alerts), (outbox, events) = db.inserts
+    assert table == StockAlert.__tablename__ and outbox == "outbox_events"
+    assert alerts == [{"product_id": low, "state": "low", "quantity": 2, "low_stock_threshold": 5}]
+    assert [event["routing_key"] for event in events] == ["product.stock.low"]
+
+
+@pytest.mark.asyncio
+async def test_reservation_reports_items_that_dropped_to_threshold(fake_session):
+    product_id = uuid.uuid4()
+    db = fake_session([(product_id, 4, 5)])  # 7 in stock, threshold 5
+
+    await reserve_stock(db, [(product_id, 3)])
+
+    (_, alerts), _ = db.inserts
+    assert alerts[0]["state"] == "low" and alerts[0]["quantity"] == 4
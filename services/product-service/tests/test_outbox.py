@@ -0,0 +1,136 @@
+# ============================================================
+# Product Service — Event Outbox Tests
+# ============================================================
+
+import asyncio
+import json
+import uuid
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from app.outbox import OUTBOX_BACKLOG, OutboxRelay, record_events
+from tests.conftest import FakeResult, FakeSession
+
+
+class MemoryBroker:
+    """In-memory stand-in for AmqpPublisher."""
+
+    def __init__(self):
+        self.messages = []
+        self.fail = False
+        self.closed = False
+
+    async def publish(self, messages):
+        if self.fail:
+            raise ConnectionError("broker unavailable")
+        self.messages += messages
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeOutboxSession(FakeSession):
+    """Serves the relay's statements from a shared in-memory table."""
+
+    def __init__(self, table, locked=True):
+        super().__init__()
+        self.table = table
+        self.locked = locked
+
+    async def execute(self, statement, params=None):
+        if params is not None:
+            return await super().execute(statement, params)
+        sql = str(statement)
+        if "pg_try_advisory_xact_lock" in sql:
+            return FakeResult(scalar=self.locked)
+        if sql.startswith("DELETE"):
+            ids = set(statement.compile().params["ids"])
+            self.table[:] = [row for row in self.table if row.id not in ids]
+            return FakeResult()
+        if "count" in sql:
+            return FakeResult(scalar=len(self.table))
+        limit = statement.compile().params["param_1"]
+        return FakeResult(sorted(self.table, key=lambda row: row.id)[:limit])
+
+
+def event(event_id, routing_key="product.updated"):
+    return SimpleNamespace(id=event_id, routing_key=routing_key, payload="{}", created_at=datetime.utcnow())
+
+
+def make_relay(table, batch_size=2, locked=True):
+    relay = OutboxRelay(lambda: FakeOutboxSession(table, locked), batch_size=batch_size, interval=0.01)
+    relay.publisher = MemoryBroker()
+    return relay
+
+
+@pytest.mark.asyncio
+async def test_events_are_recorded_in_the_callers_transaction():
+    db = FakeOutboxSession([])
+    product_id = uuid.uuid4()
+
+    await record_events(db, [("product.deleted", {"id": product_id})])
+
+    ((_, (row,)),) = db.inserts
+    body = json.loads(row["payload"])
+    assert row["routing_key"] == "product.deleted"
+    assert body["event"] == "product.deleted" and body["service"] == "product-service"
+    assert body["data"] == {"id": str(product_id)}
+    assert len(db.info["after_commit"]) == 1
+
+
+@pytest.mark.asyncio
+async def test_relay_publishes_in_id_order_and_deletes_confirmed_batch():
+    table = [event(3), event(1, "product.created"), event(2)]
+    relay = make_relay(table)
+
+    assert await relay.relay_batch() == 2
+
+    assert relay.publisher.messages == [("product.created", "{}", "1"), ("product.updated", "{}", "2")]
+    assert [row.id for row in table] == [3]
+    assert OUTBOX_BACKLOG._value.get() == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_publish_keeps_events_for_retry():
+    table = [event(1), event(2)]
+    relay = make_relay(table)
+    relay.publisher.fail = True
+
+    with pytest.raises(ConnectionError):
+        await relay.relay_batch()
+
+    assert [row.id for row in table] == [1, 2]
+
+
+@pytest.mark.asyncio
+async def test_only_the_lock_holder_relays():
+    table = [event(1)]
+    relay = make_relay(table, locked=False)
+
+    assert await relay.relay_batch() == 0
+    assert relay.publisher.messages == [] and len(table) == 1
+
+
+@pytest.mark.asyncio
+async def test_background_relay_drains_backlog_and_recovers_from_outage():
+    table = [event(i) for i in range(1, 6)]
+    relay = make_relay(table)
+    broker = MemoryBroker()
+    broker.fail = True
+
+    await relay.start(broker)
+    await asyncio.sleep(0.02)
+    assert len(table) == 5
+
+    broker.fail = False
+    await relay.notify()
+    for _ in range(100):
+        if not table:
+            break
+        await asyncio.sleep(0.01)
+    await relay.stop()
+
+    assert [message_id for _, _, message_id in broker.messages] == ["1", "2", "3", "4", "5"]
+    assert broker.closed
@@ -0,0 +1,99 @@
+# ============================================================
+# Product Service — Keyset Pagination Tests
+# ============================================================
+
+import uuid
+from datetime import datetime
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+from app import pagination
+from app.models import Product
+from app.pagination import (
+    Explain, count_total, decode_cursor, encode_cursor, keyset_condition, keyset_order,
+)
+
+
+@pytest.mark.parametrize(
+    "sort_by,value",
+    [
+        ("created_at", datetime(2024, 5, 1, 12, 30, 15, 123456)),
+        ("price", 19.99),
+        ("name", "Widget, large"),
+        ("quantity", 42),
+    ],
+)
+@pytest.mark.parametrize("sort_order", ["asc", "desc"])
+def test_cursor_round_trips_typed_sort_key(sort_by, value, sort_order):
+    row_id = uuid.uuid4()
+    column = getattr(Product, sort_by)
+
+    cursor = encode_cursor(sort_by, sort_order, value, row_id)
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor, column, Product.id, sort_by, sort_order) == (value, row_id)
+
+
+def test_cursor_from_another_sort_is_rejected():
+    cursor = encode_cursor("price", "asc", 10.0, uuid.uuid4())
+
+    with pytest.raises(HTTPException) as exc:
+        decode_cursor(cursor, Product.price, Product.id, "price", "desc")
+    assert exc.value.status_code == 400
+
+
+def test_garbage_cursor_is_rejected():
+    with pytest.raises(HTTPException) as exc:
+        decode_cursor("not-a-cursor", Product.price, Product.id, "price", "asc")
+    assert exc.value.status_code == 400
+
+
+@pytest.mark.parametrize("sort_order,op,direction", [("asc", ">", "ASC"), ("desc", "<", "DESC")])
+def test_keyset_query_uses_row_comparison(sort_order, op, direction):
+    key = (10.0, uuid.uuid4())
+    query = (
+        select(Product.id)
+        .where(keyset_condition(Product.price, Product.id, key, sort_order))
+        .order_by(*keyset_order(Product.price, Product.id, sort_order))
+    )
+
+    sql = str(query.compile(dialect=postgresql.dialect()))
+
+    assert f"(products.price, products.id) {op} (" in sql
+    assert f"ORDER BY products.price {direction}, products.id {direction}" in sql
+
+
+def test_explain_wraps_statement_and_keeps_bind_parameters():
+    query = select(Product.id).where(Product.price >= 10.0)
+
+    compiled = Explain(query).compile(dialect=postgresql.dialect())
+
+    assert str(compiled).startswith("EXPLAIN (FORMAT JSON) SELECT products.id")
+    assert list(compiled.params.values()) == [10.0]
+
+
+@pytest.mark.asyncio
+async def test_estimated_count_reads_planner_rows(fake_session):
+    db = fake_session('[{"Plan": {"Node Type": "Seq Scan", "Plan Rows": 1234}}]')
+
+    total = await count_total(db, Product.id, [Product.price >= 10.0], "estimated", "products", {})
+
+    assert total == 1234
+    assert isinstance(db.statements[0], Explain)
+
+
+@pytest.mark.asyncio
+async def test_cached_count_is_reused_until_invalidated(monkeypatch, response_cache, fake_session):
+    monkeypatch.setattr(pagination, "cache", response_cache)
+    db = fake_session(7, 8)
+    filters = {"min_price": 10.0}
+    conditions = [Product.price >= 10.0]
+
+    assert await count_total(db, Product.id, conditions, "cached", "products", filters) == 7
+    assert await count_total(db, Product.id, conditions, "cached", "products", filters) == 7
+    await response_cache.invalidate("products", "p1")
+    assert await count_total(db, Product.id, conditions, "cached", "products", filters) == 8
+    assert len(db.statements) == 2
@@ -0,0 +1,153 @@
+# ============================================================
+# Product Service — Product Router Tests
+# ============================================================
+
+import json
+import uuid
+from datetime import datetime
+
+import pytest
+from fastapi import HTTPException
+from pydantic import ValidationError
+
+from app.config import settings
+from app.outbox import PRODUCT_EVENT_FIELDS
+from app.projection import CATEGORY_FIELDS, CATEGORY_PREFIX
+from app.routers.products import (
+    batch_get_products, create_product, delete_product, update_product, update_stock,
+)
+from app.schemas import ProductBatchRequest, ProductCreate, ProductUpdate
+from tests.conftest import FakeRow, compile_pg
+
+
+def written_row(category=None, **values):
+    """A row as returning_product() answers a write: product columns plus category__*."""
+    product = {name: None for name in PRODUCT_EVENT_FIELDS} | dict(
+        id=uuid.uuid4(), name="Lamp", slug="lamp", sku="LAMP", price=10.0, quantity=5,
+        low_stock_threshold=2, is_active=True, is_featured=False, created_at=datetime.utcnow(),
+    )
+    columns = {CATEGORY_PREFIX + name: (category or {}).get(name) for name in CATEGORY_FIELDS}
+    return FakeRow(**{**product, **columns, **values})
+
+
+def product_row(sku):
+    return FakeRow(id=uuid.uuid4(), sku=sku, name=f"Product {sku}", lookup_sku=sku)
+
+
+# ── Batch Lookup ───────────────────────────────────────────
+@pytest.mark.asyncio
+async def test_batch_follows_request_order_and_marks_misses(fake_session):
+    lamp, desk = product_row("LAMP"), product_row("DESK")
+    missing_id = uuid.uuid4()
+    db = fake_session([desk, lamp])  # database order differs from request order
+
+    response = await batch_get_products(
+        ProductBatchRequest(ids=[lamp.id, missing_id], skus=["NOPE", "DESK"]), fields="id,sku,name", db=db,
+    )
+
+    results = json.loads(response.body)["results"]
+    assert [(r["id"], r["sku"], r["found"]) for r in results] == [
+        (str(lamp.id), None, True),
+        (str(missing_id), None, False),
+        (None, "NOPE", False),
+        (None, "DESK", True),
+    ]
+    assert results[0]["product"] == {"id": str(lamp.id), "sku": "LAMP", "name": "Product LAMP"}
+    assert results[1]["product"] is None
+
+
+@pytest.mark.asyncio
+async def test_mixed_id_and_sku_lookup_is_one_any_query(fake_session):
+    db = fake_session([])
+
+    await batch_get_products(ProductBatchRequest(ids=[uuid.uuid4()], skus=["A", "B"]), fields="sku", db=db)
+
+    (statement,) = db.statements
+    sql = compile_pg(statement)
+    assert "products.id = ANY (" in sql and "products.sku = ANY (" in sql
+    assert " OR " in sql
+
+
+@pytest.mark.parametrize("ids, skus", [
+    ([], []),
+    ([uuid.uuid4() for _ in range(settings.BATCH_LOOKUP_MAX)], ["one-too-many"]),
+])
+def test_batch_rejects_empty_and_oversized_requests(ids, skus):
+    with pytest.raises(ValidationError):
+        ProductBatchRequest(ids=ids, skus=skus)
+
+
+# ── Writes ─────────────────────────────────────────────────
+@pytest.mark.asyncio
+async def test_duplicate_sku_is_a_conflict_without_a_second_query(fake_session):
+    db = fake_session([])  # ON CONFLICT DO NOTHING returned no row
+
+    with pytest.raises(HTTPException) as exc:
+        await create_product(ProductCreate(name="Lamp", sku="LAMP", price=10.0), db=db)
+
+    assert exc.value.status_code == 409
+    (statement,) = db.statements
+    assert "ON CONFLICT (sku) DO NOTHING RETURNING" in compile_pg(statement)
+    assert db.inserts == []  # no outbox event
+
+
+@pytest.mark.asyncio
+async def test_created_product_embeds_its_category_from_the_same_statement(fake_session):
+    category = dict(id=uuid.uuid4(), name="Lighting", slug="lighting", is_active=True, created_at=datetime.utcnow())
+    db = fake_session([written_row(category=category, category_id=category["id"])])
+
+    response = await create_product(
+        ProductCreate(name="Lamp", sku="LAMP", price=10.0, category_id=category["id"]), db=db,
+    )
+
+    (statement,) = db.statements
+    sql = compile_pg(statement)
+    assert sql.startswith("WITH written AS") and "ON CONFLICT (sku) DO NOTHING RETURNING" in sql
+    assert "FROM written LEFT OUTER JOIN categories ON written.category_id = categories.id" in sql
+    assert response.category_id == category["id"] and response.category.name == "Lighting"
+    ((_, (event,)),) = db.inserts
+    assert json.loads(event["payload"])["data"]["category_id"] == str(category["id"])
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("write", [
+    lambda product_id, db: update_product(product_id, ProductUpdate(price=1.0), db=db),
+    lambda product_id, db: update_stock(product_id, quantity=3, db=db),
+    lambda product_id, db: delete_product(product_id, db=db),
+])
+async def test_missing_product_is_not_found(write, fake_session):
+    db = fake_session([])
+
+    with pytest.raises(HTTPException) as exc:
+        await write(uuid.uuid4(), db)
+
+    assert exc.value.status_code == 404
+    assert len(db.statements) == 1 and db.inserts == []
+
+
+@pytest.mark.asyncio
+async def test_rename_regenerates_slug_and_reads_previous_stock(fake_session):
+    product = written_row(name="Blue Lamp", slug="blue-lamp", previous_quantity=5, previous_threshold=2)
+    db = fake_session([product])
+
+    response = await update_product(product.id, ProductUpdate(name="Blue Lamp"), db=db)
+
+    (statement,) = db.statements
+    assert "blue-lamp" in statement.compile().params.values()
+    sql = compile_pg(statement)
+    assert sql.startswith("WITH previous AS") and "FOR UPDATE" in sql
+    assert "previous.previous_quantity, previous.previous_threshold" in sql
+    assert response.slug == "blue-lamp" and response.category is None
+    ((table, events),) = db.inserts
+    assert table == "outbox_events" and [e["routing_key"] for e in events] == ["product.updated"]
+
+
+@pytest.mark.asyncio
+async def test_stock_update_records_a_crossing_from_the_previous_quantity(fake_session):
+    product = written_row(quantity=1, low_stock_threshold=2, previous_quantity=5, previous_threshold=2)
+    db = fake_session([product])  # was 5, threshold 2
+
+    await update_stock(product.id, quantity=1, db=db)
+
+    tables = [table for table, _ in db.inserts]
+    assert tables == ["outbox_events", "stock_alerts", "outbox_events"]
@@ -0,0 +1,51 @@
+# ============================================================
+# Product Service — Projection & Serialization Tests
+# ============================================================
+
+import json
+
+import pytest
+from fastapi import HTTPException
+
+from app.projection import PRODUCT_FIELDS, dumps, parse_fields, product_select, row_to_dict
+from app.schemas import ProductResponse
+from benchmarks.serialization import make_page
+from tests.conftest import compile_pg
+
+
+def test_parse_fields_defaults_to_full_response_in_schema_order():
+    assert parse_fields(None) == list(ProductResponse.model_fields)
+    assert parse_fields("price, name,id") == ["name", "price", "id"]
+
+
+def test_parse_fields_rejects_unknown_names():
+    with pytest.raises(HTTPException) as exc:
+        parse_fields("name,cost_center")
+    assert exc.value.status_code == 400
+
+
+def test_sparse_select_reads_only_requested_columns():
+    query, with_category = product_select(["name", "price"])
+    sql = compile_pg(query)
+
+    assert not with_category
+    assert sql.startswith("SELECT products.id, products.name, products.price \nFROM products")
+    assert "JOIN" not in sql
+
+
+def test_full_select_joins_category_once():
+    query, with_category = product_select(PRODUCT_FIELDS)
+    sql = compile_pg(query)
+
+    assert with_category
+    assert "LEFT OUTER JOIN categories ON products.category_id = categories.id" in sql
+    assert "categories.name AS category__name" in sql
+
+
+def test_fast_path_matches_pydantic_serialization():
+    products, rows = make_page(3)
+
+    fast = [json.loads(dumps(row_to_dict(row, PRODUCT_FIELDS))) for row in rows]
+    slow = [json.loads(ProductResponse.model_validate(p).model_dump_json()) for p in products]
+
+    assert fast == slow
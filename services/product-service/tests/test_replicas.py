@@ -0,0 +1,72 @@
+# ============================================================
+# Product Service — Read Replica Routing Tests
+# ============================================================
+
+from types import SimpleNamespace
+
+import pytest
+
+from app.replicas import READ_ROUTING, Replica, ReplicaSet, parse_lsn, read_session_factory
+
+
+def routed(target, reason):
+    return READ_ROUTING.labels(target=target, reason=reason)._value.get()
+
+
+def replica_set(*states):
+    replicas = ReplicaSet(urls=[])
+    for i, (healthy, lsn, replayed_through) in enumerate(states):
+        replica = Replica(f"replica-{i}", engine=SimpleNamespace())
+        replica.healthy, replica.lsn, replica.replayed_through = healthy, lsn, replayed_through
+        replicas.replicas.append(replica)
+    return replicas
+
+
+def test_parse_lsn_orders_positions():
+    assert parse_lsn("0/16B3748") == 0x16B3748
+    assert parse_lsn("1/0") > parse_lsn("0/FFFFFFFF")
+    assert parse_lsn(None) is None
+    assert parse_lsn("not-an-lsn") is None
+
+
+def test_reads_round_robin_over_healthy_replicas():
+    replicas = replica_set((True, 100, 50.0), (False, 100, 50.0), (True, 100, 50.0))
+
+    chosen = [replicas.choose().name for _ in range(4)]
+
+    assert chosen == ["replica-0", "replica-2", "replica-0", "replica-2"]
+
+
+@pytest.mark.parametrize("min_lsn, not_before, expected, reason", [
+    (150, None, "replica-1", "balanced"),     # only replica-1 has replayed the token
+    (300, None, None, "token"),               # nobody has: read your write on the primary
+    (None, 60.0, "replica-1", "balanced"),
+    (None, 90.0, None, "recent_write"),       # a replica could refill the cache with stale data
+])
+def test_freshness_requirements_fall_back_to_primary(min_lsn, not_before, expected, reason):
+    replicas = replica_set((True, 100, 50.0), (True, 200, 70.0))
+    target = expected or "primary"
+    before = routed(target, reason)
+
+    replica = replicas.choose(min_lsn, not_before)
+
+    assert (replica.name if replica else None) == expected
+    assert routed(target, reason) == before + 1
+
+
+def test_no_replicas_or_none_healthy_read_from_primary():
+    before = routed("primary", "unhealthy")
+
+    assert ReplicaSet(urls=[]).choose() is None
+    assert replica_set((False, 100, 50.0)).choose() is None
+    assert routed("primary", "unhealthy") == before + 1
+
+
+@pytest.mark.parametrize("autocommit, isolation_level", [(True, "AUTOCOMMIT"), (False, None)])
+def test_request_sessions_are_lean_but_streaming_reads_keep_a_transaction(autocommit, isolation_level):
+    request = SimpleNamespace(headers={})
+    session = read_session_factory(request, autocommit=autocommit)()
+
+    bind = session.sync_session.get_bind()
+
+    assert bind.get_execution_options().get("isolation_level") == isolation_level
@@ -0,0 +1,45 @@
+# ============================================================
+# Product Service — Search Tests
+# ============================================================
+
+from sqlalchemy import select
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+from app.models import Product
+from app.search import MIGRATION, relevance, search_condition
+from tests.conftest import compile_pg
+
+
+def test_search_vector_is_a_stored_generated_column():
+    ddl = compile_pg(CreateTable(Product.__table__))
+
+    assert "search_vector TSVECTOR GENERATED ALWAYS AS" in ddl
+    assert "setweight(to_tsvector('english', coalesce(name, '')), 'A')" in ddl
+    assert "STORED" in ddl
+
+
+def test_search_indexes_use_gin():
+    indexes = {index.name: compile_pg(CreateIndex(index)) for index in Product.__table__.indexes}
+
+    assert "USING gin (search_vector)" in indexes["idx_product_search_vector"]
+    assert "USING gin (name gin_trgm_ops)" in indexes["idx_product_name_trgm"]
+
+
+def test_existing_databases_get_the_column_and_indexes():
+    assert "ADD COLUMN IF NOT EXISTS search_vector TSVECTOR GENERATED ALWAYS AS" in MIGRATION[1]
+    assert all("CONCURRENTLY IF NOT EXISTS" in statement for statement in MIGRATION[2:])
+
+
+def test_search_matches_full_text_or_fuzzy_name():
+    sql = compile_pg(select(Product.id).where(search_condition("blue shoe")))
+
+    assert "products.search_vector @@ websearch_to_tsquery(" in sql
+    assert "products.name %>" in sql
+    assert "ILIKE" not in sql.upper()
+
+
+def test_relevance_combines_text_rank_and_similarity():
+    sql = compile_pg(select(relevance("shoe")))
+
+    assert "ts_rank_cd(products.search_vector, websearch_to_tsquery(" in sql
+    assert "word_similarity(" in sql
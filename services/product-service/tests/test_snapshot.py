@@ -0,0 +1,143 @@
+# ============================================================
+# Product Service — Catalog Snapshot Tests
+# ============================================================
+
+import random
+import uuid
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from app.snapshot import COLUMNS, SORT_KEYS, CatalogIndex, CatalogSnapshot
+
+CATEGORIES = [uuid.UUID(int=i) for i in (1, 2, 3)]
+
+
+def make_row(i, **overrides):
+    values = {name: None for name in COLUMNS}
+    values.update(
+        id=uuid.UUID(int=random.getrandbits(128)),
+        is_active=True,
+        name=f"Product {i % 17:02d}",
+        sku=f"SKU-{i}",
+        slug=f"product-{i}",
+        price=float(i % 7),
+        quantity=i % 5,
+        low_stock_threshold=10,
+        is_featured=i % 3 == 0,
+        category_id=CATEGORIES[i % 3] if i % 4 else None,
+        created_at=datetime(2024, 1, 1) + timedelta(minutes=i % 11),
+    )
+    values.update(overrides)
+    return SimpleNamespace(**values)
+
+
+def build(rows):
+    index = CatalogIndex({cid: {"id": cid, "name": f"C{cid.int}"} for cid in CATEGORIES})
+    for row in sorted(rows, key=lambda r: r.id):
+        index.apply(row, in_id_order=True)
+    live = [r for r in rows if r.is_active]
+    index.sort(set(SORT_KEYS), [r.id for r in sorted(live, key=lambda r: (r.name, r.id))])
+    return index
+
+
+def expected(rows, sort_by, sort_order, category_id=None, is_featured=None, min_price=None, max_price=None):
+    matched = [
+        r for r in rows
+        if r.is_active
+        and (category_id is None or r.category_id == category_id)
+        and (is_featured is None or r.is_featured == is_featured)
+        and (min_price is None or r.price >= min_price)
+        and (max_price is None or r.price <= max_price)
+    ]
+    return sorted(matched, key=lambda r: (getattr(r, sort_by), r.id), reverse=sort_order == "desc")
+
+
+def page_ids(index, *args, **filters):
+    slots, total, more = index.page(*args, **filters)
+    return [index.ids[s] for s in slots], total, more
+
+
+@pytest.fixture
+def rows():
+    random.seed(7)
+    return [make_row(i) for i in range(200)]
+
+
+@pytest.mark.parametrize("sort_by", SORT_KEYS)
+@pytest.mark.parametrize("sort_order", ["asc", "desc"])
+@pytest.mark.parametrize("filters", [
+    {},
+    {"category_id": CATEGORIES[1]},
+    {"is_featured": True, "min_price": 2.0},
+    {"min_price": 1.0, "max_price": 3.0},
+])
+def test_pages_match_sql_ordering(rows, sort_by, sort_order, filters):
+    index = build(rows)
+    want = [r.id for r in expected(rows, sort_by, sort_order, **filters)]
+
+    ids, total, more = page_ids(index, sort_by, sort_order, None, 20, 15, **filters)
+
+    assert total == len(want)
+    assert ids == want[20:35]
+    assert more == (len(want) > 35)
+
+
+@pytest.mark.parametrize("sort_order", ["asc", "desc"])
+def test_cursor_walk_visits_every_row_once(rows, sort_order):
+    index = build(rows)
+    want = [r.id for r in expected(rows, "price", sort_order, category_id=CATEGORIES[2])]
+    seen, after = [], None
+    while True:
+        slots, _, more = index.page("price", sort_order, after, 0, 7, category_id=CATEGORIES[2])
+        seen += [index.ids[s] for s in slots]
+        if not more:
+            break
+        last = slots[-1]
+        after = (index.columns["price"][last], index.ids[last])
+
+    assert seen == want
+
+
+def test_updates_reorder_move_and_retire_rows(rows):
+    index = build(rows)
+    moved = SimpleNamespace(**{**vars(rows[5]), "price": 99.0, "category_id": CATEGORIES[0]})
+    retired = SimpleNamespace(**{**vars(rows[6]), "is_active": False})
+    added = make_row(500, price=-1.0)
+
+    changed = set()
+    for row in (moved, retired, added):
+        changed |= index.apply(row)
+    index.sort(changed - {"name"})
+    rows[5], rows[6] = moved, retired
+    rows.append(added)
+
+    assert changed == set(SORT_KEYS)
+    assert page_ids(index, "price", "desc", None, 0, 1)[0] == [moved.id]
+    assert page_ids(index, "price", "asc", None, 0, 1)[0] == [added.id]
+    assert len(index) == 200
+    in_category = page_ids(index, "quantity", "asc", None, 0, 500, category_id=CATEGORIES[0])[0]
+    assert in_category == [r.id for r in expected(rows, "quantity", "asc", category_id=CATEGORIES[0])]
+
+
+def test_stale_cursor_is_not_served(rows):
+    index = build(rows)
+    row = rows[0]
+
+    assert index.page("price", "asc", (row.price + 0.5, row.id), 0, 10) is None
+
+
+def test_listing_defers_to_sql_when_unsupported_or_behind(rows):
+    snapshot = CatalogSnapshot(max_staleness=60)
+    snapshot.index = build(rows)
+    snapshot.index.generation = 3
+    filters = {"is_active": True}
+
+    items, total, next_key = snapshot.listing(filters, "name", "asc", None, 0, 2, ["id", "name", "category"], 3)
+    assert total == 200 and len(items) == 2 and next_key == (items[1]["name"], items[1]["id"])
+
+    assert snapshot.listing({"is_active": None}, "name", "asc", None, 0, 2, ["id"], 3) is None
+    assert snapshot.listing({**filters, "search": "lamp"}, "price", "asc", None, 0, 2, ["id"], 3) is None
+    assert snapshot.listing(filters, "price", "asc", None, 0, 2, ["id"], generation=4) is None
+    assert snapshot._wake.is_set()
@@ -0,0 +1,90 @@
+# ============================================================
+# Product Service — Startup & Warm-up Tests
+# ============================================================
+
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+
+import app.startup as startup_module
+from app.config import settings
+from app.startup import Startup, preload, warm_up
+
+
+class BrokenEngine:
+    async def connect(self):
+        raise OSError("connection refused")
+
+
+@pytest.fixture
+def fresh_startup(monkeypatch):
+    state = Startup()
+    monkeypatch.setattr(startup_module, "startup", state)
+    return state
+
+
+@pytest.mark.asyncio
+async def test_warm_up_preloads_paths_then_flips_ready(monkeypatch, fresh_startup):
+    served = []
+    app = FastAPI()
+
+    @app.get("/hot")
+    async def hot():
+        served.append("hot")
+        return {"ok": True}
+
+    monkeypatch.setattr(settings, "STARTUP_PREWARM_CONNECTIONS", 0)
+    monkeypatch.setattr(settings, "STARTUP_PRELOAD_PATHS", ["/hot", "/missing"])
+
+    await warm_up(app, engines=[])
+
+    assert served == ["hot"]
+    assert fresh_startup.ready
+    assert set(fresh_startup.phases) == {"preload"}
+
+
+@pytest.mark.asyncio
+async def test_a_path_that_raises_does_not_stop_the_preload():
+    served = []
+    app = FastAPI()
+
+    @app.get("/broken")
+    async def broken():
+        raise RuntimeError("no such table")
+
+    @app.get("/hot")
+    async def hot():
+        served.append("hot")
+
+    await preload(app, ["/broken", "/hot"])
+
+    assert served == ["hot"]
+
+
+@pytest.mark.asyncio
+async def test_failed_or_slow_phases_never_block_readiness(monkeypatch, fresh_startup):
+    app = FastAPI()
+
+    @app.get("/slow")
+    async def slow():
+        await asyncio.sleep(10)
+
+    monkeypatch.setattr(settings, "STARTUP_PREWARM_CONNECTIONS", 2)
+    monkeypatch.setattr(settings, "STARTUP_PRELOAD_PATHS", ["/slow"])
+    monkeypatch.setattr(settings, "STARTUP_WARMUP_TIMEOUT", 0.05)
+
+    await warm_up(app, engines=[BrokenEngine()])
+
+    assert fresh_startup.ready
+    assert set(fresh_startup.phases) == {"pool", "preload"}
+    assert fresh_startup.phases["preload"] < 1
+
+
+def test_schema_creation_defaults_off_in_production(monkeypatch):
+    monkeypatch.setattr(settings, "STARTUP_CREATE_SCHEMA", None)
+    monkeypatch.setattr(settings, "ENVIRONMENT", "production")
+    assert not startup_module.should_create_schema()
+
+    monkeypatch.setattr(settings, "STARTUP_CREATE_SCHEMA", True)
+    assert startup_module.should_create_schema()
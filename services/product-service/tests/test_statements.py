@@ -0,0 +1,79 @@
+# ============================================================
+# Product Service — Reusable Statement Tests
+# ============================================================
+
+import uuid
+
+from sqlalchemy import and_
+from sqlalchemy.dialects.postgresql import asyncpg
+
+from app.models import Product
+from app.pagination import keyset_condition, keyset_order
+from app.projection import product_select
+from app.routers.products import PRODUCT_BY_ID, bound_filters, listing_statement, product_conditions
+from app.statements import StatementCache
+
+
+def positional(statement, params=None):
+    """SQL and ordered parameter values, as asyncpg would receive them."""
+    compiled = statement.compile(dialect=asyncpg.dialect())
+    values = compiled.construct_params(params)
+    return compiled.string, [values[name] for name in compiled.positiontup]
+
+
+def filters(**overrides):
+    base = dict(
+        category_id=None, is_active=True, is_featured=None, min_price=None, max_price=None,
+        search=None, tags=None, tags_match="any",
+    )
+    return dict(base, **overrides)
+
+
+def test_cache_builds_each_shape_once_and_evicts_least_recent():
+    cache = StatementCache(max_entries=2)
+    builds = []
+
+    def build(name):
+        builds.append(name)
+        return name
+
+    for key in ["a", "b", "a", "c", "a", "b"]:
+        cache.get(key, lambda key=key: build(key))
+
+    assert builds == ["a", "b", "c", "b"]  # "b" was least recent when "c" arrived
+    assert len(cache) == 2
+
+
+def test_shape_follows_which_filters_are_set_not_their_values():
+    _, values, shape = bound_filters(filters(min_price=10.0, category_id=uuid.uuid4()))
+    _, _, same = bound_filters(filters(min_price=99.0, category_id=uuid.uuid4()))
+    _, _, other = bound_filters(filters(min_price=10.0))
+    _, _, inactive = bound_filters(filters(min_price=10.0, category_id=uuid.uuid4(), is_active=False))
+
+    assert set(values) == {"min_price", "category_id"}
+    assert shape == same
+    assert len({shape, other, inactive}) == 3
+
+
+def test_cached_listing_matches_a_per_request_build():
+    category_id, after_id = uuid.uuid4(), uuid.uuid4()
+    given = filters(category_id=category_id, min_price=5.0, is_featured=False, tags=["sale"])
+    fields = ["id", "name", "price"]
+
+    placeholders, values, _ = bound_filters(given)
+    cached, _ = listing_statement(placeholders, fields, "price", "asc", keyed=True)
+    reused = positional(cached, dict(values, offset=0, limit=21, after_value=9.5, after_id=after_id))
+
+    built, _ = product_select(fields, Product.price.label("sort_key"))
+    built = (
+        built.where(and_(*product_conditions(**given)))
+        .order_by(*keyset_order(Product.price, Product.id, "asc"))
+        .where(keyset_condition(Product.price, Product.id, (9.5, after_id), "asc"))
+        .offset(0).limit(21)
+    )
+
+    assert reused == positional(built)
+
+
+def test_hot_statement_reuses_its_memoized_cache_key():
+    assert PRODUCT_BY_ID._generate_cache_key() is PRODUCT_BY_ID._generate_cache_key()
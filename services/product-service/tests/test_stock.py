@@ -0,0 +1,61 @@
+# ============================================================
+# Product Service — Stock Reservation Tests
+# ============================================================
+
+import uuid
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.database import get_db
+from app.routers.products import router
+from app.stock import ReservationFailed, reservation_statement, reserve_stock
+from tests.conftest import FakeSession, compile_pg
+
+
+def test_reservation_is_one_guarded_update_with_ordered_locks():
+    sql = compile_pg(reservation_statement({uuid.uuid4(): 1}))
+
+    assert sql.count("UPDATE products") == 1
+    assert "ORDER BY products.id FOR UPDATE OF products" in sql
+    assert "products.quantity >= req.qty" in sql
+    assert "SET quantity=(products.quantity - req.qty)" in sql
+    assert sql.endswith("RETURNING products.id, products.quantity, products.low_stock_threshold")
+
+
+@pytest.mark.asyncio
+async def test_duplicate_lines_are_summed_into_one_row(fake_session):
+    product_id = uuid.uuid4()
+    db = fake_session([(product_id, 7, 0)])
+
+    reserved = await reserve_stock(db, [(product_id, 2), (product_id, 1)])
+
+    assert reserved == {product_id: 7}
+    assert db.statements[0].compile().params["qtys"] == [3]
+
+
+@pytest.mark.asyncio
+async def test_short_and_missing_items_are_reported(fake_session):
+    ok, short, missing = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    db = fake_session([(ok, 4, 0)], [short])
+
+    with pytest.raises(ReservationFailed) as exc:
+        await reserve_stock(db, [(ok, 1), (short, 5), (missing, 1)])
+
+    assert exc.value.insufficient == [short]
+    assert exc.value.not_found == [missing]
+
+
+def test_reservation_over_the_line_limit_is_unprocessable():
+    app = FastAPI()
+    app.include_router(router, prefix="/products")
+    db = FakeSession()
+    app.dependency_overrides[get_db] = lambda: db
+    items = [{"product_id": str(uuid.uuid4()), "quantity": 1} for _ in range(settings.STOCK_RESERVATION_MAX + 1)]
+
+    response = TestClient(app).post("/products/stock/reserve", json={"items": items})
+
+    assert response.status_code == 422
+    assert db.statements == []
@@ -0,0 +1,51 @@
+# ============================================================
+# Product Service — Tag Tests
+# ============================================================
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+from app.config import settings
+from app.models import Product
+from app.tags import MIGRATION, parse_tags, tag_cloud_statement, tags_condition
+from tests.conftest import compile_pg
+
+
+def test_tag_list_is_a_gin_indexed_generated_column():
+    ddl = compile_pg(CreateTable(Product.__table__))
+    indexes = {index.name: compile_pg(CreateIndex(index)) for index in Product.__table__.indexes}
+
+    assert "tag_list TEXT[] GENERATED ALWAYS AS (array_remove(regexp_split_to_array(lower(" in ddl
+    assert "USING gin (tag_list)" in indexes["idx_product_tag_list"]
+    # The migration adds the same column and index to existing tables
+    assert "ADD COLUMN IF NOT EXISTS tag_list" in MIGRATION[0]
+    assert "CONCURRENTLY IF NOT EXISTS idx_product_tag_list" in MIGRATION[1]
+
+
+def test_parse_tags_normalizes_like_the_generated_column(monkeypatch):
+    assert parse_tags(None) is None
+    assert parse_tags(" , ") is None
+    assert parse_tags("Summer, sale,,summer ") == ["sale", "summer"]
+
+    monkeypatch.setattr(settings, "TAG_FILTER_MAX", 2)
+    with pytest.raises(HTTPException):
+        parse_tags("a,b,c")
+
+
+@pytest.mark.parametrize("match, operator", [("any", "&&"), ("all", "@>")])
+def test_tags_filter_uses_index_operators(match, operator):
+    sql = compile_pg(select(Product.id).where(tags_condition(["sale", "summer"], match)))
+
+    assert f"products.tag_list {operator}" in sql
+    assert "LIKE" not in sql.upper()
+
+
+def test_tag_cloud_groups_unnested_tags():
+    sql = compile_pg(tag_cloud_statement([Product.is_active.is_(True)], 10))
+
+    assert "unnest(products.tag_list) AS tag" in sql
+    assert "count(DISTINCT anon_1.id) AS count" in sql  # duplicate tags on a product count once
+    assert "GROUP BY" in sql and "ORDER BY count DESC" in sql
+    assert "LIMIT" in sql